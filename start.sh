@@ -1,10 +1,14 @@
 #!/bin/bash
 cd wacebackend
 python manage.py migrate
+python manage.py createcachetable
 python manage.py collectstatic --noinput
 
 # Populate subjects if database is empty (idempotent - won't create duplicates)
 echo "Checking and populating subjects..."
 python manage.py populate_subjects
 
+# Background job worker (see jobs/), restarted if it exits
+(while true; do python manage.py run_jobs; sleep 5; done) &
+
 gunicorn wace_api.wsgi:application --bind 0.0.0.0:$PORT
\ No newline at end of file
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Subject, ProgrammeSubject, Topic, Lesson, LessonResource, 
-    Announcement, Instructor, InstructorSpecialty
+    Announcement, Instructor, InstructorSpecialty, SubjectProgress
 )
 
 
@@ -154,3 +154,11 @@ class InstructorSpecialtyAdmin(admin.ModelAdmin):
     list_filter = ['is_primary', 'subject__subject_type']
     search_fields = ['instructor__first_name', 'instructor__last_name', 'subject__name']
     ordering = ['instructor', '-is_primary', 'subject']
+
+
+@admin.register(SubjectProgress)
+class SubjectProgressAdmin(admin.ModelAdmin):
+    list_display = ['student', 'subject', 'lessons_completed', 'last_completed_at']
+    list_filter = ['subject']
+    search_fields = ['student__username', 'subject__name']
+    readonly_fields = ['lessons_completed', 'last_completed_at', 'updated_at']
@@ -0,0 +1,238 @@
+"""
+Set-based writes for the content population commands
+
+The populate_* commands used to call get_or_create() or save() once per
+row. Against the remote production database that meant thousands of round
+trips and minutes per reseed. BulkWriter plans each model's writes instead:
+
+1. Load the rows that already exist, with one query per model.
+2. Diff them against the seed data by natural key.
+3. Apply the difference with bulk_create()/bulk_update().
+
+Everything happens in one transaction, so a failed reseed leaves nothing
+half-written. A dry run does the same work and then rolls back, which
+makes its report an exact diff.
+
+Bulk writes send no model signals, so after the commit BulkWriter does
+the work the signal handlers would have done:
+- bump the catalog and question bank versions;
+- mark the papers whose questions changed as changed;
+- re-index the search documents of the rows it wrote.
+"""
+import time
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 500
+
+
+def add_bulk_arguments(parser):
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Report what would be created or updated, then roll back',
+    )
+
+
+class UpsertResult:
+    """Outcome of one BulkWriter.upsert() call"""
+
+    def __init__(self):
+        # Natural key (a value, or a tuple for composite keys) -> instance,
+        # for every seed row that exists after the write
+        self.objects = {}
+        self.created = []
+        self.created_keys = set()
+        self.updated = []
+        self.unchanged = 0
+        self.conflicts = []  # Keys skipped because another row already holds their unique slot
+
+
+class BulkWriter:
+    """
+    Plans and applies set-based writes for a population command
+
+    Usage:
+        with BulkWriter(self.stdout, dry_run=options['dry_run']) as writer:
+            subjects = writer.upsert(Subject, rows, key_fields=['code'])
+            ...
+    """
+
+    def __init__(self, stdout, dry_run=False):
+        self.stdout = stdout
+        self.dry_run = dry_run
+        self.written = {}  # Model -> ids created or updated
+        self.updated = {}  # Model -> ids of existing rows that were updated
+        self.queries = 0
+        self.started = None
+
+    def _count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        self._wrapper = connection.execute_wrapper(self._count_query)
+        self._wrapper.__enter__()
+        self._atomic = transaction.atomic()
+        self._atomic.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                if self.dry_run:
+                    transaction.set_rollback(True)
+                else:
+                    self._touch_papers()
+                    transaction.on_commit(self._after_commit)
+            self._atomic.__exit__(exc_type, exc, tb)
+        finally:
+            self._wrapper.__exit__(exc_type, exc, tb)
+
+        if exc_type is None:
+            elapsed = time.monotonic() - self.started
+            verb = 'Dry run finished (rolled back)' if self.dry_run else 'Wrote changes'
+            self.stdout.write(f"\n⏱️  {verb} in {elapsed:.2f}s using {self.queries} queries")
+        return False
+
+    def _record(self, model, created=(), updated=()):
+        self.written.setdefault(model, set()).update(obj.pk for obj in [*created, *updated])
+        self.updated.setdefault(model, set()).update(obj.pk for obj in updated)
+
+    def _report(self, label, result):
+        parts = [f"{len(result.created)} to create", f"{len(result.updated)} to update", f"{result.unchanged} unchanged"]
+        if not self.dry_run:
+            parts[:2] = [f"{len(result.created)} created", f"{len(result.updated)} updated"]
+        if result.conflicts:
+            parts.append(f"{len(result.conflicts)} skipped (unique conflict)")
+        self.stdout.write(f"  • {label}: {', '.join(parts)}")
+
+    def upsert(self, model, rows, key_fields, update_fields=(), conflict_fields=(), label=None):
+        """
+        Create the rows that don't exist yet and, optionally, update fields of those that do
+
+        Args:
+            model: Model class
+            rows: Iterable of dicts of field values, using attnames for foreign
+                keys (e.g. 'subject_id'). Later rows with an already seen key
+                are ignored.
+            key_fields: Fields forming the natural key. The first one is used
+                to load existing rows, so make it the most selective parent
+                (e.g. 'subject_id' or 'code'). Results are keyed by the bare
+                value for a one-field key and by tuples otherwise.
+            update_fields: Fields to overwrite on rows that exist. Empty by
+                default, which keeps get_or_create() semantics: admin edits
+                to existing rows are never overwritten.
+            conflict_fields: Other unique field tuples (starting with
+                key_fields[0]). New rows that would collide with an existing
+                row on them are skipped and reported instead of failing the
+                whole transaction.
+            label: Name used in the report (default: the model's plural name)
+
+        Returns:
+            UpsertResult
+        """
+        key_fields = list(key_fields)
+        label = label or model._meta.verbose_name_plural.capitalize()
+        result = UpsertResult()
+        if len(key_fields) == 1:
+            row_key = lambda row: row[key_fields[0]]
+            obj_key = lambda obj: getattr(obj, key_fields[0])
+        else:
+            row_key = lambda row: tuple(row[field] for field in key_fields)
+            obj_key = lambda obj: tuple(getattr(obj, field) for field in key_fields)
+
+        seed = {}
+        for row in rows:
+            seed.setdefault(row_key(row), row)
+        if not seed:
+            self._report(label, result)
+            return result
+
+        first = key_fields[0]
+        existing_rows = model.objects.filter(**{f'{first}__in': {row[first] for row in seed.values()}}).order_by()
+        existing = {obj_key(obj): obj for obj in existing_rows}
+        taken = {
+            fields: {tuple(getattr(obj, field) for field in fields) for obj in existing.values()}
+            for fields in map(tuple, conflict_fields)
+        }
+
+        for key, row in seed.items():
+            obj = existing.get(key)
+            if obj is None:
+                slots = {fields: tuple(row.get(field) for field in fields) for fields in taken}
+                if any(slot in taken[fields] for fields, slot in slots.items()):
+                    result.conflicts.append(key)
+                    continue
+                for fields, slot in slots.items():
+                    taken[fields].add(slot)
+                obj = model(**row)
+                result.created.append(obj)
+                result.created_keys.add(key)
+            else:
+                changed = [field for field in update_fields if getattr(obj, field) != row[field]]
+                for field in changed:
+                    setattr(obj, field, row[field])
+                if changed:
+                    result.updated.append(obj)
+                else:
+                    result.unchanged += 1
+            result.objects[key] = obj
+
+        model.objects.bulk_create(result.created, batch_size=BATCH_SIZE)
+        if result.updated:
+            model.objects.bulk_update(result.updated, list(update_fields), batch_size=BATCH_SIZE)
+        self._record(model, created=result.created, updated=result.updated)
+        self._report(label, result)
+        self._progress(label)
+        return result
+
+    def update(self, model, objects, fields, label=None):
+        """bulk_update() `fields` of already modified instances"""
+        objects = list(objects)
+        label = label or model._meta.verbose_name_plural.capitalize()
+        model.objects.bulk_update(objects, list(fields), batch_size=BATCH_SIZE)
+        self._record(model, updated=objects)
+        verb = 'to update' if self.dry_run else 'updated'
+        self.stdout.write(f"  • {label}: {len(objects)} {verb}")
+        self._progress(label)
+
+    def _progress(self, label):
+        # Inside our transaction, so a queued job records this once it commits or rolls back
+        from jobs.queue import report_progress
+        report_progress(sum(len(ids) for ids in self.written.values()), message=f'Wrote {label}')
+
+    def _touch_papers(self):
+        """Papers whose questions changed must rebuild their cached bodies (see paper_cache.py)"""
+        from past_questions.models import EssayQuestion, MultipleChoiceQuestion, PastQuestionPaper
+        paper_ids = set()
+        for model in (MultipleChoiceQuestion, EssayQuestion):
+            if self.written.get(model):
+                paper_ids.update(
+                    model.objects.filter(id__in=self.written[model]).values_list('paper_id', flat=True)
+                )
+        if paper_ids:
+            PastQuestionPaper.objects.filter(id__in=paper_ids).update(updated_at=timezone.now())
+
+    def _after_commit(self):
+        from past_questions.models import EssayQuestion, MultipleChoiceQuestion, PastQuestionPaper, QuestionTopic
+        from past_questions.quiz import bump_question_bank_version
+        from search.indexing import KIND_BY_MODEL, index_objects, index_paper
+        from .catalog import bump_catalog_version
+        from .signals import CATALOG_MODELS
+
+        written = {model for model, ids in self.written.items() if ids}
+        if written & set(CATALOG_MODELS):
+            bump_catalog_version()
+        if written & {MultipleChoiceQuestion, PastQuestionPaper, QuestionTopic}:
+            bump_question_bank_version()
+
+        for model, ids in self.written.items():
+            if model in KIND_BY_MODEL:
+                index_objects(KIND_BY_MODEL[model], ids)
+        # A paper's own fields (title, is_published) are part of its questions' documents
+        for paper in PastQuestionPaper.objects.filter(id__in=self.updated.get(PastQuestionPaper, ())):
+            index_paper(paper)
+
@@ -0,0 +1,243 @@
+"""
+Versioned snapshots of the public course catalog
+
+The programme and subject catalog only changes when admins edit
+programmes, subjects, topics or lessons, yet it is read on every
+anonymous page load. Signals (see courses/signals.py) bump a catalog
+version whenever one of those models changes; snapshots are serialized
+once per version and served as raw JSON bytes from the cache, and
+optionally from CATALOG_SNAPSHOT_DIR on disk. Files of older versions
+are deleted when the version is bumped and whenever a snapshot file is
+written, since the bump may have run in another container (such as the
+job worker) with its own snapshot directory.
+"""
+import hashlib
+import json
+import os
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Prefetch
+
+CATALOG_VERSION_KEY = 'courses:catalog:version'
+CATALOG_SNAPSHOT_TIMEOUT = 60 * 60 * 24  # Snapshots are invalidated by version, not by time
+
+
+def get_catalog_version():
+    """Return the current catalog version, initialising it if needed"""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex[:12]
+        # add() so concurrent first readers agree on one version
+        if not cache.add(CATALOG_VERSION_KEY, version, timeout=None):
+            version = cache.get(CATALOG_VERSION_KEY, version)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate all catalog snapshots by moving to a new version"""
+    version = uuid.uuid4().hex[:12]
+    cache.set(CATALOG_VERSION_KEY, version, timeout=None)
+    prune_snapshots(version)
+    return version
+
+
+def _snapshot_path(version, name):
+    snapshot_dir = getattr(settings, 'CATALOG_SNAPSHOT_DIR', None)
+    if not snapshot_dir:
+        return None
+    digest = hashlib.sha1(name.encode()).hexdigest()[:16]
+    return os.path.join(snapshot_dir, f'catalog-{version}-{digest}.json')
+
+
+def prune_snapshots(keep_version):
+    """Delete on-disk snapshots of every catalog version except `keep_version`"""
+    snapshot_dir = getattr(settings, 'CATALOG_SNAPSHOT_DIR', None)
+    if not snapshot_dir:
+        return 0
+    try:
+        names = os.listdir(snapshot_dir)
+    except OSError:
+        return 0
+    removed = 0
+    for name in names:
+        if name.startswith('catalog-') and not name.startswith(f'catalog-{keep_version}-'):
+            try:
+                os.remove(os.path.join(snapshot_dir, name))
+                removed += 1
+            except OSError:
+                pass  # Already removed by another process
+    return removed
+
+
+def get_snapshot(name, build):
+    """
+    Return the serialized snapshot `name` for the current catalog version
+
+    Args:
+        name: Snapshot name, unique per payload (e.g. 'programmes')
+        build: Callable returning the JSON bytes, or None if the payload
+            does not exist (None is not cached)
+
+    Returns:
+        Tuple of (JSON bytes or None, catalog version)
+    """
+    version = get_catalog_version()
+    key = f'courses:catalog:{version}:{name}'
+
+    content = cache.get(key)
+    if content is not None:
+        return content, version
+
+    path = _snapshot_path(version, name)
+    if path and os.path.exists(path):
+        with open(path, 'rb') as f:
+            content = f.read()
+    else:
+        content = build()
+        if content is None:
+            return None, version
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+                prune_snapshots(version)
+            except OSError as e:
+                print(f"Warning: Could not write catalog snapshot {path}: {e}")
+
+    cache.set(key, content, timeout=CATALOG_SNAPSHOT_TIMEOUT)
+    return content, version
+
+
+def to_json_bytes(data):
+    """Serialize a payload the same way JsonResponse does"""
+    return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def build_programmes_list():
+    """Payload for /api/courses/programmes/"""
+    from students.models import Programme
+    from .models import ProgrammeSubject
+
+    # One query for programmes and one for all their subjects with topic counts,
+    # however many programmes or subjects exist
+    programme_subjects = ProgrammeSubject.objects.select_related('subject').annotate(
+        topics_count=Count('subject__topics')
+    ).order_by('subject__subject_type', 'order')
+    programmes = Programme.objects.prefetch_related(
+        Prefetch('programme_subjects', queryset=programme_subjects)
+    )
+
+    programmes_data = []
+
+    for programme in programmes:
+        # Separate core and elective subjects
+        core_subjects = []
+        elective_subjects = []
+
+        for prog_subject in programme.programme_subjects.all():
+            subject_data = {
+                'id': prog_subject.subject.id,
+                'name': prog_subject.subject.name,
+                'code': prog_subject.subject.code,
+                'description': prog_subject.subject.description,
+                'topics_count': prog_subject.topics_count
+            }
+
+            if prog_subject.subject.subject_type == 'core':
+                core_subjects.append(subject_data)
+            else:
+                elective_subjects.append(subject_data)
+
+        programme_data = {
+            'id': programme.id,
+            'name': programme.name,
+            'display_name': programme.get_name_display(),
+            'description': programme.description,
+            'price': float(programme.price),
+            'duration_months': programme.duration_months,
+            'core_subjects': core_subjects,
+            'elective_subjects': elective_subjects
+        }
+        programmes_data.append(programme_data)
+
+    return {
+        'programmes': programmes_data,
+        'total_count': len(programmes_data)
+    }
+
+
+def build_programme_detail(programme_id):
+    """Payload for /api/courses/programmes/<id>/, or None if it doesn't exist"""
+    from students.models import Programme
+    from .models import ProgrammeSubject, Topic
+
+    try:
+        programme = Programme.objects.get(id=programme_id)
+    except Programme.DoesNotExist:
+        return None
+
+    # Get programme subjects through the many-to-many relationship
+    topics = Topic.objects.annotate(lessons_count=Count('lessons')).order_by('order')
+    programme_subjects = ProgrammeSubject.objects.filter(
+        programme=programme
+    ).select_related('subject').prefetch_related(
+        Prefetch('subject__topics', queryset=topics)
+    ).order_by('subject__subject_type', 'order')
+
+    subjects_by_type = {
+        'core': [],
+        'elective': []
+    }
+
+    for prog_subject in programme_subjects:
+        subject = prog_subject.subject
+        subject_topics = subject.topics.all()
+        subject_data = {
+            'id': subject.id,
+            'name': subject.name,
+            'code': subject.code,
+            'description': subject.description,
+            'order': prog_subject.order,
+            'topics_count': len(subject_topics),
+            'topics': [
+                {
+                    'id': topic.id,
+                    'title': topic.title,
+                    'description': topic.description,
+                    'order': topic.order,
+                    'estimated_duration_hours': topic.estimated_duration_hours,
+                    'lessons_count': topic.lessons_count
+                }
+                for topic in subject_topics[:5]  # Show first 5 topics
+            ]
+        }
+        subjects_by_type[subject.subject_type].append(subject_data)
+
+    return {
+        'id': programme.id,
+        'name': programme.name,
+        'display_name': programme.get_name_display(),
+        'description': programme.description,
+        'price': float(programme.price),
+        'duration_months': programme.duration_months,
+        'subjects': subjects_by_type,
+        'total_subjects': len(programme_subjects)
+    }
+
+
+def get_programmes_list_snapshot():
+    return get_snapshot('programmes', lambda: to_json_bytes(build_programmes_list()))
+
+
+def get_programme_detail_snapshot(programme_id):
+    def build():
+        data = build_programme_detail(programme_id)
+        return to_json_bytes(data) if data is not None else None
+
+    return get_snapshot(f'programme:{programme_id}', build)
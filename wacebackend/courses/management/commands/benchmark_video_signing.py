@@ -0,0 +1,97 @@
+"""
+Django management command to benchmark video URL signing
+Usage: python manage.py benchmark_video_signing [--counts 1,100,1000] [--repeat 3]
+
+Compares the old approach (a new boto3 session and S3 client per lesson)
+with the shared VideoURLSigner batch API used by subject_detail.
+Signing is local, so dummy credentials are used unless DO_SPACES_* is set.
+"""
+import os
+import time
+
+import boto3
+from botocore.client import Config
+from django.core.management.base import BaseCommand
+
+from courses.utils import VideoURLSigner
+
+SAMPLE_VIDEO_URL = "https://tailsandtrailsmedia.sfo3.cdn.digitaloceanspaces.com/videos/lesson-{}.mp4"
+
+
+def sign_with_new_client(signer, video_url, expiration=3600):
+    """Previous behaviour: build a fresh session and client for every URL"""
+    session = boto3.session.Session()
+    client = session.client(
+        's3',
+        region_name=signer.region,
+        endpoint_url=f'https://{signer.region}.digitaloceanspaces.com',
+        aws_access_key_id=signer.access_key,
+        aws_secret_access_key=signer.secret_key,
+        config=Config(signature_version='s3v4')
+    )
+    return client.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': signer.bucket_name, 'Key': signer.object_key(video_url)},
+        ExpiresIn=expiration
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark video URL signing latency before and after the shared signer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--counts',
+            default='1,100,1000',
+            help='Comma-separated lesson counts to benchmark (default: 1,100,1000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per count; the best run is reported (default: 3)',
+        )
+
+    def handle(self, *args, **options):
+        counts = [int(c) for c in options['counts'].split(',') if c.strip()]
+        repeat = max(1, options['repeat'])
+
+        signer = VideoURLSigner(
+            access_key=os.getenv('DO_SPACES_ACCESS_KEY') or 'benchmark-access-key',
+            secret_key=os.getenv('DO_SPACES_SECRET_KEY') or 'benchmark-secret-key',
+            bucket_name=os.getenv('DO_SPACES_BUCKET') or 'benchmark-bucket',
+            region=os.getenv('DO_SPACES_REGION', 'sfo3'),
+        )
+
+        self.stdout.write("=" * 70)
+        self.stdout.write("VIDEO URL SIGNING BENCHMARK")
+        self.stdout.write("=" * 70)
+        self.stdout.write(f"{'Lessons':>8}  {'Before (ms)':>12}  {'After (ms)':>12}  {'Speedup':>8}")
+
+        for count in counts:
+            urls = [SAMPLE_VIDEO_URL.format(i) for i in range(count)]
+
+            before = self._best_of(repeat, lambda: [sign_with_new_client(signer, url) for url in urls])
+
+            def sign_batch():
+                # Include client construction so the first request of a process is counted
+                fresh_signer = VideoURLSigner(
+                    signer.access_key, signer.secret_key, signer.bucket_name, signer.region
+                )
+                fresh_signer.sign_many(urls)
+
+            after = self._best_of(repeat, sign_batch)
+            speedup = before / after if after else float('inf')
+
+            self.stdout.write(f"{count:>8}  {before * 1000:>12.1f}  {after * 1000:>12.1f}  {speedup:>7.1f}x")
+
+        self.stdout.write("")
+
+    @staticmethod
+    def _best_of(repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
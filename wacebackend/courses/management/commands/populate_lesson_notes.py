@@ -1,14 +1,18 @@
 """
 Django management command to populate lesson notes
-Usage: python manage.py populate_lesson_notes
+Usage: python manage.py populate_lesson_notes [--dry-run]
 """
 from django.core.management.base import BaseCommand
+from courses.bulk import BulkWriter, add_bulk_arguments
 from courses.models import Lesson
 
 
 class Command(BaseCommand):
     help = 'Populate lesson notes for all lessons'
 
+    def add_arguments(self, parser):
+        add_bulk_arguments(parser)
+
     def handle(self, *args, **options):
         self.stdout.write("=" * 70)
         self.stdout.write(self.style.SUCCESS("POPULATING LESSON NOTES"))
@@ -144,15 +148,15 @@ By the end of this lesson, you should be able to:
 """
 
         # Process lessons
-        lessons = Lesson.objects.all()
-        total = lessons.count()
-        updated = 0
+        lessons = list(Lesson.objects.select_related('topic__subject'))
+        total = len(lessons)
+        changed = []
         skipped = 0
         
         self.stdout.write(f"\nFound {total} lessons\n")
         self.stdout.write("Processing...\n")
         
-        for i, lesson in enumerate(lessons, 1):
+        for lesson in lessons:
             # Skip if already has notes
             if lesson.notes:
                 skipped += 1
@@ -188,19 +192,18 @@ By the end of this lesson, you should be able to:
 *These notes supplement the video content. Watch the video for complete understanding.*
 """
             
-            lesson.save()
-            updated += 1
-            
-            # Progress indicator
-            if i % 10 == 0:
-                self.stdout.write(f"  Processed {i}/{total} lessons...")
+            changed.append(lesson)
+        
+        with BulkWriter(self.stdout, dry_run=options['dry_run']) as writer:
+            writer.update(Lesson, changed, ['notes'])
+        updated = len(changed)
         
         # Summary
         self.stdout.write("\n" + "=" * 70)
         self.stdout.write(self.style.SUCCESS("SUMMARY"))
         self.stdout.write("=" * 70)
         self.stdout.write(f"Total lessons: {total}")
-        self.stdout.write(self.style.SUCCESS(f"Updated: {updated}"))
+        self.stdout.write(self.style.SUCCESS(f"{'To update' if options['dry_run'] else 'Updated'}: {updated}"))
         self.stdout.write(f"Skipped (already had notes): {skipped}")
         self.stdout.write("=" * 70)
         self.stdout.write(self.style.SUCCESS("\n✓ Done! All lessons now have notes."))
@@ -1,12 +1,42 @@
+"""
+Django management command to populate shared core subjects and programme electives
+Usage: python manage.py populate_shared_subjects [--dry-run]
+
+Topics and sample lessons are only added to subjects this command creates.
+"""
 from django.core.management.base import BaseCommand
 from students.models import Programme
+from courses.bulk import BulkWriter, add_bulk_arguments
 from courses.models import Subject, ProgrammeSubject, Topic, Lesson
 
 
 class Command(BaseCommand):
     help = 'Populate shared core subjects and programme-specific elective subjects'
 
+    def add_arguments(self, parser):
+        add_bulk_arguments(parser)
+
     def handle(self, *args, **options):
+        with BulkWriter(self.stdout, dry_run=options['dry_run']) as writer:
+            self.populate(writer)
+
+        if options['dry_run']:
+            return
+
+        self.stdout.write(self.style.SUCCESS('\nSuccessfully populated shared subjects!'))
+        
+        # Print summary
+        total_subjects = Subject.objects.count()
+        core_count = Subject.objects.filter(subject_type='core').count()
+        elective_count = Subject.objects.filter(subject_type='elective').count()
+        
+        self.stdout.write(f'\nSummary:')
+        self.stdout.write(f'Total subjects: {total_subjects}')
+        self.stdout.write(f'Core subjects: {core_count}')
+        self.stdout.write(f'Elective subjects: {elective_count}')
+        self.stdout.write(f'Total topics: {Topic.objects.count()}')
+
+    def populate(self, writer):
         self.stdout.write('Creating shared core subjects...')
         
         # Create shared core subjects (these will be used by all programmes)
@@ -63,80 +93,56 @@ class Command(BaseCommand):
         ]
 
         # Create core subjects
-        for subject_data in core_subjects_data:
-            subject, created = Subject.objects.get_or_create(
-                code=subject_data['code'],
-                defaults={
-                    'name': subject_data['name'],
-                    'description': subject_data['description'],
-                    'subject_type': 'core',
-                    'is_active': True
-                }
-            )
-            
-            if created:
-                self.stdout.write(f'Created core subject: {subject.name}')
-                
-                # Create topics for this subject
-                for i, topic_data in enumerate(subject_data['topics'], 1):
-                    topic, topic_created = Topic.objects.get_or_create(
-                        subject=subject,
-                        title=topic_data['title'],
-                        defaults={
-                            'description': topic_data['description'],
-                            'order': i,
-                            'estimated_duration_hours': topic_data['hours'],
-                            'is_published': True
+        subjects = writer.upsert(Subject, [
+            {
+                'code': subject_data['code'],
+                'name': subject_data['name'],
+                'description': subject_data['description'],
+                'subject_type': 'core',
+                'is_active': True,
+            }
+            for subject_data in core_subjects_data
+        ], key_fields=['code'], label='Core subjects')
+        for code in sorted(subjects.created_keys):
+            self.stdout.write(f'Created core subject: {subjects.objects[code].name}')
+
+        # Topics and lessons for the core subjects just created
+        lesson_titles = {
+            'video': 'Introduction to {}',
+            'reading': '{} Study Material',
+            'quiz': '{} Assessment',
+        }
+        self.create_topics(writer, [
+            (subjects.objects[subject_data['code']], [
+                {
+                    'title': topic_data['title'],
+                    'description': topic_data['description'],
+                    'hours': topic_data['hours'],
+                    # The first lesson is free
+                    'lessons': [
+                        {
+                            'title': lesson_titles[lesson_type].format(topic_data['title']),
+                            'lesson_type': lesson_type,
+                            'is_free': j == 1,
+                            'video_duration_minutes': 30 if lesson_type == 'video' else None,
                         }
-                    )
-                    
-                    if topic_created:
-                        self.stdout.write(f'  Created topic: {topic.title}')
-                        
-                        # Create sample lessons for each topic
-                        lesson_types = ['video', 'reading', 'quiz']
-                        for j, lesson_type in enumerate(lesson_types, 1):
-                            lesson_title = f"{topic.title} - {lesson_type.title()}"
-                            if lesson_type == 'video':
-                                lesson_title = f"Introduction to {topic.title}"
-                            elif lesson_type == 'reading':
-                                lesson_title = f"{topic.title} Study Material"
-                            elif lesson_type == 'quiz':
-                                lesson_title = f"{topic.title} Assessment"
-                            
-                            Lesson.objects.get_or_create(
-                                topic=topic,
-                                title=lesson_title,
-                                defaults={
-                                    'lesson_type': lesson_type,
-                                    'order': j,
-                                    'is_free': j == 1,  # First lesson is free
-                                    'video_duration_minutes': 30 if lesson_type == 'video' else None
-                                }
-                            )
-            else:
-                self.stdout.write(f'Core subject already exists: {subject.name}')
+                        for j, lesson_type in enumerate(lesson_titles, 1)
+                    ],
+                }
+                for topic_data in subject_data['topics']
+            ])
+            for subject_data in core_subjects_data
+            if subject_data['code'] in subjects.created_keys
+        ])
 
         # Assign core subjects to all programmes
-        self.stdout.write('\nAssigning core subjects to all programmes...')
-        programmes = Programme.objects.all()
-        core_subjects = Subject.objects.filter(subject_type='core')
-        
-        for programme in programmes:
-            self.stdout.write(f'Processing programme: {programme.get_name_display()}')
-            
-            for i, subject in enumerate(core_subjects, 1):
-                prog_subject, created = ProgrammeSubject.objects.get_or_create(
-                    programme=programme,
-                    subject=subject,
-                    defaults={
-                        'is_required': True,
-                        'order': i
-                    }
-                )
-                
-                if created:
-                    self.stdout.write(f'  Assigned: {subject.name}')
+        programmes = list(Programme.objects.all())
+        core_subjects = list(Subject.objects.filter(subject_type='core'))
+        links = [
+            {'programme_id': programme.id, 'subject_id': subject.id, 'is_required': True, 'order': i}
+            for programme in programmes
+            for i, subject in enumerate(core_subjects, 1)
+        ]
 
         # Create programme-specific elective subjects
         self.stdout.write('\nCreating programme-specific elective subjects...')
@@ -181,83 +187,91 @@ class Command(BaseCommand):
             ]
         }
 
-        for programme in programmes:
-            programme_name = programme.name
-            if programme_name in elective_subjects_by_programme:
-                electives = elective_subjects_by_programme[programme_name]
-                
-                for i, elective_data in enumerate(electives, 1):
-                    # Create or get the elective subject
-                    subject, created = Subject.objects.get_or_create(
-                        code=elective_data['code'],
-                        defaults={
-                            'name': elective_data['name'],
-                            'description': elective_data['description'],
-                            'subject_type': 'elective',
-                            'is_active': True
-                        }
-                    )
-                    
-                    if created:
-                        self.stdout.write(f'Created elective subject: {subject.name}')
-                        
-                        # Create basic topics for elective subjects
-                        basic_topics = [
-                            {'title': f'Introduction to {subject.name}', 'description': f'Basic concepts in {subject.name}', 'hours': 6},
-                            {'title': f'Intermediate {subject.name}', 'description': f'Intermediate level concepts', 'hours': 8},
-                            {'title': f'Advanced {subject.name}', 'description': f'Advanced applications and theory', 'hours': 10},
-                        ]
-                        
-                        for j, topic_data in enumerate(basic_topics, 1):
-                            topic, topic_created = Topic.objects.get_or_create(
-                                subject=subject,
-                                title=topic_data['title'],
-                                defaults={
-                                    'description': topic_data['description'],
-                                    'order': j,
-                                    'estimated_duration_hours': topic_data['hours'],
-                                    'is_published': True
-                                }
-                            )
-                            
-                            if topic_created:
-                                # Create sample lessons
-                                for k, lesson_type in enumerate(['video', 'reading'], 1):
-                                    lesson_title = f"{topic.title} - {lesson_type.title()}"
-                                    Lesson.objects.get_or_create(
-                                        topic=topic,
-                                        title=lesson_title,
-                                        defaults={
-                                            'lesson_type': lesson_type,
-                                            'order': k,
-                                            'is_free': k == 1,
-                                            'video_duration_minutes': 25 if lesson_type == 'video' else None
-                                        }
-                                    )
-                    
-                    # Assign elective to programme
-                    prog_subject, created = ProgrammeSubject.objects.get_or_create(
-                        programme=programme,
-                        subject=subject,
-                        defaults={
-                            'is_required': False,
-                            'order': len(core_subjects) + i
+        electives = writer.upsert(Subject, [
+            {
+                'code': elective_data['code'],
+                'name': elective_data['name'],
+                'description': elective_data['description'],
+                'subject_type': 'elective',
+                'is_active': True,
+            }
+            for electives in elective_subjects_by_programme.values()
+            for elective_data in electives
+        ], key_fields=['code'], label='Elective subjects')
+        for code in sorted(electives.created_keys):
+            self.stdout.write(f'Created elective subject: {electives.objects[code].name}')
+
+        # Create basic topics, each with sample lessons, for the electives just created
+        self.create_topics(writer, [
+            (electives.objects[code], [
+                {
+                    'title': title.format(electives.objects[code].name),
+                    'description': description.format(electives.objects[code].name),
+                    'hours': hours,
+                    'lessons': [
+                        {
+                            'title': f"{title.format(electives.objects[code].name)} - {lesson_type.title()}",
+                            'lesson_type': lesson_type,
+                            'is_free': k == 1,
+                            'video_duration_minutes': 25 if lesson_type == 'video' else None,
                         }
-                    )
-                    
-                    if created:
-                        self.stdout.write(f'  Assigned elective to {programme.get_name_display()}: {subject.name}')
+                        for k, lesson_type in enumerate(['video', 'reading'], 1)
+                    ],
+                }
+                for title, description, hours in [
+                    ('Introduction to {}', 'Basic concepts in {}', 6),
+                    ('Intermediate {}', 'Intermediate level concepts', 8),
+                    ('Advanced {}', 'Advanced applications and theory', 10),
+                ]
+            ])
+            for code in sorted(electives.created_keys)
+        ])
 
-        self.stdout.write(self.style.SUCCESS('\nSuccessfully populated shared subjects!'))
-        
-        # Print summary
-        total_subjects = Subject.objects.count()
-        core_count = Subject.objects.filter(subject_type='core').count()
-        elective_count = Subject.objects.filter(subject_type='elective').count()
-        
-        self.stdout.write(f'\nSummary:')
-        self.stdout.write(f'Total subjects: {total_subjects}')
-        self.stdout.write(f'Core subjects: {core_count}')
-        self.stdout.write(f'Elective subjects: {elective_count}')
-        self.stdout.write(f'Total topics: {Topic.objects.count()}')
-        self.stdout.write(f'Total lessons: {Lesson.objects.count()}')
\ No newline at end of file
+        # Assign electives to programmes
+        for programme in programmes:
+            for i, elective_data in enumerate(elective_subjects_by_programme.get(programme.name, []), 1):
+                links.append({
+                    'programme_id': programme.id,
+                    'subject_id': electives.objects[elective_data['code']].id,
+                    'is_required': False,
+                    'order': len(core_subjects) + i,
+                })
+        writer.upsert(ProgrammeSubject, links, key_fields=['programme_id', 'subject_id'], label='Programme-subject links')
+
+    def create_topics(self, writer, subject_topics):
+        """
+        Create topics and their lessons in two bulk writes
+
+        Args:
+            subject_topics: [(subject, [{'title', 'description', 'hours', 'lessons': [...]}, ...]), ...]
+                Lessons are only created for topics that are created.
+        """
+        topic_rows = [
+            {
+                'subject_id': subject.id,
+                'title': topic_data['title'],
+                'description': topic_data['description'],
+                'order': i,
+                'estimated_duration_hours': topic_data['hours'],
+                'is_published': True,
+            }
+            for subject, topics in subject_topics
+            for i, topic_data in enumerate(topics, 1)
+        ]
+        topics = writer.upsert(
+            Topic, topic_rows, key_fields=['subject_id', 'title'], conflict_fields=[('subject_id', 'order')]
+        )
+
+        lesson_rows = []
+        for subject, topics_data in subject_topics:
+            for topic_data in topics_data:
+                key = (subject.id, topic_data['title'])
+                if key not in topics.created_keys:
+                    continue
+                topic = topics.objects[key]
+                self.stdout.write(f'  Created topic: {topic.title}')
+                for k, lesson_data in enumerate(topic_data['lessons'], 1):
+                    lesson_rows.append(dict(lesson_data, topic_id=topic.id, order=k))
+        writer.upsert(
+            Lesson, lesson_rows, key_fields=['topic_id', 'title'], conflict_fields=[('topic_id', 'order')]
+        )
@@ -0,0 +1,38 @@
+"""
+Django management command to rebuild per-subject lesson progress from LessonCompletion
+Usage: python manage.py rebuild_subject_progress [--username USERNAME]
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import LessonCompletion, SubjectProgress
+from courses.progress import rebuild_subject_progress
+
+
+class Command(BaseCommand):
+    help = 'Backfill or repair SubjectProgress counts from LessonCompletion'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            help='Only rebuild progress for this user',
+        )
+
+    def handle(self, *args, **options):
+        students = None
+        if options['username']:
+            students = User.objects.filter(username=options['username'])
+            if not students.exists():
+                raise CommandError(f"User '{options['username']}' not found")
+
+        self.stdout.write("Rebuilding subject progress from lesson completions...")
+
+        rows = rebuild_subject_progress(students)
+
+        completions = LessonCompletion.objects.all()
+        if students is not None:
+            completions = completions.filter(student__in=students)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {rows} subject progress rows"))
+        self.stdout.write(f"  • Lesson completions counted: {completions.count()}")
+        self.stdout.write(f"  • Total subject progress rows: {SubjectProgress.objects.count()}")
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_subject_progress(apps, schema_editor):
+    LessonCompletion = apps.get_model('courses', 'LessonCompletion')
+    SubjectProgress = apps.get_model('courses', 'SubjectProgress')
+    rows = LessonCompletion.objects.values('student_id', 'lesson__topic__subject_id').annotate(
+        count=models.Count('id'),
+        latest=models.Max('completed_at')
+    )
+    SubjectProgress.objects.bulk_create(
+        [
+            SubjectProgress(
+                student_id=row['student_id'],
+                subject_id=row['lesson__topic__subject_id'],
+                lessons_completed=row['count'],
+                last_completed_at=row['latest'],
+            )
+            for row in rows
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_add_instructors'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lessons_completed', models.PositiveIntegerField(default=0)),
+                ('last_completed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_progress', to=settings.AUTH_USER_MODEL)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_progress', to='courses.subject')),
+            ],
+            options={
+                'verbose_name_plural': 'Subject progress',
+                'unique_together': {('student', 'subject')},
+            },
+        ),
+        migrations.RunPython(backfill_subject_progress, migrations.RunPython.noop),
+    ]
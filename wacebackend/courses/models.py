@@ -122,6 +122,22 @@ class LessonCompletion(models.Model):
         return f"{self.student.username} - {self.lesson.title}"
 
 
+class SubjectProgress(models.Model):
+    """Running count of the lessons each student has completed in a subject, kept in step with LessonCompletion"""
+    student = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='subject_progress')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='student_progress')
+    lessons_completed = models.PositiveIntegerField(default=0)
+    last_completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['student', 'subject']
+        verbose_name_plural = 'Subject progress'
+    
+    def __str__(self):
+        return f"{self.student.username} - {self.subject.name}: {self.lessons_completed} lessons"
+
+
 class Announcement(models.Model):
     """System-wide announcements for students"""
     PRIORITY_CHOICES = [
@@ -0,0 +1,275 @@
+"""
+Lesson completion and per-subject progress for the courses app
+
+LessonCompletion rows are the source of truth; SubjectProgress keeps a
+running count per student and subject so that dashboards read one row
+per subject instead of recounting completions. Both are always written
+in the same transaction. When lessons are deleted or lessons and topics
+move to another subject, signal handlers (see signals.py) recount the
+subjects involved. Run `python manage.py rebuild_subject_progress` to
+repair the counts after bulk edits that send no signals.
+"""
+from datetime import timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Lesson, LessonCompletion, SubjectProgress
+
+
+def lock_student(student):
+    """
+    Lock the student's user row until the end of the transaction
+
+    Every completion helper takes this lock first, so one student's
+    completion writes run one at a time and each sees the others' results.
+    """
+    list(get_user_model().objects.select_for_update().filter(pk=student.pk).values_list('pk', flat=True))
+
+
+def recount_subject_progress(subject_ids, students=None):
+    """
+    Set SubjectProgress for some subjects to the number of completions actually stored
+
+    Args:
+        subject_ids: Subjects to recount
+        students: Optional queryset/list of users to recount (default: everyone)
+    """
+    completions = LessonCompletion.objects.filter(lesson__topic__subject_id__in=subject_ids)
+    progress = SubjectProgress.objects.filter(subject_id__in=subject_ids)
+    if students is not None:
+        completions = completions.filter(student__in=students)
+        progress = progress.filter(student__in=students)
+
+    rows = completions.order_by().values('student_id', 'lesson__topic__subject_id').annotate(
+        count=Count('id'),
+        latest=Max('completed_at')
+    )
+    now = timezone.now()
+    with transaction.atomic():
+        progress.update(lessons_completed=0, updated_at=now)
+        SubjectProgress.objects.bulk_create(
+            [
+                SubjectProgress(
+                    student_id=row['student_id'],
+                    subject_id=row['lesson__topic__subject_id'],
+                    lessons_completed=row['count'],
+                    last_completed_at=row['latest'],
+                )
+                for row in rows
+            ],
+            update_conflicts=True,
+            unique_fields=['student', 'subject'],
+            update_fields=['lessons_completed', 'last_completed_at', 'updated_at'],
+            batch_size=1000
+        )
+
+
+def apply_progress_deltas(student, deltas):
+    """
+    Add per-subject changes to the student's completed lesson counts
+
+    Args:
+        student: The auth.User whose progress changed
+        deltas: Dict mapping subject_id to the change in completed lessons
+    """
+    now = timezone.now()
+    for subject_id, delta in deltas.items():
+        if not delta:
+            continue
+        progress, _ = SubjectProgress.objects.get_or_create(student=student, subject_id=subject_id)
+        updates = {
+            'lessons_completed': Greatest(F('lessons_completed') + delta, 0),
+            'updated_at': now,
+        }
+        if delta > 0:
+            updates['last_completed_at'] = now
+        SubjectProgress.objects.filter(pk=progress.pk).update(**updates)
+
+
+def mark_complete(student, lesson):
+    """
+    Record that a student completed a lesson
+
+    Returns:
+        Tuple of (LessonCompletion, created)
+    """
+    with transaction.atomic():
+        lock_student(student)
+        completion, created = LessonCompletion.objects.get_or_create(
+            student=student,
+            lesson=lesson
+        )
+        if created:
+            apply_progress_deltas(student, {lesson.topic.subject_id: 1})
+    return completion, created
+
+
+def unmark_complete(student, lesson):
+    """
+    Remove a student's completion of a lesson
+
+    Returns:
+        Number of completion rows deleted (0 or 1)
+    """
+    with transaction.atomic():
+        lock_student(student)
+        deleted_count, _ = LessonCompletion.objects.filter(
+            student=student,
+            lesson=lesson
+        ).delete()
+        if deleted_count:
+            apply_progress_deltas(student, {lesson.topic.subject_id: -deleted_count})
+    return deleted_count
+
+
+def rebuild_subject_progress(students=None):
+    """
+    Recompute SubjectProgress from LessonCompletion
+
+    Args:
+        students: Optional queryset/list of users to rebuild (default: everyone)
+
+    Returns:
+        Number of SubjectProgress rows written
+    """
+    completions = LessonCompletion.objects.all()
+    progress = SubjectProgress.objects.all()
+    if students is not None:
+        completions = completions.filter(student__in=students)
+        progress = progress.filter(student__in=students)
+
+    rows = completions.values('student_id', 'lesson__topic__subject_id').annotate(
+        count=Count('id'),
+        latest=Max('completed_at')
+    )
+
+    with transaction.atomic():
+        progress.delete()
+        SubjectProgress.objects.bulk_create(
+            [
+                SubjectProgress(
+                    student_id=row['student_id'],
+                    subject_id=row['lesson__topic__subject_id'],
+                    lessons_completed=row['count'],
+                    last_completed_at=row['latest'],
+                )
+                for row in rows
+            ],
+            batch_size=1000
+        )
+    return len(rows)
+
+
+# Maximum number of events accepted by one batch completion request
+MAX_COMPLETION_EVENTS = 500
+
+
+def _event_timestamp(value):
+    """Client timestamp as epoch seconds: ISO 8601 string or epoch milliseconds (JS Date.now())"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value / 1000
+    if isinstance(value, str):
+        parsed = parse_datetime(value)
+        if parsed is not None:
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed, dt_timezone.utc)
+            return parsed.timestamp()
+    raise ValueError('client_timestamp must be an ISO 8601 string or epoch milliseconds')
+
+
+def apply_completion_events(student, events):
+    """
+    Apply a queue of offline completion events idempotently
+
+    Events for the same lesson are collapsed so the one with the latest
+    client_timestamp wins (events without a timestamp sort first; later
+    events win ties). All changes are written with one bulk insert and
+    one bulk delete in a single transaction, holding the student's lock
+    (see lock_student()) so the statuses reflect what was written. The
+    changed subjects are then recounted from the stored completions.
+
+    Args:
+        student: The auth.User the events belong to
+        events: List of dicts with lesson_id, completed (default True) and
+            an optional client_timestamp
+
+    Returns:
+        List of per-event results, in request order, each with index,
+        lesson_id and status
+    """
+    results = [None] * len(events)
+    latest = {}  # lesson_id -> ((timestamp, index), index, completed)
+
+    for index, event in enumerate(events):
+        try:
+            if not isinstance(event, dict):
+                raise ValueError('event must be an object')
+            lesson_id = int(event['lesson_id'])
+            completed = event.get('completed', True)
+            if not isinstance(completed, bool):
+                raise ValueError('completed must be true or false')
+            timestamp = _event_timestamp(event.get('client_timestamp'))
+        except (KeyError, TypeError, ValueError) as e:
+            lesson_id = event.get('lesson_id') if isinstance(event, dict) else None
+            results[index] = {'index': index, 'lesson_id': lesson_id, 'status': 'invalid', 'error': str(e)}
+            continue
+
+        current = latest.get(lesson_id)
+        sort_key = (timestamp if timestamp is not None else float('-inf'), index)
+        if current is None or sort_key >= current[0]:
+            if current is not None:
+                results[current[1]] = {'index': current[1], 'lesson_id': lesson_id, 'status': 'superseded'}
+            latest[lesson_id] = (sort_key, index, completed)
+        else:
+            results[index] = {'index': index, 'lesson_id': lesson_id, 'status': 'superseded'}
+
+    subject_by_lesson = dict(
+        Lesson.objects.filter(id__in=latest.keys()).order_by().values_list('id', 'topic__subject_id')
+    )
+    with transaction.atomic():
+        lock_student(student)
+        already_completed = set(
+            LessonCompletion.objects.filter(
+                student=student,
+                lesson_id__in=subject_by_lesson.keys()
+            ).order_by().values_list('lesson_id', flat=True)
+        )
+
+        to_create = []
+        to_delete = []
+        changed_subjects = set()
+        for lesson_id, (_, index, completed) in latest.items():
+            if lesson_id not in subject_by_lesson:
+                status = 'not_found'
+            elif completed and lesson_id in already_completed:
+                status = 'already_completed'
+            elif completed:
+                status = 'completed'
+                to_create.append(LessonCompletion(student=student, lesson_id=lesson_id))
+            elif lesson_id in already_completed:
+                status = 'uncompleted'
+                to_delete.append(lesson_id)
+            else:
+                status = 'not_completed'
+
+            if status in ('completed', 'uncompleted'):
+                changed_subjects.add(subject_by_lesson[lesson_id])
+            results[index] = {'index': index, 'lesson_id': lesson_id, 'status': status}
+
+        if to_create:
+            LessonCompletion.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_delete:
+            LessonCompletion.objects.filter(student=student, lesson_id__in=to_delete).delete()
+        if changed_subjects:
+            # Counted from the rows themselves rather than applied as deltas, so
+            # a completion written outside these helpers can't make them drift
+            recount_subject_progress(changed_subjects, students=[student])
+
+    return results
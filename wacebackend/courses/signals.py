@@ -0,0 +1,93 @@
+"""
+Signal handlers for the courses app
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.utils import timezone
+
+from students.models import Programme
+from .catalog import bump_catalog_version
+from .progress import recount_subject_progress
+from .models import Subject, ProgrammeSubject, Topic, Lesson, Instructor, InstructorSpecialty
+
+# Models whose rows appear in the public catalog snapshots
+CATALOG_MODELS = (Programme, Subject, ProgrammeSubject, Topic, Lesson)
+
+
+def invalidate_catalog(sender, **kwargs):
+    """Bump the catalog version once the transaction editing the catalog commits"""
+    transaction.on_commit(bump_catalog_version)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog, sender=model, dispatch_uid=f'catalog_save_{model.__name__}')
+    post_delete.connect(invalidate_catalog, sender=model, dispatch_uid=f'catalog_delete_{model.__name__}')
+
+
+def touch_lesson_topic(sender, instance, **kwargs):
+    """Lesson edits change their topic, so keep Topic.updated_at (used for Last-Modified) current"""
+    Topic.objects.filter(pk=instance.topic_id).update(updated_at=timezone.now())
+
+
+def touch_specialty_instructor(sender, instance, **kwargs):
+    """Specialties are part of an instructor's public profile"""
+    Instructor.objects.filter(pk=instance.instructor_id).update(updated_at=timezone.now())
+
+
+post_save.connect(touch_lesson_topic, sender=Lesson, dispatch_uid='touch_lesson_topic_save')
+post_delete.connect(touch_lesson_topic, sender=Lesson, dispatch_uid='touch_lesson_topic_delete')
+post_save.connect(touch_specialty_instructor, sender=InstructorSpecialty, dispatch_uid='touch_specialty_instructor_save')
+post_delete.connect(touch_specialty_instructor, sender=InstructorSpecialty, dispatch_uid='touch_specialty_instructor_delete')
+
+
+# SubjectProgress counts completions per subject. Deleting a lesson deletes
+# its completions and moving a lesson or topic moves them to another
+# subject, so recount the subjects involved. Queryset updates and deletes
+# bypass these handlers; rebuild_subject_progress repairs those.
+
+def _lesson_subject_id(lesson_id):
+    return Lesson.objects.filter(pk=lesson_id).values_list('topic__subject_id', flat=True).first()
+
+
+def remember_lesson_subject(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.pk is None or (update_fields is not None and 'topic' not in update_fields):
+        return
+    instance._progress_subject_id = _lesson_subject_id(instance.pk)
+
+
+def recount_moved_lesson(sender, instance, created=False, raw=False, **kwargs):
+    old_subject_id = instance.__dict__.pop('_progress_subject_id', None)
+    if raw or created or old_subject_id is None:
+        return
+    new_subject_id = _lesson_subject_id(instance.pk)
+    if new_subject_id != old_subject_id:
+        recount_subject_progress([old_subject_id, new_subject_id])
+
+
+def recount_deleted_lesson(sender, instance, **kwargs):
+    # Runs after the cascade has removed the lesson's completions
+    subject_id = instance.__dict__.pop('_progress_subject_id', None)
+    if subject_id is not None:
+        recount_subject_progress([subject_id])
+
+
+def remember_topic_subject(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.pk is None or (update_fields is not None and 'subject' not in update_fields):
+        return
+    instance._progress_subject_id = Topic.objects.filter(pk=instance.pk).values_list('subject_id', flat=True).first()
+
+
+def recount_moved_topic(sender, instance, created=False, raw=False, **kwargs):
+    old_subject_id = instance.__dict__.pop('_progress_subject_id', None)
+    if raw or created or old_subject_id is None:
+        return
+    if instance.subject_id != old_subject_id:
+        recount_subject_progress([old_subject_id, instance.subject_id])
+
+
+pre_save.connect(remember_lesson_subject, sender=Lesson, dispatch_uid='progress_lesson_pre_save')
+post_save.connect(recount_moved_lesson, sender=Lesson, dispatch_uid='progress_lesson_post_save')
+pre_delete.connect(remember_lesson_subject, sender=Lesson, dispatch_uid='progress_lesson_pre_delete')
+post_delete.connect(recount_deleted_lesson, sender=Lesson, dispatch_uid='progress_lesson_post_delete')
+pre_save.connect(remember_topic_subject, sender=Topic, dispatch_uid='progress_topic_pre_save')
+post_save.connect(recount_moved_topic, sender=Topic, dispatch_uid='progress_topic_post_save')
@@ -1,3 +1,527 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from students.models import Programme, Student
+from .catalog import CATALOG_VERSION_KEY
+from .utils import SignedURLCache, VideoURLSigner
+from .models import Subject, ProgrammeSubject, Topic, Lesson, LessonCompletion, SubjectProgress
+
+
+class ProgrammesListQueryTests(TestCase):
+    """programmes_list must not issue per-programme or per-subject queries"""
+
+    def setUp(self):
+        cache.clear()
+
+    def create_catalog(self, programme_names, subjects_per_programme, topics_per_subject):
+        # Catalog edits only invalidate the snapshot once they commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_catalog(programme_names, subjects_per_programme, topics_per_subject)
+
+    def _create_catalog(self, programme_names, subjects_per_programme, topics_per_subject):
+        for programme_name in programme_names:
+            programme = Programme.objects.create(
+                name=programme_name, description=programme_name, price=100
+            )
+            for i in range(subjects_per_programme):
+                subject = Subject.objects.create(
+                    name=f'{programme_name} {i}',
+                    code=f'P{programme.id}S{i}',
+                    description='',
+                    subject_type='core' if i % 2 else 'elective',
+                )
+                ProgrammeSubject.objects.create(programme=programme, subject=subject, order=i)
+                for order in range(topics_per_subject):
+                    Topic.objects.create(subject=subject, title=f'Topic {order}', order=order)
+
+    def test_query_count_is_constant(self):
+        self.create_catalog(['general_science'], subjects_per_programme=1, topics_per_subject=1)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('programmes_list'))
+
+        self.create_catalog(['business', 'general_arts', 'visual_arts'], subjects_per_programme=5, topics_per_subject=3)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('programmes_list'))
+
+        # Served from the catalog snapshot until the catalog changes again
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('programmes_list')).content, response.content)
+
+        data = response.json()
+        self.assertEqual(data['total_count'], 4)
+        business = next(p for p in data['programmes'] if p['name'] == 'business')
+        self.assertEqual(len(business['core_subjects']) + len(business['elective_subjects']), 5)
+        self.assertTrue(all(s['topics_count'] == 3 for s in business['core_subjects']))
+
+
+class CatalogSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.programme = Programme.objects.create(name='business', description='Business', price=100)
+        self.subject = Subject.objects.create(name='Economics', code='ECON', description='', subject_type='elective')
+        ProgrammeSubject.objects.create(programme=self.programme, subject=self.subject)
+
+    def test_catalog_edit_rebuilds_snapshot(self):
+        url = reverse('programme_detail', args=[self.programme.id])
+        self.assertEqual(self.client.get(url).json()['subjects']['elective'][0]['topics_count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Topic.objects.create(subject=self.subject, title='Demand and Supply', order=1)
+
+        self.assertEqual(self.client.get(url).json()['subjects']['elective'][0]['topics_count'], 1)
+
+    def test_snapshot_written_after_a_bump_elsewhere_prunes_old_files(self):
+        url = reverse('programme_detail', args=[self.programme.id])
+        with tempfile.TemporaryDirectory() as snapshot_dir, override_settings(CATALOG_SNAPSHOT_DIR=snapshot_dir):
+            self.client.get(url)
+            old_files = os.listdir(snapshot_dir)
+            self.assertEqual(len(old_files), 1)
+
+            # The version was bumped by another process, e.g. the job worker
+            cache.set(CATALOG_VERSION_KEY, 'bumpedelsewhere', timeout=None)
+            self.client.get(url)
+            new_files = os.listdir(snapshot_dir)
+            self.assertEqual(len(new_files), 1)
+            self.assertNotEqual(new_files, old_files)
+
+    def test_unknown_programme_is_not_found(self):
+        response = self.client.get(reverse('programme_detail', args=[self.programme.id + 1]))
+        self.assertEqual(response.status_code, 404)
+
+
+class SubjectDetailConditionalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.subject = Subject.objects.create(name='Physics', code='PHY', description='', subject_type='elective')
+        self.topic = Topic.objects.create(subject=self.subject, title='Motion', order=1)
+
+    def test_unchanged_subject_returns_304(self):
+        url = reverse('subject_detail', args=[self.subject.id])
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.create(topic=self.topic, title='Speed', lesson_type='reading', order=1)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unmarking_a_lesson_invalidates_the_response(self):
+        lesson = Lesson.objects.create(topic=self.topic, title='Speed', lesson_type='reading', order=1)
+        user = User.objects.create_user('abena', password='secret')
+        self.client.force_login(user)
+        url = reverse('subject_detail', args=[self.subject.id])
+
+        LessonCompletion.objects.create(student=user, lesson=lesson)
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('Last-Modified'))
+        etag = response['ETag']
+
+        LessonCompletion.objects.filter(student=user, lesson=lesson).delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['topics'][0]['lessons'][0]['is_completed'])
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date()).status_code, 200)
+
+
+class LessonFieldsAndAccessTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.programme = Programme.objects.create(name='general_science', description='', price=100)
+        self.subject = Subject.objects.create(name='Physics', code='PHY', description='', subject_type='elective')
+        ProgrammeSubject.objects.create(programme=self.programme, subject=self.subject)
+        topic = Topic.objects.create(subject=self.subject, title='Motion', order=1)
+        self.free = Lesson.objects.create(
+            topic=topic, title='Intro', lesson_type='video', order=1, is_free=True,
+            video_url='https://videos.example.com/intro.mp4', content='Intro body', notes='Intro notes'
+        )
+        self.paid = Lesson.objects.create(
+            topic=topic, title='Speed', lesson_type='video', order=2,
+            video_url='https://videos.example.com/speed.mp4', content='Speed body', notes='Speed notes'
+        )
+        self.url = reverse('subject_detail', args=[self.subject.id])
+        for name, side_effect in (
+            ('generate_signed_video_url', lambda url, **kwargs: f'{url}?signed'),
+            ('generate_signed_video_urls', lambda urls, **kwargs: {url: f'{url}?signed' for url in urls}),
+        ):
+            patcher = mock.patch(f'courses.views.{name}', side_effect=side_effect)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def sign_in(self, programme=None):
+        user = User.objects.create_user(f'user{User.objects.count()}', password='secret')
+        if programme is not None:
+            Student.objects.create(
+                user=user, phone_number='0240000000', date_of_birth='2006-01-01', programme=programme,
+                previous_school='Tema SHS', wassce_year=2024, index_number=f'00{user.id}'
+            )
+        self.client.force_login(user)
+        return user
+
+    def lessons(self, **params):
+        return self.client.get(self.url, params).json()['topics'][0]['lessons']
+
+    def test_field_selection(self):
+        lessons = self.lessons(fields='title, notes,password')
+        self.assertEqual(lessons[0], {'id': self.free.id, 'title': 'Intro', 'notes': 'Intro notes'})
+
+        outline = self.lessons(outline='1')[1]
+        self.assertEqual(set(outline), {
+            'id', 'title', 'lesson_type', 'order', 'is_free', 'video_duration_minutes', 'is_completed'
+        })
+        self.assertEqual(len(self.lessons()[0]), 10)
+
+    def test_unrequested_bodies_are_deferred_and_videos_not_signed(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.lessons(outline='true')
+        self.generate_signed_video_urls.assert_not_called()
+        lesson_sql = [query['sql'] for query in queries if 'FROM "courses_lesson"' in query['sql']]
+        self.assertEqual(len(lesson_sql), 1)
+        self.assertNotIn('"courses_lesson"."content"', lesson_sql[0])
+        self.assertNotIn('"courses_lesson"."notes"', lesson_sql[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.lessons(fields='notes')
+        lesson_sql = [query['sql'] for query in queries if 'FROM "courses_lesson"' in query['sql']]
+        self.assertNotIn('"courses_lesson"."content"', lesson_sql[0])
+        self.assertIn('"courses_lesson"."notes"', lesson_sql[0])
+
+    def test_subject_detail_signs_paid_videos_for_enrolled_students_only(self):
+        anonymous = self.lessons(fields='video_url')
+        self.assertEqual([lesson['video_url'] for lesson in anonymous], [f'{self.free.video_url}?signed', None])
+
+        self.sign_in(programme=Programme.objects.create(name='business', description='', price=100))
+        self.assertIsNone(self.lessons(fields='video_url')[1]['video_url'])
+
+        self.sign_in(programme=self.programme)
+        self.assertEqual(self.lessons(fields='video_url')[1]['video_url'], f'{self.paid.video_url}?signed')
+
+    def lesson(self, lesson):
+        response = self.client.get(reverse('lesson_detail', args=[lesson.id]))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_lesson_detail_access(self):
+        # Anonymous visitors: free previews only
+        self.assertEqual(self.lesson(self.free)['video_url'], f'{self.free.video_url}?signed')
+        paid = self.lesson(self.paid)
+        self.assertIsNone(paid['video_url'])
+        self.assertEqual((paid['content'], paid['notes'], paid['is_completed']), ('Speed body', 'Speed notes', False))
+
+        # Signed in, but the subject isn't in their programme (or they have no student profile)
+        self.sign_in(programme=Programme.objects.create(name='business', description='', price=100))
+        self.assertIsNone(self.lesson(self.paid)['video_url'])
+        self.sign_in()
+        self.assertIsNone(self.lesson(self.paid)['video_url'])
+
+        user = self.sign_in(programme=self.programme)
+        LessonCompletion.objects.create(student=user, lesson=self.paid)
+        paid = self.lesson(self.paid)
+        self.assertEqual(paid['video_url'], f'{self.paid.video_url}?signed')
+        self.assertTrue(paid['is_completed'])
+
+        self.assertEqual(self.client.get(reverse('lesson_detail', args=[self.paid.id + 100])).status_code, 404)
+
+
+class SubjectProgressTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ama', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.subject = Subject.objects.create(name='Biology', code='BIO', description='')
+        topic = Topic.objects.create(subject=self.subject, title='Cells', order=1)
+        self.lessons = [
+            Lesson.objects.create(topic=topic, title=f'Lesson {i}', lesson_type='reading', order=i)
+            for i in range(3)
+        ]
+
+    def lessons_completed(self):
+        return SubjectProgress.objects.get(student=self.user, subject=self.subject).lessons_completed
+
+    def test_completion_updates_progress(self):
+        for lesson in self.lessons:
+            self.client.post(reverse('mark_lesson_complete', args=[lesson.id]))
+        self.client.post(reverse('mark_lesson_complete', args=[self.lessons[0].id]))
+        self.assertEqual(self.lessons_completed(), 3)
+
+        self.client.delete(reverse('unmark_lesson_complete', args=[self.lessons[0].id]))
+        self.client.delete(reverse('unmark_lesson_complete', args=[self.lessons[0].id]))
+        self.assertEqual(self.lessons_completed(), 2)
+
+    def test_rebuild_command_repairs_progress(self):
+        LessonCompletion.objects.create(student=self.user, lesson=self.lessons[0])
+        LessonCompletion.objects.create(student=self.user, lesson=self.lessons[1])
+        call_command('rebuild_subject_progress', stdout=StringIO())
+        self.assertEqual(self.lessons_completed(), 2)
+
+    def test_deleted_and_moved_lessons_are_recounted(self):
+        for lesson in self.lessons:
+            self.client.post(reverse('mark_lesson_complete', args=[lesson.id]))
+        self.lessons[0].delete()
+        self.assertEqual(self.lessons_completed(), 2)
+
+        chemistry = Subject.objects.create(name='Chemistry', code='CHEM', description='')
+        lesson = self.lessons[1]
+        lesson.topic = Topic.objects.create(subject=chemistry, title='Atoms', order=1)
+        lesson.save()
+        self.assertEqual(self.lessons_completed(), 1)
+        self.assertEqual(SubjectProgress.objects.get(student=self.user, subject=chemistry).lessons_completed, 1)
+
+        topic = lesson.topic
+        topic.subject = self.subject
+        topic.order = 2
+        topic.save()
+        self.assertEqual(self.lessons_completed(), 2)
+        self.assertEqual(SubjectProgress.objects.get(student=self.user, subject=chemistry).lessons_completed, 0)
+
+    def test_topics_progress_for_many_topics(self):
+        other_topic = Topic.objects.create(subject=self.subject, title='Genetics', order=2)
+        Lesson.objects.create(topic=other_topic, title='DNA', lesson_type='reading', order=1)
+        self.client.post(reverse('mark_lesson_complete', args=[self.lessons[0].id]))
+
+        ids = f'{self.lessons[0].topic_id},{other_topic.id}'
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('get_topics_progress'), {'ids': ids})
+        progress = {topic['topic_id']: topic for topic in response.json()['topics']}
+        self.assertEqual(progress[self.lessons[0].topic_id]['completed_lessons'], 1)
+        self.assertEqual(progress[self.lessons[0].topic_id]['progress_percentage'], 33.3)
+        self.assertEqual(progress[other_topic.id]['completed_lessons'], 0)
+
+    def test_batch_completion_replay(self):
+        url = reverse('batch_lesson_completion')
+        events = [
+            {'lesson_id': self.lessons[0].id, 'completed': True, 'client_timestamp': '2025-01-01T10:00:00Z'},
+            {'lesson_id': self.lessons[1].id, 'completed': True, 'client_timestamp': '2025-01-01T10:01:00Z'},
+            {'lesson_id': self.lessons[1].id, 'completed': False, 'client_timestamp': '2025-01-01T10:02:00Z'},
+            {'lesson_id': self.lessons[2].id, 'completed': True},
+            {'lesson_id': 999999, 'completed': True},
+            {'completed': True},
+        ]
+        response = self.client.post(url, {'events': events}, format='json')
+        statuses = [result['status'] for result in response.json()['results']]
+        self.assertEqual(
+            statuses,
+            ['completed', 'superseded', 'not_completed', 'completed', 'not_found', 'invalid']
+        )
+        self.assertEqual(self.lessons_completed(), 2)
+
+        # Replaying the same queue changes nothing
+        with self.assertNumQueries(5):
+            response = self.client.post(url, {'events': events}, format='json')
+        self.assertEqual(response.json()['summary']['already_completed'], 2)
+        self.assertEqual(self.lessons_completed(), 2)
+
+    def test_batch_counts_rows_actually_written(self):
+        # Completed by another request since the client read its state
+        LessonCompletion.objects.create(student=self.user, lesson=self.lessons[0])
+        events = [{'lesson_id': lesson.id, 'completed': True} for lesson in self.lessons[:2]]
+        response = self.client.post(reverse('batch_lesson_completion'), {'events': events}, format='json')
+        statuses = [result['status'] for result in response.json()['results']]
+        self.assertEqual(statuses, ['already_completed', 'completed'])
+        self.assertEqual(self.lessons_completed(), 2)
+
+
+class BulkPopulateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Programme.objects.create(name='business', description='Business', price=100)
+
+    def populate(self, *args):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(*args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_writes_nothing(self):
+        output = self.populate('populate_subjects', '--dry-run')
+        self.assertIn('Elective subjects: 27 to create', output)
+        self.assertFalse(Subject.objects.exists())
+
+    def test_reseed_is_idempotent_and_keeps_edits(self):
+        self.populate('populate_subjects')
+        self.populate('populate_topics')
+        self.assertEqual(ProgrammeSubject.objects.count(), 10)
+        topic = Topic.objects.get(subject__code='ECON', title='Demand and Supply')
+        topic.description = 'Edited by an admin'
+        topic.save()
+
+        with self.assertNumQueries(4):
+            output = self.populate('populate_topics')
+        self.assertIn('Topics: 0 created, 0 updated', output)
+        topic.refresh_from_db()
+        self.assertEqual(topic.description, 'Edited by an admin')
+
+    def test_bulk_writes_refresh_catalog_and_search(self):
+        from search.models import SearchDocument
+        self.populate('populate_subjects')
+        url = reverse('programme_detail', args=[Programme.objects.get().id])
+
+        def topics_count():
+            subjects = self.client.get(url).json()['subjects']
+            return sum(subject['topics_count'] for subject in subjects['core'] + subjects['elective'])
+
+        self.assertEqual(topics_count(), 0)
+        self.populate('populate_topics')
+        self.assertEqual(topics_count(), Topic.objects.filter(subject__programme_subjects__isnull=False).count())
+        self.assertEqual(SearchDocument.objects.filter(kind='topic').count(), Topic.objects.count())
+
+
+class UpdateVideoUrlsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for code, name in [('ENG', 'English Language'), ('ECON', 'Economics')]:
+            subject = Subject.objects.create(name=name, code=code, subject_type='core')
+            for order, title in enumerate(['Basics', 'Essay Writing'], start=1):
+                topic = Topic.objects.create(subject=subject, title=title, order=order)
+                Lesson.objects.create(topic=topic, title=f'{title} video', lesson_type='video', order=1)
+                Lesson.objects.create(topic=topic, title=f'{title} notes', lesson_type='reading', order=2)
+        self.kept = Lesson.objects.filter(topic__subject__code='ECON', lesson_type='video').first()
+        self.kept.video_url = 'https://example.com/kept.mp4'
+        self.kept.save()
+
+    def run_command(self, *args):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('update_all_video_urls', *args, stdout=out)
+        return out.getvalue()
+
+    def mapping_file(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_mapping_file_fills_empty_urls_with_one_update_per_url(self):
+        path = self.mapping_file('.csv', (
+            'subject,topic,video_url\n'
+            'ENG,,https://example.com/eng.mp4\n'
+            'English Language,Essay Writing,https://example.com/essay.mp4\n'
+            'Economics,,https://example.com/econ.mp4\n'
+        ))
+        output = self.run_command('--mapping', path)
+
+        videos = dict(Lesson.objects.filter(lesson_type='video').values_list('id', 'video_url'))
+        eng = Lesson.objects.filter(topic__subject__code='ENG', lesson_type='video')
+        self.assertEqual(videos[eng.get(topic__title='Basics').id], 'https://example.com/eng.mp4')
+        self.assertEqual(videos[eng.get(topic__title='Essay Writing').id], 'https://example.com/essay.mp4')
+        self.assertEqual(videos[self.kept.id], 'https://example.com/kept.mp4')
+        self.assertEqual(list(Lesson.objects.filter(lesson_type='reading').values_list('video_url', flat=True)), [''] * 4)
+        self.assertIn('Lessons updated: 3', output)
+        self.assertIn('Lessons skipped (already have URLs): 1', output)
+        self.assertIn('UPDATE statements: 3', output)
+
+    def test_overwrite_and_dry_run(self):
+        path = self.mapping_file('.json', '{"ECON": "https://example.com/econ.mp4"}')
+        output = self.run_command('--mapping', path, '--overwrite', '--dry-run')
+        self.assertIn('Lessons to update: 2', output)
+        self.kept.refresh_from_db()
+        self.assertEqual(self.kept.video_url, 'https://example.com/kept.mp4')
+
+        self.run_command('--mapping', path, '--overwrite')
+        self.kept.refresh_from_db()
+        self.assertEqual(self.kept.video_url, 'https://example.com/econ.mp4')
+
+    def test_topic_mapping_reports_only_its_own_lessons(self):
+        path = self.mapping_file('.json', json.dumps([
+            {'subject': 'ECON', 'topic': 'essay writing', 'video_url': 'https://example.com/essay.mp4'}
+        ]))
+        output = self.run_command('--mapping', path)
+        self.assertIn('✅ Updated 1 video lessons', output)
+        self.assertIn('Lessons updated: 1', output)
+        self.assertIn('Lessons skipped (already have URLs): 0', output)
+        self.assertEqual(Lesson.objects.filter(lesson_type='video', video_url='').count(), 2)
+
+    def test_non_string_mapping_values_are_an_error(self):
+        path = self.mapping_file('.json', json.dumps([{'subject': 12, 'video_url': ['x']}]))
+        with self.assertRaisesMessage(CommandError, 'must be strings'):
+            self.run_command('--mapping', path)
+
+    def test_unknown_subject_is_an_error(self):
+        path = self.mapping_file('.csv', 'subject,topic,video_url\nPHYS,,https://example.com/phys.mp4\n')
+        with self.assertRaisesMessage(CommandError, 'Subjects not found: PHYS'):
+            self.run_command('--mapping', path)
+
+
+class SignedURLCacheTests(SimpleTestCase):
+    def test_lru_eviction_order(self):
+        cache = SignedURLCache(max_size=2, min_remaining=60)
+        cache.set('a.mp4', 3600, 'signed-a', now=0)
+        cache.set('b.mp4', 3600, 'signed-b', now=0)
+        self.assertEqual(cache.get('a.mp4', 3600, now=1), 'signed-a')  # a is now most recent
+        cache.set('c.mp4', 3600, 'signed-c', now=1)
+        self.assertIsNone(cache.get('b.mp4', 3600, now=1))
+        self.assertEqual(cache.get('a.mp4', 3600, now=1), 'signed-a')
+        self.assertEqual(cache.get('c.mp4', 3600, now=1), 'signed-c')
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_min_remaining_refresh_threshold(self):
+        cache = SignedURLCache(min_remaining=1800)
+        cache.set('a.mp4', 3600, 'signed-a', now=0)
+        self.assertEqual(cache.get('a.mp4', 3600, now=1800), 'signed-a')  # Exactly 1800s left
+        self.assertIsNone(cache.get('a.mp4', 3600, now=1801))
+        self.assertIsNone(cache.get('a.mp4', 3600, now=0))  # Dropped once stale
+        # Short expiries are reused for as long as the whole expiry still remains
+        cache.set('b.mp4', 600, 'signed-b', now=0)
+        self.assertEqual(cache.get('b.mp4', 600, now=0), 'signed-b')
+        self.assertIsNone(cache.get('b.mp4', 600, now=1))
+
+    def test_hit_and_miss_counters(self):
+        cache = SignedURLCache()
+        cache.get('a.mp4', 3600, now=0)
+        cache.set('a.mp4', 3600, 'signed-a', now=0)
+        cache.get('a.mp4', 3600, now=10)
+        cache.get('a.mp4', 7200, now=10)  # Another expiry is another entry
+        self.assertEqual(
+            cache.stats(),
+            {'size': 1, 'max_size': 5000, 'hits': 1, 'misses': 2, 'evictions': 0, 'hit_rate': 0.333}
+        )
+        cache.clear()
+        self.assertEqual((cache.stats()['size'], cache.stats()['hits']), (0, 0))
+
+
+class VideoURLSignerTests(SimpleTestCase):
+    url = 'https://videos.sfo3.digitaloceanspaces.com/lessons/intro-video.mp4'
+
+    def signer(self, **kwargs):
+        return VideoURLSigner('AKIDEXAMPLE', 'secret', 'videos', region='sfo3', **kwargs)
+
+    def test_signed_url_carries_key_and_expiry(self):
+        signed = urlparse(self.signer().sign(self.url, expiration=600))
+        query = parse_qs(signed.query)
+        self.assertEqual(signed.netloc, 'sfo3.digitaloceanspaces.com')
+        self.assertEqual(signed.path, '/videos/lessons/intro-video.mp4')
+        self.assertEqual(query['X-Amz-Expires'], ['600'])
+        self.assertTrue(query['X-Amz-Credential'][0].startswith('AKIDEXAMPLE/'))
+        self.assertIn('X-Amz-Signature', query)
+
+    def test_signatures_are_reused_from_the_cache(self):
+        signer = self.signer(cache=SignedURLCache())
+        with mock.patch.object(signer.client, 'generate_presigned_url', wraps=signer.client.generate_presigned_url) as sign:
+            urls = signer.sign_many([self.url, self.url, ''])
+            self.assertEqual(signer.sign(self.url), urls[self.url])
+        sign.assert_called_once()
+        self.assertEqual(signer.cache.stats()['hits'], 1)
+
+    def test_unconfigured_signer_returns_original_url(self):
+        signer = VideoURLSigner(None, None, None)
+        with mock.patch('builtins.print'):
+            self.assertEqual(signer.sign(self.url), self.url)
+        self.assertEqual(signer.sign(''), '')
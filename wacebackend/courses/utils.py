@@ -2,67 +2,254 @@
 Utility functions for the courses app
 """
 import boto3
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from botocore.client import Config
 from django.conf import settings
 from urllib.parse import urlparse
 import os
 
 
+class SignedURLCache:
+    """
+    Thread-safe LRU cache of signed video URLs
+
+    Entries are keyed by object key and requested expiry, and remember when
+    the signature stops being valid. A cached URL is only reused while it is
+    still valid for at least `min_remaining` seconds, so every viewer gets a
+    link that lasts that long while each video is signed at most once per
+    (expiration - min_remaining) window.
+    """
+
+    def __init__(self, max_size=5000, min_remaining=1800):
+        self.max_size = max_size
+        self.min_remaining = min_remaining
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, object_key, expiration, now=None):
+        """Return a cached signed URL that is still valid long enough, or None"""
+        now = time.time() if now is None else now
+        key = (object_key, expiration)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                signed_url, expires_at = entry
+                if expires_at - now >= min(self.min_remaining, expiration):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return signed_url
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, object_key, expiration, signed_url, now=None):
+        """Store a URL that was signed at `now` with the given expiry"""
+        now = time.time() if now is None else now
+        key = (object_key, expiration)
+        with self._lock:
+            self._entries[key] = (signed_url, now + expiration)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class VideoURLSigner:
+    """
+    Signs DigitalOcean Spaces video URLs with a single, reusable S3 client.
+
+    Building a boto3 session and client is far more expensive than signing
+    (presigning is a local HMAC computation and never touches the network),
+    so one signer is created per process and shared by every request.
+    """
+
+    def __init__(self, access_key, secret_key, bucket_name, region='sfo3', cache=None):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.bucket_name = bucket_name
+        self.region = region
+        self.cache = cache
+        self._client = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build a signer from the DO_SPACES_* environment variables"""
+        return cls(
+            access_key=os.getenv('DO_SPACES_ACCESS_KEY'),
+            secret_key=os.getenv('DO_SPACES_SECRET_KEY'),
+            bucket_name=os.getenv('DO_SPACES_BUCKET'),
+            region=os.getenv('DO_SPACES_REGION', 'sfo3'),
+            cache=SignedURLCache(
+                max_size=int(os.getenv('VIDEO_URL_CACHE_SIZE', 5000)),
+                min_remaining=int(os.getenv('VIDEO_URL_CACHE_MIN_REMAINING', 1800)),
+            ),
+        )
+
+    @property
+    def is_configured(self):
+        return all([self.access_key, self.secret_key, self.bucket_name])
+
+    @property
+    def client(self):
+        """S3 client for DigitalOcean Spaces, created on first use"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # boto3 sessions are not thread-safe, but the clients they create are
+                    session = boto3.session.Session()
+                    self._client = session.client(
+                        's3',
+                        region_name=self.region,
+                        endpoint_url=f'https://{self.region}.digitaloceanspaces.com',
+                        aws_access_key_id=self.access_key,
+                        aws_secret_access_key=self.secret_key,
+                        config=Config(signature_version='s3v4')
+                    )
+        return self._client
+
+    @staticmethod
+    def object_key(video_url):
+        """Extract the object key (path without leading slash) from a video URL"""
+        return urlparse(video_url).path.lstrip('/')
+
+    def sign(self, video_url, expiration=3600):
+        """
+        Sign a single video URL
+
+        Returns the original URL if it is empty, the signer is not configured
+        or signing fails. Signatures are reused from the cache while they
+        remain valid long enough.
+        """
+        if not video_url:
+            return video_url
+
+        if not self.is_configured:
+            print("Warning: DigitalOcean Spaces credentials not configured. Returning original URL.")
+            return video_url
+
+        object_key = self.object_key(video_url)
+        if self.cache is not None:
+            signed_url = self.cache.get(object_key, expiration)
+            if signed_url is not None:
+                return signed_url
+
+        signed_at = time.time()
+        try:
+            signed_url = self.client.generate_presigned_url(
+                'get_object',
+                Params={
+                    'Bucket': self.bucket_name,
+                    'Key': object_key
+                },
+                ExpiresIn=expiration
+            )
+        except Exception as e:
+            print(f"Error generating signed URL: {e}")
+            return video_url
+
+        if self.cache is not None:
+            self.cache.set(object_key, expiration, signed_url, now=signed_at)
+        return signed_url
+
+    def sign_many(self, video_urls, expiration=3600):
+        """
+        Sign many video URLs in one call
+
+        Args:
+            video_urls: Iterable of video URLs (duplicates are signed once)
+            expiration: Time in seconds until the URLs expire
+
+        Returns:
+            Dict mapping each original URL to its signed URL
+        """
+        unique_urls = [url for url in dict.fromkeys(video_urls) if url]
+
+        if unique_urls and not self.is_configured:
+            print("Warning: DigitalOcean Spaces credentials not configured. Returning original URLs.")
+            return {url: url for url in unique_urls}
+
+        return {url: self.sign(url, expiration=expiration) for url in unique_urls}
+
+
+_video_signer = None
+_video_signer_lock = threading.Lock()
+
+
+def get_video_signer():
+    """Return the process-wide VideoURLSigner, creating it on first use"""
+    global _video_signer
+    if _video_signer is None:
+        with _video_signer_lock:
+            if _video_signer is None:
+                _video_signer = VideoURLSigner.from_env()
+    return _video_signer
+
+
 def generate_signed_video_url(video_url, expiration=3600):
     """
     Generate a signed URL for DigitalOcean Spaces video
-    
+
     Args:
         video_url: The full URL to the video in DigitalOcean Spaces
         expiration: Time in seconds until the URL expires (default: 1 hour)
-    
+
     Returns:
         Signed URL string or original URL if signing fails
     """
-    if not video_url:
-        return video_url
-    
-    try:
-        # Get credentials from environment variables
-        access_key = os.getenv('DO_SPACES_ACCESS_KEY')
-        secret_key = os.getenv('DO_SPACES_SECRET_KEY')
-        region = os.getenv('DO_SPACES_REGION', 'sfo3')
-        bucket_name = os.getenv('DO_SPACES_BUCKET')
-        
-        # If credentials are not set, return original URL
-        if not all([access_key, secret_key, bucket_name]):
-            print("Warning: DigitalOcean Spaces credentials not configured. Returning original URL.")
-            return video_url
-        
-        # Parse the video URL to extract the object key
-        parsed_url = urlparse(video_url)
-        # Extract the path and remove leading slash
-        object_key = parsed_url.path.lstrip('/')
-        
-        # Create S3 client for DigitalOcean Spaces
-        session = boto3.session.Session()
-        client = session.client(
-            's3',
-            region_name=region,
-            endpoint_url=f'https://{region}.digitaloceanspaces.com',
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            config=Config(signature_version='s3v4')
-        )
-        
-        # Generate signed URL
-        signed_url = client.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': bucket_name,
-                'Key': object_key
-            },
-            ExpiresIn=expiration
-        )
-        
-        return signed_url
-        
-    except Exception as e:
-        print(f"Error generating signed URL: {e}")
-        # Return original URL if signing fails
-        return video_url
+    return get_video_signer().sign(video_url, expiration=expiration)
+
+
+def generate_signed_video_urls(video_urls, expiration=3600):
+    """
+    Generate signed URLs for many DigitalOcean Spaces videos at once
+
+    Args:
+        video_urls: Iterable of full video URLs
+        expiration: Time in seconds until the URLs expire (default: 1 hour)
+
+    Returns:
+        Dict mapping each original URL to its signed URL
+    """
+    return get_video_signer().sign_many(video_urls, expiration=expiration)
+
+
+# Responses containing signed video URLs are regenerated at least this often,
+# so a revalidated copy never holds a signature with less than
+# (min_remaining - SIGNED_URL_REVALIDATE_SECONDS) left before it expires
+SIGNED_URL_REVALIDATE_SECONDS = 900
+
+
+def signed_url_window(now=None):
+    """Index of the current signed-URL revalidation window"""
+    now = time.time() if now is None else now
+    return int(now // SIGNED_URL_REVALIDATE_SECONDS)
+
+
+def make_etag(*parts):
+    """Build an ETag value from the parts a response body is derived from"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
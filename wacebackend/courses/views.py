@@ -1,160 +1,185 @@
+from datetime import datetime, timezone as dt_timezone
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.db.models import Count, Max, Prefetch
+from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
-from students.models import Programme
-from .models import Subject, ProgrammeSubject, Topic, Lesson, Announcement
-from .utils import generate_signed_video_url
+from django.views.decorators.http import condition
+from .models import Subject, Topic, Lesson, Announcement
+from .catalog import get_catalog_version, get_programmes_list_snapshot, get_programme_detail_snapshot
+from .utils import (
+    SIGNED_URL_REVALIDATE_SECONDS, generate_signed_video_url, generate_signed_video_urls,
+    make_etag, signed_url_window
+)
 
 
 def programmes_list(request):
     """API endpoint to list all programmes with their subjects"""
-    programmes_data = []
-    
-    for programme in Programme.objects.all():
-        # Get programme subjects through the many-to-many relationship
-        programme_subjects = ProgrammeSubject.objects.filter(
-            programme=programme
-        ).select_related('subject').order_by('subject__subject_type', 'order')
-        
-        # Separate core and elective subjects
-        core_subjects = []
-        elective_subjects = []
-        
-        for prog_subject in programme_subjects:
-            subject_data = {
-                'id': prog_subject.subject.id,
-                'name': prog_subject.subject.name,
-                'code': prog_subject.subject.code,
-                'description': prog_subject.subject.description,
-                'topics_count': prog_subject.subject.topics.count()
-            }
-            
-            if prog_subject.subject.subject_type == 'core':
-                core_subjects.append(subject_data)
-            else:
-                elective_subjects.append(subject_data)
-        
-        programme_data = {
-            'id': programme.id,
-            'name': programme.name,
-            'display_name': programme.get_name_display(),
-            'description': programme.description,
-            'price': float(programme.price),
-            'duration_months': programme.duration_months,
-            'core_subjects': core_subjects,
-            'elective_subjects': elective_subjects
-        }
-        programmes_data.append(programme_data)
-    
-    return JsonResponse({
-        'programmes': programmes_data,
-        'total_count': len(programmes_data)
-    })
+    content, _ = get_programmes_list_snapshot()
+    return HttpResponse(content, content_type='application/json')
 
 
 def programme_detail(request, programme_id):
     """API endpoint to get detailed information about a specific programme"""
-    try:
-        programme = Programme.objects.get(id=programme_id)
-        
-        # Get programme subjects through the many-to-many relationship
-        programme_subjects = ProgrammeSubject.objects.filter(
-            programme=programme
-        ).select_related('subject').prefetch_related('subject__topics').order_by('subject__subject_type', 'order')
-        
-        subjects_by_type = {
-            'core': [],
-            'elective': []
-        }
-        
-        for prog_subject in programme_subjects:
-            subject = prog_subject.subject
-            subject_data = {
-                'id': subject.id,
-                'name': subject.name,
-                'code': subject.code,
-                'description': subject.description,
-                'order': prog_subject.order,
-                'topics_count': subject.topics.count(),
-                'topics': [
-                    {
-                        'id': topic.id,
-                        'title': topic.title,
-                        'description': topic.description,
-                        'order': topic.order,
-                        'estimated_duration_hours': topic.estimated_duration_hours,
-                        'lessons_count': topic.lessons.count()
-                    }
-                    for topic in subject.topics.all()[:5]  # Show first 5 topics
-                ]
-            }
-            subjects_by_type[subject.subject_type].append(subject_data)
-        
-        programme_data = {
-            'id': programme.id,
-            'name': programme.name,
-            'display_name': programme.get_name_display(),
-            'description': programme.description,
-            'price': float(programme.price),
-            'duration_months': programme.duration_months,
-            'subjects': subjects_by_type,
-            'total_subjects': len(programme_subjects)
-        }
-        
-        return JsonResponse(programme_data)
-        
-    except Programme.DoesNotExist:
+    content, _ = get_programme_detail_snapshot(programme_id)
+    if content is None:
         return JsonResponse({'error': 'Programme not found'}, status=404)
+    return HttpResponse(content, content_type='application/json')
+
+
+def _subject_completions(request, subject_id):
+    """Count and latest time of the user's completed lessons in a subject"""
+    if not request.user.is_authenticated:
+        return {'count': 0, 'latest': None}
+    from .models import LessonCompletion
+    return LessonCompletion.objects.filter(
+        student=request.user,
+        lesson__topic__subject_id=subject_id
+    ).aggregate(count=Count('id'), latest=Max('completed_at'))
+
+
+def subject_detail_etag(request, subject_id):
+    # Content changes with the catalog, the user's completions and the signed URLs
+    if not Subject.objects.filter(id=subject_id).exists():
+        return None
+    completions = _subject_completions(request, subject_id)
+    return make_etag(
+        'subject', subject_id, _requested_lesson_fields(request), get_catalog_version(),
+        request.user.pk, completions['count'], completions['latest'],
+        signed_url_window()
+    )
+
+
+def subject_detail_last_modified(request, subject_id):
+    # Users' responses carry their completions, and un-marking a lesson can
+    # move the latest completion back in time, so they rely on the ETag alone
+    if request.user.is_authenticated:
+        return None
+    if not Subject.objects.filter(id=subject_id).exists():
+        return None
+    topics_updated = Topic.objects.filter(subject_id=subject_id).aggregate(
+        latest=Max('updated_at')
+    )['latest']
+    # Signed video URLs are refreshed every window, so the body is never older than its start
+    window_start = datetime.fromtimestamp(
+        signed_url_window() * SIGNED_URL_REVALIDATE_SECONDS, tz=dt_timezone.utc
+    )
+    return max(filter(None, [topics_updated, window_start]))
+
+
+# Lesson fields returned by subject_detail, and the lean subset used by ?outline=1
+LESSON_FIELDS = (
+    'id', 'title', 'lesson_type', 'order', 'is_free', 'video_duration_minutes',
+    'video_url', 'content', 'notes', 'is_completed',
+)
+OUTLINE_LESSON_FIELDS = (
+    'id', 'title', 'lesson_type', 'order', 'is_free', 'video_duration_minutes', 'is_completed',
+)
+
+
+def _requested_lesson_fields(request):
+    """Lesson fields selected by ?outline=1 or ?fields=a,b,c (default: all)"""
+    if request.GET.get('outline', '').lower() in ('1', 'true'):
+        return OUTLINE_LESSON_FIELDS
+    fields = request.GET.get('fields')
+    if not fields:
+        return LESSON_FIELDS
+    requested = {field.strip() for field in fields.split(',')}
+    return tuple(field for field in LESSON_FIELDS if field in requested or field == 'id')
+
+
+def _completed_lesson_ids(request, **filters):
+    """IDs of lessons the current user has completed, as a set"""
+    if not request.user.is_authenticated:
+        return set()
+    try:
+        from .models import LessonCompletion
+        return set(
+            LessonCompletion.objects.filter(
+                student=request.user, **filters
+            ).values_list('lesson_id', flat=True)
+        )
+    except Exception as e:
+        # Table might not exist yet if migration hasn't run
+        print(f"Warning: Could not fetch lesson completions: {e}")
+        return set()
 
 
+def _is_enrolled(request, subject_id):
+    """Whether the user is staff or a student whose programme includes the subject"""
+    user = request.user
+    if not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    from .models import ProgrammeSubject
+    return ProgrammeSubject.objects.filter(subject_id=subject_id, programme__student__user=user).exists()
+
+
+def _can_watch(lesson, enrolled):
+    # Only students enrolled in the subject get video URLs, unless the lesson is a free preview
+    return bool(lesson.video_url) and (enrolled or lesson.is_free)
+
+
+@condition(etag_func=subject_detail_etag, last_modified_func=subject_detail_last_modified)
 def subject_detail(request, subject_id):
-    """API endpoint to get detailed information about a specific subject"""
+    """
+    API endpoint to get detailed information about a specific subject
+
+    ?outline=1 returns only the topic and lesson skeleton with completion
+    flags; ?fields=id,title,notes picks lesson fields explicitly. Lesson
+    bodies can then be fetched one at a time from lesson_detail.
+    """
     try:
         subject = Subject.objects.get(id=subject_id)
         
-        topics = Topic.objects.filter(subject=subject).prefetch_related('lessons').order_by('order')
+        fields = _requested_lesson_fields(request)
+        
+        # Don't load the long markdown columns unless they are returned
+        lessons = Lesson.objects.order_by('order').defer(
+            *[field for field in ('content', 'notes') if field not in fields]
+        )
+        topics = Topic.objects.filter(subject=subject).prefetch_related(
+            Prefetch('lessons', queryset=lessons)
+        ).order_by('order')
         
         # Get completed lesson IDs for this user if authenticated
         completed_lesson_ids = set()
-        if request.user.is_authenticated:
-            try:
-                from .models import LessonCompletion
-                completed_lesson_ids = set(
-                    LessonCompletion.objects.filter(
-                        student=request.user,
-                        lesson__topic__subject=subject
-                    ).values_list('lesson_id', flat=True)
-                )
-            except Exception as e:
-                # Table might not exist yet if migration hasn't run
-                print(f"Warning: Could not fetch lesson completions: {e}")
-                pass
+        if 'is_completed' in fields:
+            completed_lesson_ids = _completed_lesson_ids(request, lesson__topic__subject=subject)
+        
+        # Sign every playable video in one batch (1 hour expiry)
+        signed_urls = {}
+        if 'video_url' in fields:
+            enrolled = _is_enrolled(request, subject.id)
+            signed_urls = generate_signed_video_urls(
+                (
+                    lesson.video_url
+                    for topic in topics
+                    for lesson in topic.lessons.all()
+                    if _can_watch(lesson, enrolled)
+                ),
+                expiration=3600
+            )
+        
+        lesson_values = {
+            'id': lambda lesson: lesson.id,
+            'title': lambda lesson: lesson.title,
+            'lesson_type': lambda lesson: lesson.lesson_type,
+            'order': lambda lesson: lesson.order,
+            'is_free': lambda lesson: lesson.is_free,
+            'video_duration_minutes': lambda lesson: lesson.video_duration_minutes,
+            'video_url': lambda lesson: signed_urls.get(lesson.video_url) if lesson.video_url else lesson.video_url,
+            'content': lambda lesson: lesson.content,
+            'notes': lambda lesson: lesson.notes,
+            'is_completed': lambda lesson: lesson.id in completed_lesson_ids,
+        }
         
         topics_data = []
         for topic in topics:
-            lessons_list = []
-            for lesson in topic.lessons.all():
-                # Generate signed URL for video if it exists
-                video_url = lesson.video_url
-                if video_url and request.user.is_authenticated:
-                    # Only provide signed URLs to authenticated users
-                    video_url = generate_signed_video_url(video_url, expiration=3600)  # 1 hour expiry
-                elif video_url and not request.user.is_authenticated:
-                    # Don't provide video URLs to unauthenticated users unless it's a free lesson
-                    video_url = generate_signed_video_url(video_url, expiration=3600) if lesson.is_free else None
-                
-                lessons_list.append({
-                    'id': lesson.id,
-                    'title': lesson.title,
-                    'lesson_type': lesson.lesson_type,
-                    'order': lesson.order,
-                    'is_free': lesson.is_free,
-                    'video_duration_minutes': lesson.video_duration_minutes,
-                    'video_url': video_url,
-                    'content': lesson.content,
-                    'notes': lesson.notes,
-                    'is_completed': lesson.id in completed_lesson_ids
-                })
+            lessons_list = [
+                {field: lesson_values[field](lesson) for field in fields}
+                for lesson in topic.lessons.all()
+            ]
             
             topic_data = {
                 'id': topic.id,
@@ -163,7 +188,7 @@ def subject_detail(request, subject_id):
                 'order': topic.order,
                 'estimated_duration_hours': topic.estimated_duration_hours,
                 'is_published': topic.is_published,
-                'lessons_count': topic.lessons.count(),
+                'lessons_count': len(lessons_list),
                 'lessons': lessons_list
             }
             topics_data.append(topic_data)
@@ -184,6 +209,39 @@ def subject_detail(request, subject_id):
         return JsonResponse({'error': 'Subject not found'}, status=404)
 
 
+def lesson_detail(request, lesson_id):
+    """
+    API endpoint to get the body, notes and signed video URL of one lesson
+
+    The video URL is only signed for free previews and for students
+    enrolled in the lesson's subject; everyone else gets null.
+    """
+    try:
+        lesson = Lesson.objects.select_related('topic').get(id=lesson_id)
+        
+        video_url = lesson.video_url
+        if video_url:
+            enrolled = _is_enrolled(request, lesson.topic.subject_id)
+            video_url = generate_signed_video_url(video_url, expiration=3600) if _can_watch(lesson, enrolled) else None
+        
+        return JsonResponse({
+            'id': lesson.id,
+            'topic_id': lesson.topic_id,
+            'title': lesson.title,
+            'lesson_type': lesson.lesson_type,
+            'order': lesson.order,
+            'is_free': lesson.is_free,
+            'video_duration_minutes': lesson.video_duration_minutes,
+            'video_url': video_url,
+            'content': lesson.content,
+            'notes': lesson.notes,
+            'is_completed': lesson.id in _completed_lesson_ids(request, lesson=lesson)
+        })
+        
+    except Lesson.DoesNotExist:
+        return JsonResponse({'error': 'Lesson not found'}, status=404)
+
+
 
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.permissions import IsAuthenticated
@@ -192,6 +250,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.db import models
 from .models import Lesson, LessonCompletion, Announcement
+from .progress import MAX_COMPLETION_EVENTS, apply_completion_events, mark_complete, unmark_complete
 
 
 @api_view(['POST'])
@@ -200,13 +259,10 @@ from .models import Lesson, LessonCompletion, Announcement
 def mark_lesson_complete(request, lesson_id):
     """Mark a lesson as complete for the current user"""
     try:
-        lesson = Lesson.objects.get(id=lesson_id)
+        lesson = Lesson.objects.select_related('topic').get(id=lesson_id)
         
-        # Create or get the completion record
-        completion, created = LessonCompletion.objects.get_or_create(
-            student=request.user,
-            lesson=lesson
-        )
+        # Create or get the completion record (and update subject progress)
+        completion, created = mark_complete(request.user, lesson)
         
         return Response({
             'success': True,
@@ -226,13 +282,10 @@ def mark_lesson_complete(request, lesson_id):
 def unmark_lesson_complete(request, lesson_id):
     """Unmark a lesson as complete for the current user"""
     try:
-        lesson = Lesson.objects.get(id=lesson_id)
+        lesson = Lesson.objects.select_related('topic').get(id=lesson_id)
         
-        # Delete the completion record if it exists
-        deleted_count, _ = LessonCompletion.objects.filter(
-            student=request.user,
-            lesson=lesson
-        ).delete()
+        # Delete the completion record if it exists (and update subject progress)
+        deleted_count = unmark_complete(request.user, lesson)
         
         if deleted_count > 0:
             return Response({
@@ -251,34 +304,82 @@ def unmark_lesson_complete(request, lesson_id):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['GET'])
+@api_view(['POST'])
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
-def get_topic_progress(request, topic_id):
-    """Get completion status for all lessons in a topic"""
+def batch_lesson_completion(request):
+    """
+    Apply a queue of lesson completion events in one request
+
+    Body: {"events": [{"lesson_id": 1, "completed": true, "client_timestamp": "..."}]}
+    Replaying the same events is safe; each event gets its own status.
+    """
+    events = request.data.get('events') if isinstance(request.data, dict) else request.data
+    if not isinstance(events, list):
+        return Response({'error': 'events must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(events) > MAX_COMPLETION_EVENTS:
+        return Response(
+            {'error': f'At most {MAX_COMPLETION_EVENTS} events can be sent at once'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     try:
-        topic = Topic.objects.get(id=topic_id)
-        lessons = topic.lessons.all()
+        results = apply_completion_events(request.user, events)
         
-        # Get completed lesson IDs for this user
-        completed_lesson_ids = LessonCompletion.objects.filter(
-            student=request.user,
-            lesson__topic=topic
-        ).values_list('lesson_id', flat=True)
+        counts = {}
+        for result in results:
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+        
+        return Response({
+            'success': True,
+            'results': results,
+            'summary': counts
+        })
         
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# Maximum number of topics accepted by get_topics_progress
+MAX_PROGRESS_TOPICS = 200
+
+
+def _topics_progress(user, topic_ids):
+    """
+    Completion status for the lessons of many topics
+
+    Uses one query for the topics, one for their lessons and one for all of
+    the user's completed lessons in them, whatever the number of topics.
+    """
+    topics = Topic.objects.filter(id__in=topic_ids).prefetch_related(
+        Prefetch('lessons', queryset=Lesson.objects.only('id', 'title', 'order', 'topic_id').order_by('order'))
+    ).order_by('subject_id', 'order')
+    
+    # Get completed lesson IDs for this user as a set for O(1) membership tests
+    completed_lesson_ids = set(
+        LessonCompletion.objects.filter(
+            student=user,
+            lesson__topic_id__in=topic_ids
+        ).order_by().values_list('lesson_id', flat=True)
+    )
+    
+    topics_data = []
+    for topic in topics:
         lessons_data = []
-        for lesson in lessons:
+        completed_count = 0
+        for lesson in topic.lessons.all():
+            is_completed = lesson.id in completed_lesson_ids
+            completed_count += is_completed
             lessons_data.append({
                 'id': lesson.id,
                 'title': lesson.title,
-                'is_completed': lesson.id in completed_lesson_ids
+                'is_completed': is_completed
             })
         
-        total_lessons = lessons.count()
-        completed_count = len(completed_lesson_ids)
+        total_lessons = len(lessons_data)
         progress_percentage = (completed_count / total_lessons * 100) if total_lessons > 0 else 0
         
-        return Response({
+        topics_data.append({
             'topic_id': topic.id,
             'topic_title': topic.title,
             'total_lessons': total_lessons,
@@ -286,48 +387,111 @@ def get_topic_progress(request, topic_id):
             'progress_percentage': round(progress_percentage, 1),
             'lessons': lessons_data
         })
+    return topics_data
+
+
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def get_topic_progress(request, topic_id):
+    """Get completion status for all lessons in a topic"""
+    try:
+        topics_data = _topics_progress(request.user, [topic_id])
+        if not topics_data:
+            return Response({'error': 'Topic not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response(topics_data[0])
         
-    except Topic.DoesNotExist:
-        return Response({'error': 'Topic not found'}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['GET'])
-@permission_classes([])  # Allow any user (authenticated or not)
-def get_announcements(request):
-    """Get all active announcements"""
-    now = timezone.now()
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def get_topics_progress(request):
+    """Get completion status for the lessons of many topics: ?ids=1,2,3"""
+    try:
+        topic_ids = list(dict.fromkeys(
+            int(topic_id) for topic_id in request.GET.get('ids', '').split(',') if topic_id.strip()
+        ))
+    except ValueError:
+        return Response({'error': 'ids must be a comma-separated list of topic IDs'},
+                        status=status.HTTP_400_BAD_REQUEST)
     
-    # Get active announcements that haven't expired
-    announcements = Announcement.objects.filter(
+    if not topic_ids:
+        return Response({'error': 'ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(topic_ids) > MAX_PROGRESS_TOPICS:
+        return Response({'error': f'At most {MAX_PROGRESS_TOPICS} topics can be requested at once'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        topics_data = _topics_progress(request.user, topic_ids)
+        
+        return Response({
+            'topics': topics_data,
+            'total_topics': len(topics_data)
+        })
+        
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _active_announcements(now):
+    """Active announcements that haven't expired"""
+    return Announcement.objects.filter(
         is_active=True
     ).filter(
         models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=now)
     ).order_by('-priority', '-created_at')
+
+
+def _time_ago(created_at, now):
+    time_diff = now - created_at
+    if time_diff.days > 0:
+        return f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
+    elif time_diff.seconds >= 3600:
+        hours = time_diff.seconds // 3600
+        return f"{hours} hour{'s' if hours > 1 else ''} ago"
+    elif time_diff.seconds >= 60:
+        minutes = time_diff.seconds // 60
+        return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
+    else:
+        return "Just now"
+
+
+def announcements_etag(request):
+    # The body changes when announcements are edited or expire, and as their time_ago text ages
+    now = timezone.now()
+    rows = _active_announcements(now).values_list('id', 'updated_at', 'created_at')
+    return make_etag(
+        'announcements',
+        [(pk, updated_at, _time_ago(created_at, now)) for pk, updated_at, created_at in rows]
+    )
+
+
+def announcements_last_modified(request):
+    return _active_announcements(timezone.now()).aggregate(latest=Max('updated_at'))['latest']
+
+
+@condition(etag_func=announcements_etag, last_modified_func=announcements_last_modified)
+@api_view(['GET'])
+@permission_classes([])  # Allow any user (authenticated or not)
+def get_announcements(request):
+    """Get all active announcements"""
+    now = timezone.now()
+    
+    announcements = _active_announcements(now)
     
     announcements_data = []
     for announcement in announcements:
-        # Calculate time ago
-        time_diff = now - announcement.created_at
-        if time_diff.days > 0:
-            time_ago = f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
-        elif time_diff.seconds >= 3600:
-            hours = time_diff.seconds // 3600
-            time_ago = f"{hours} hour{'s' if hours > 1 else ''} ago"
-        elif time_diff.seconds >= 60:
-            minutes = time_diff.seconds // 60
-            time_ago = f"{minutes} minute{'s' if minutes > 1 else ''} ago"
-        else:
-            time_ago = "Just now"
-        
         announcements_data.append({
             'id': announcement.id,
             'title': announcement.title,
             'message': announcement.message,
             'priority': announcement.priority,
             'created_at': announcement.created_at.isoformat(),
-            'time_ago': time_ago
+            'time_ago': _time_ago(announcement.created_at, now)
         })
     
     return Response({
@@ -336,11 +500,8 @@ def get_announcements(request):
     })
 
 
-@api_view(['GET'])
-@permission_classes([])  # Allow any user (authenticated or not)
-def get_instructors(request):
-    """Get all active instructors with their specialties"""
-    from .models import Instructor, InstructorSpecialty
+def _active_instructors(request):
+    from .models import Instructor
     
     # Get query parameters
     featured_only = request.GET.get('featured', 'false').lower() == 'true'
@@ -349,6 +510,28 @@ def get_instructors(request):
     instructors = Instructor.objects.filter(is_active=True)
     if featured_only:
         instructors = instructors.filter(is_featured=True)
+    return instructors
+
+
+def instructors_etag(request):
+    # Specialty edits touch Instructor.updated_at; subject names come from the catalog
+    stats = _active_instructors(request).aggregate(count=Count('id'), latest=Max('updated_at'))
+    return make_etag(
+        'instructors', request.GET.get('featured', ''), stats['count'], stats['latest'],
+        get_catalog_version()
+    )
+
+
+def instructors_last_modified(request):
+    return _active_instructors(request).aggregate(latest=Max('updated_at'))['latest']
+
+
+@condition(etag_func=instructors_etag, last_modified_func=instructors_last_modified)
+@api_view(['GET'])
+@permission_classes([])  # Allow any user (authenticated or not)
+def get_instructors(request):
+    """Get all active instructors with their specialties"""
+    instructors = _active_instructors(request)
     
     instructors = instructors.prefetch_related('specialties__subject').order_by('display_order', 'last_name')
     
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['command', 'status', 'created_by', 'created_at', 'started_at', 'finished_at']
+    list_filter = ['status', 'command']
+    readonly_fields = [
+        'command', 'arguments', 'status', 'created_by', 'worker', 'progress', 'output', 'error',
+        'created_at', 'started_at', 'heartbeat_at', 'finished_at'
+    ]
+
+    def has_add_permission(self, request):
+        # Jobs are queued from the admin API endpoints
+        return False
@@ -0,0 +1,59 @@
+"""
+Django management command that runs queued background jobs
+Usage: python manage.py run_jobs [--once] [--poll-interval 2]
+
+Run it as its own process next to the web server: the Docker start script
+runs one in the web container, or alone when SERVICE_ROLE=worker (see the
+Dockerfile and Procfile). It claims queued jobs one at a time, oldest
+first. Several workers can run side by side. Catalog and question bank
+changes reach the web processes through the shared cache.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import claim_next, fail_stale_jobs, run_job, worker_name
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (populate commands started from the admin API)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs that are queued now, then exit',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between checks of an empty queue (default: 2)',
+        )
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+        self.stdout.write(f'Job worker {worker} started')
+
+        while True:
+            close_old_connections()
+            stale = fail_stale_jobs()
+            if stale:
+                self.stdout.write(self.style.WARNING(f'⚠️  Marked {stale} stale job(s) as failed'))
+
+            job = claim_next(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f'▶️  Job {job.id}: {job.command} {" ".join(job.arguments)}'.rstrip())
+            started = time.monotonic()
+            status = run_job(job)
+            elapsed = time.monotonic() - started
+            if status == 'succeeded':
+                self.stdout.write(self.style.SUCCESS(f'✅ Job {job.id} succeeded in {elapsed:.1f}s'))
+            else:
+                self.stdout.write(self.style.ERROR(f'❌ Job {job.id} failed after {elapsed:.1f}s'))
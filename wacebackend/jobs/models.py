@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class Job(models.Model):
+    """
+    A management command queued to run in the background
+
+    Rows are claimed and run by `python manage.py run_jobs` (see jobs/queue.py).
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    command = models.CharField(max_length=100)
+    arguments = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    worker = models.CharField(max_length=100, blank=True)
+    # {"done": 40, "total": 120, "message": "..."} as reported by the command, if it does
+    progress = models.JSONField(null=True, blank=True)
+    output = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ]
+        constraints = [
+            # At most one pending run of a command with the same arguments (see queue.enqueue)
+            models.UniqueConstraint(
+                fields=['command', 'arguments'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='job_one_pending_per_command',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.command} ({self.get_status_display()})"
+
+    @property
+    def duration_seconds(self):
+        if not self.started_at:
+            return None
+        return round(((self.finished_at or self.heartbeat_at or self.started_at) - self.started_at).total_seconds(), 1)
@@ -0,0 +1,231 @@
+"""
+A database-backed queue for long-running admin commands
+
+The populate_* admin endpoints used to run their management command inside
+the request. That tied up one of the two gunicorn workers for minutes and
+often ran into the 120s timeout. Now they enqueue a Job row and return its
+id straight away. A separate worker process (`python manage.py run_jobs`)
+claims queued jobs and runs the commands. It writes their output, progress
+and result back to the row, where the /api/jobs/ endpoints serve them.
+
+There's no broker: claiming a job is a conditional UPDATE from 'queued' to
+'running', so several workers can poll the same table without running a
+job twice. Running jobs send a heartbeat. A job whose worker died (e.g. the
+container restarted) is marked failed once its heartbeat goes stale.
+
+Output and progress are written on the command's own connection. While
+the command is inside a transaction (e.g. a BulkWriter reseed) they are
+kept in memory and written once it ends: written inside it, they would
+be invisible until commit, lost on rollback, and would hold a lock on the
+Job row that the heartbeat needs.
+"""
+import os
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from .models import Job
+
+# Commands that may be queued, and what the admin endpoints call them
+JOB_COMMANDS = {
+    'populate_subjects': 'Populate subjects',
+    'populate_topics': 'Populate topics',
+    'populate_lessons': 'Populate lessons',
+    'update_english_videos': 'Update English videos',
+    'update_all_video_urls': 'Update all video URLs',
+    'populate_past_questions': 'Populate past questions',
+}
+HEARTBEAT_SECONDS = 15
+STALE_AFTER = timedelta(minutes=5)
+LOG_FLUSH_SECONDS = 2
+
+
+class JobError(Exception):
+    """Raised when a job can't be queued"""
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue(command, arguments=(), user=None):
+    """
+    Queue a command, unless the same command and arguments are already queued or running
+
+    Returns:
+        Tuple of (Job, created)
+    """
+    if command not in JOB_COMMANDS:
+        raise JobError(f'{command} cannot be run as a job')
+    arguments = [str(argument) for argument in arguments]
+    pending = Job.objects.filter(command=command, arguments=arguments, status__in=['queued', 'running'])
+    job = pending.first()
+    if job is not None:
+        return job, False
+    try:
+        with transaction.atomic():
+            return Job.objects.create(command=command, arguments=arguments, created_by=user), True
+    except IntegrityError:
+        # Queued by a concurrent request since the check (job_one_pending_per_command)
+        job = pending.first()
+        if job is None:
+            raise
+        return job, False
+
+
+def claim_next(worker):
+    """Claim the oldest queued job for `worker`, or return None if there is none"""
+    while True:
+        job = Job.objects.filter(status='queued').order_by('created_at', 'id').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job.pk, status='queued').update(
+            status='running', worker=worker, started_at=now, heartbeat_at=now
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        # Another worker got there first; try the next one
+
+
+def fail_stale_jobs(now=None):
+    """Mark running jobs whose worker stopped sending heartbeats as failed"""
+    now = now or timezone.now()
+    return Job.objects.filter(status='running', heartbeat_at__lt=now - STALE_AFTER).update(
+        status='failed',
+        error='The worker running this job stopped responding',
+        finished_at=now,
+    )
+
+
+_current = threading.local()
+
+
+def _in_command_transaction():
+    """Whether the running command has opened a transaction of its own"""
+    return len(connection.atomic_blocks) > getattr(_current, 'atomic_depth', 0)
+
+
+class JobOutput:
+    """File-like stdout/stderr for a job's command that appends to Job.output every few seconds"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.buffer = []
+        self.last_flush = timezone.now()
+
+    def write(self, text):
+        self.buffer.append(text)
+        if (timezone.now() - self.last_flush).total_seconds() >= LOG_FLUSH_SECONDS:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        self.last_flush = timezone.now()
+        if _in_command_transaction():
+            return  # Written once the transaction ends (see the module docstring)
+        progress = getattr(_current, 'progress', None)
+        if not self.buffer and progress is None:
+            return
+        updates = {'heartbeat_at': self.last_flush}
+        if self.buffer:
+            chunk, self.buffer = ''.join(self.buffer), []
+            updates['output'] = Concat('output', Value(chunk))
+        if progress is not None:
+            updates['progress'], _current.progress = progress, None
+        Job.objects.filter(pk=self.job_id).update(**updates)
+
+
+def report_progress(done, total=None, message=''):
+    """
+    Record progress of the job running in this thread, if any
+
+    Management commands can call this freely: outside a job it does nothing.
+    Inside a transaction, the latest progress is written once it ends.
+    """
+    job_id = getattr(_current, 'job_id', None)
+    if job_id is None:
+        return
+    _current.progress = {'done': done, 'total': total, 'message': message}
+    if _in_command_transaction():
+        return
+    progress, _current.progress = _current.progress, None
+    Job.objects.filter(pk=job_id).update(progress=progress, heartbeat_at=timezone.now())
+
+
+@contextmanager
+def _heartbeat(job_id):
+    """Keep the job's heartbeat fresh while its command runs, however quiet the command is"""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(HEARTBEAT_SECONDS):
+            try:
+                Job.objects.filter(pk=job_id, status='running').update(heartbeat_at=timezone.now())
+            except Exception:
+                pass  # e.g. SQLite locked by the command's transaction; the next beat will do
+        connection.close()
+
+    thread = threading.Thread(target=beat, name=f'job-{job_id}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job):
+    """Run a claimed job's command and record the outcome; returns the final status"""
+    output = JobOutput(job.id)
+    _current.job_id = job.id
+    _current.atomic_depth = len(connection.atomic_blocks)
+    _current.progress = None
+    try:
+        with _heartbeat(job.id):
+            call_command(job.command, *job.arguments, stdout=output, stderr=output)
+    except BaseException as e:
+        output.flush()
+        Job.objects.filter(pk=job.pk, status='running').update(
+            status='failed', error=traceback.format_exc(), finished_at=timezone.now()
+        )
+        if not isinstance(e, Exception):
+            raise  # KeyboardInterrupt/SystemExit still stop the worker
+        return 'failed'
+    finally:
+        _current.job_id = None
+
+    output.flush()
+    # A job already failed as stale keeps that status: a new run may have been queued since
+    if not Job.objects.filter(pk=job.pk, status='running').update(status='succeeded', finished_at=timezone.now()):
+        return Job.objects.filter(pk=job.pk).values_list('status', flat=True).first()
+    return 'succeeded'
+
+
+def serialize_job(job, include_output=False):
+    data = {
+        'id': job.id,
+        'command': job.command,
+        'description': JOB_COMMANDS.get(job.command, job.command),
+        'arguments': job.arguments,
+        'status': job.status,
+        'progress': job.progress,
+        'created_by': job.created_by.username if job.created_by_id else None,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+        'duration_seconds': job.duration_seconds,
+        'error': job.error,
+    }
+    if include_output:
+        data['output'] = job.output
+    return data
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Job
+from .queue import claim_next, enqueue, fail_stale_jobs, report_progress, run_job
+
+TEST_COMMANDS = {'check': 'System check', 'no_such_command': 'Broken'}
+
+
+@mock.patch.dict('jobs.queue.JOB_COMMANDS', TEST_COMMANDS)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', password='secret', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_populate_endpoint_queues_job_without_running_it(self):
+        with mock.patch('jobs.queue.call_command') as call_command:
+            response = self.client.post(reverse('populate-topics'))
+            self.assertEqual(response.status_code, 202)
+            again = self.client.post(reverse('populate-topics'))
+        call_command.assert_not_called()
+        # A second click while the first job is pending doesn't queue a duplicate
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data['job_id'], response.data['job_id'])
+        self.assertEqual(Job.objects.get().status, 'queued')
+
+    def test_worker_runs_jobs_and_records_output(self):
+        ok, _ = enqueue('check', user=self.admin)
+        broken, _ = enqueue('no_such_command')
+
+        job = claim_next('test-worker')
+        self.assertEqual((job.id, job.status), (ok.id, 'running'))
+        self.assertEqual(run_job(job), 'succeeded')
+        self.assertEqual(run_job(claim_next('test-worker')), 'failed')
+        self.assertIsNone(claim_next('test-worker'))
+
+        detail = self.client.get(reverse('job-detail', args=[ok.id])).data
+        self.assertEqual(detail['status'], 'succeeded')
+        self.assertEqual(detail['created_by'], 'admin')
+        log = self.client.get(reverse('job-log', args=[ok.id])).data
+        self.assertIn('System check identified no issues', log['output'])
+        tail = self.client.get(reverse('job-log', args=[ok.id]), {'offset': log['next_offset']}).data
+        self.assertEqual(tail['output'], '')
+
+        broken.refresh_from_db()
+        self.assertEqual(broken.status, 'failed')
+        self.assertIn('Unknown command', broken.error)
+        failed = self.client.get(reverse('job-list'), {'status': 'failed'}).data['jobs']
+        self.assertEqual([job['id'] for job in failed], [broken.id])
+
+    def test_output_written_in_a_rolled_back_transaction_is_kept(self):
+        job, _ = enqueue('check')
+
+        def reseed(command, stdout, stderr):
+            with transaction.atomic():
+                stdout.write('Wrote topics\n')
+                stdout.flush()
+                report_progress(5, message='Wrote topics')
+                # Nothing is written to the job row inside the command's transaction
+                self.assertEqual(Job.objects.get(pk=job.pk).output, '')
+                raise RuntimeError('Reseed failed')
+
+        with mock.patch('jobs.queue.call_command', reseed):
+            self.assertEqual(run_job(claim_next('test-worker')), 'failed')
+        job.refresh_from_db()
+        self.assertEqual(job.output, 'Wrote topics\n')
+        self.assertEqual(job.progress['done'], 5)
+        self.assertIn('Reseed failed', job.error)
+
+    def test_stale_running_jobs_fail(self):
+        job, _ = enqueue('check')
+        claim_next('dead-worker')
+        self.assertEqual(fail_stale_jobs(), 0)
+        self.assertEqual(fail_stale_jobs(now=timezone.now() + timedelta(minutes=10)), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+    def test_one_pending_job_per_command(self):
+        job, _ = enqueue('check')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Job.objects.create(command='check', arguments=[])
+        # What a concurrent request that passed the pending check sees
+        with mock.patch('django.db.models.query.QuerySet.first', side_effect=[None, job]):
+            self.assertEqual(enqueue('check'), (job, False))
+
+    def test_job_failed_as_stale_is_not_marked_succeeded(self):
+        job, _ = enqueue('check')
+
+        def slow_command(command, stdout, stderr):
+            fail_stale_jobs(now=timezone.now() + timedelta(minutes=10))
+
+        with mock.patch('jobs.queue.call_command', slow_command):
+            self.assertEqual(run_job(claim_next('test-worker')), 'failed')
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+    def test_endpoints_require_admin(self):
+        self.client.force_authenticate(User.objects.create_user('kwame', password='secret'))
+        self.assertEqual(self.client.get(reverse('job-list')).status_code, 403)
+        self.assertEqual(self.client.post(reverse('populate-topics')).status_code, 403)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.job_list, name='job-list'),
+    path('<int:job_id>/', views.job_detail, name='job-detail'),
+    path('<int:job_id>/log/', views.job_log, name='job-log'),
+]
@@ -0,0 +1,77 @@
+from django.http import JsonResponse
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .models import Job
+from .queue import JOB_COMMANDS, enqueue, serialize_job
+
+MAX_JOBS_LISTED = 50
+
+
+def enqueue_job_response(request, command, arguments=()):
+    """202 response for an admin endpoint that queues `command` as a background job"""
+    job, created = enqueue(command, arguments, user=request.user if request.user.is_authenticated else None)
+    data = {
+        'success': True,
+        'message': f"{JOB_COMMANDS[command]} {'queued' if created else 'is already queued or running'}",
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': request.build_absolute_uri(reverse('job-detail', args=[job.id])),
+        'log_url': request.build_absolute_uri(reverse('job-log', args=[job.id])),
+    }
+    return data, status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def job_list(request):
+    """Recent jobs, newest first (?status=queued|running|succeeded|failed, ?command=)"""
+    jobs = Job.objects.select_related('created_by').defer('output')
+    job_status = request.query_params.get('status')
+    if job_status:
+        if job_status not in dict(Job.STATUS_CHOICES):
+            return Response(
+                {'error': f"status must be one of: {', '.join(dict(Job.STATUS_CHOICES))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        jobs = jobs.filter(status=job_status)
+    if request.query_params.get('command'):
+        jobs = jobs.filter(command=request.query_params['command'])
+    return Response({'jobs': [serialize_job(job) for job in jobs[:MAX_JOBS_LISTED]]})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def job_detail(request, job_id):
+    """Status, progress and result of a job, without its log"""
+    job = Job.objects.select_related('created_by').defer('output').filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    return Response(serialize_job(job))
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def job_log(request, job_id):
+    """
+    Command output of a job
+
+    Pass ?offset=<next_offset from the previous call> to get only the output
+    written since, e.g. when polling a running job.
+    """
+    try:
+        offset = max(0, int(request.query_params.get('offset') or 0))
+    except ValueError:
+        return JsonResponse({'error': 'offset must be an integer'}, status=400)
+    job = Job.objects.only('status', 'output').filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    return Response({
+        'id': job.id,
+        'status': job.status,
+        'output': job.output[offset:],
+        'next_offset': len(job.output),
+    })
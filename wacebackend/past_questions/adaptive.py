@@ -0,0 +1,255 @@
+"""
+Adaptive practice sessions driven by a two-parameter logistic (2PL) IRT model
+
+Each student answers one question at a time. After every answer their
+ability is re-estimated (EAP over a fixed grid with a standard normal
+prior), and the next question is the unanswered one that gives the most
+Fisher information at that ability. A session stops once the estimate's
+standard error falls below TARGET_STANDARD_ERROR, usually after a fraction
+of a full paper.
+
+Item parameters come from QuestionStatistics (see item_statistics.py).
+Questions without enough answers yet fall back to their hand-entered
+difficulty label. Each process keeps a per-subject index of items sorted
+by difficulty, so choosing a question is a bisect plus a scan of a small
+window and needs no database queries.
+
+Questions the student is being examined on right now (see
+views._withheld_question_ids) are passed in as `withheld` and never
+chosen, so practice can't reveal answers during a timed attempt.
+"""
+import bisect
+import math
+import random
+import threading
+import time
+
+from django.utils import timezone
+
+from .models import MultipleChoiceQuestion, PracticeSession
+from .paper_cache import serialize_mcq
+from .review import enqueue as enqueue_for_review
+
+ITEM_INDEX_TTL = 300  # Seconds before a subject's item index is rebuilt
+SELECTION_WINDOW = 40  # Candidates examined on each side of the current ability
+RANDOMESQUE_TOP_K = 3  # Pick among the k most informative items to limit item exposure
+TARGET_STANDARD_ERROR = 0.4
+DEFAULT_MAX_QUESTIONS = 20
+MAX_QUESTIONS_LIMIT = 60
+
+# Parameters for questions without estimated ones, from the difficulty label
+LABEL_DIFFICULTY = {'easy': -1.0, 'medium': 0.0, 'hard': 1.0}
+DEFAULT_DISCRIMINATION = 1.0
+
+# EAP quadrature grid over ability, with standard normal prior weights
+ABILITY_GRID = [i / 10 for i in range(-40, 41)]
+PRIOR = [math.exp(-theta * theta / 2) for theta in ABILITY_GRID]
+
+
+class PracticeError(Exception):
+    """Raised when a practice answer cannot be accepted"""
+
+
+def probability_correct(theta, a, b):
+    """2PL probability that a student of ability theta answers the item correctly"""
+    return 1 / (1 + math.exp(-a * (theta - b)))
+
+
+def information(theta, a, b):
+    """Fisher information of a 2PL item at ability theta"""
+    p = probability_correct(theta, a, b)
+    return a * a * p * (1 - p)
+
+
+def estimate_ability(responses):
+    """
+    EAP ability estimate and posterior standard deviation
+
+    Args:
+        responses: Iterable of (a, b, is_correct)
+
+    Returns:
+        Tuple of (ability, standard error)
+    """
+    weights = list(PRIOR)
+    for a, b, is_correct in responses:
+        for i, theta in enumerate(ABILITY_GRID):
+            p = probability_correct(theta, a, b)
+            weights[i] *= p if is_correct else 1 - p
+
+    total = sum(weights)
+    mean = sum(w * theta for w, theta in zip(weights, ABILITY_GRID)) / total
+    variance = sum(w * (theta - mean) ** 2 for w, theta in zip(weights, ABILITY_GRID)) / total
+    return mean, math.sqrt(variance)
+
+
+class SubjectItemIndex:
+    """A subject's published questions with their (a, b), sorted by difficulty"""
+
+    def __init__(self, items):
+        items = sorted(items, key=lambda item: item[2])
+        self.question_ids = [question_id for question_id, _, _ in items]
+        self.difficulties = [b for _, _, b in items]
+        self.parameters = {question_id: (a, b) for question_id, a, b in items}
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, subject_id):
+        rows = MultipleChoiceQuestion.objects.filter(
+            paper__subject_id=subject_id,
+            paper__is_published=True
+        ).order_by().values_list(
+            'id', 'difficulty', 'statistics__irt_discrimination', 'statistics__irt_difficulty'
+        )
+        return cls([
+            (
+                question_id,
+                a if a is not None and b is not None else DEFAULT_DISCRIMINATION,
+                b if a is not None and b is not None else LABEL_DIFFICULTY.get(label, 0.0),
+            )
+            for question_id, label, a, b in rows
+        ])
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def select(self, theta, exclude=()):
+        """Most informative question at theta not in `exclude`, or None"""
+        exclude = set(exclude)
+        start = bisect.bisect_left(self.difficulties, theta)
+        candidates = []
+        for indexes in (range(start - 1, -1, -1), range(start, len(self.question_ids))):
+            taken = 0
+            for i in indexes:
+                question_id = self.question_ids[i]
+                if question_id in exclude:
+                    continue
+                a, b = self.parameters[question_id]
+                candidates.append((information(theta, a, b), question_id))
+                taken += 1
+                if taken >= SELECTION_WINDOW:
+                    break
+
+        if not candidates:
+            return None
+        candidates.sort(reverse=True)
+        return random.choice(candidates[:RANDOMESQUE_TOP_K])[1]
+
+
+_item_indexes = {}
+_item_indexes_lock = threading.Lock()
+
+
+def get_item_index(subject_id):
+    """Return this process's item index for a subject, rebuilding it when stale"""
+    index = _item_indexes.get(subject_id)
+    if index is None or time.monotonic() - index.built_at > ITEM_INDEX_TTL:
+        index = SubjectItemIndex.build(subject_id)
+        with _item_indexes_lock:
+            _item_indexes[subject_id] = index
+    return index
+
+
+def clear_item_indexes():
+    with _item_indexes_lock:
+        _item_indexes.clear()
+
+
+def _next_question(session, index, withheld=()):
+    """Choose the next question, or complete the session if it is done"""
+    answered = [question_id for question_id, _, _ in session.responses]
+    done = (
+        len(answered) >= session.max_questions
+        or (answered and session.standard_error <= TARGET_STANDARD_ERROR)
+    )
+    question_id = None if done else index.select(session.ability, exclude=set(answered) | set(withheld))
+    session.current_question_id = question_id
+    if question_id is None:
+        session.status = 'completed'
+
+
+def start_session(student, subject_id, max_questions=DEFAULT_MAX_QUESTIONS, withheld=()):
+    """Create a practice session and choose its first question, never one of `withheld`"""
+    index = get_item_index(subject_id)
+    if not len(index):
+        raise PracticeError('No published questions are available for this subject')
+
+    session = PracticeSession(student=student, subject_id=subject_id, max_questions=max_questions)
+    _next_question(session, index, withheld)
+    session.save()
+    return session
+
+
+def answer_question(session, question_id, selected_answer, withheld=()):
+    """
+    Record an answer to the session's current question and choose the next one
+
+    The next question is never one of `withheld`.
+
+    Returns:
+        The answered MultipleChoiceQuestion and whether the answer was correct
+    """
+    if session.status != 'active':
+        raise PracticeError('This practice session has finished')
+    if question_id != session.current_question_id:
+        raise PracticeError('Answer the current question of the session')
+
+    question = MultipleChoiceQuestion.objects.only('id', 'correct_answer', 'explanation').filter(id=question_id).first()
+    if question is None:
+        raise PracticeError('This question is no longer available')
+    is_correct = selected_answer == question.correct_answer
+
+    index = get_item_index(session.subject_id)
+    session.responses.append([question_id, selected_answer, is_correct])
+    session.ability, session.standard_error = estimate_ability(
+        index.parameters[q] + (correct,)
+        for q, _, correct in session.responses
+        if q in index.parameters
+    )
+    _next_question(session, index, withheld)
+
+    # Only advance the session if no concurrent answer got there first
+    updated = PracticeSession.objects.filter(
+        pk=session.pk, status='active', current_question_id=question_id
+    ).update(
+        ability=session.ability,
+        standard_error=session.standard_error,
+        responses=session.responses,
+        current_question_id=session.current_question_id,
+        status=session.status,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        raise PracticeError('This question has already been answered')
+    if not is_correct:
+        enqueue_for_review(session.student_id, [question_id], 'wrong_answer')
+    return question, is_correct
+
+
+def serialize_session(session):
+    """
+    Session state, with the current question if there is one (one query)
+
+    Raises PracticeError if the current question has been deleted.
+    """
+    current = None
+    if session.status == 'active':
+        question = MultipleChoiceQuestion.objects.select_related('topic').filter(
+            id=session.current_question_id
+        ).first() if session.current_question_id else None
+        if question is None:
+            raise PracticeError('The current question of this session is no longer available')
+        current = serialize_mcq(question)
+
+    responses = session.responses
+    return {
+        'session_id': session.id,
+        'subject_id': session.subject_id,
+        'status': session.status,
+        'ability': round(session.ability, 3),
+        'standard_error': round(session.standard_error, 3),
+        'answered_count': len(responses),
+        'correct_count': sum(1 for _, _, is_correct in responses if is_correct),
+        'max_questions': session.max_questions,
+        'current_question': current,
+    }
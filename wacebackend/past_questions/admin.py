@@ -1,8 +1,11 @@
 from django.contrib import admin
+from django.db.models import Count
 from .models import (
     QuestionTopic, PastQuestionPaper, MultipleChoiceQuestion, EssayQuestion, 
-    EssaySubQuestion, StudentAttempt, MCQAnswer, EssayAnswer, QuestionBookmark
+    EssaySubQuestion, StudentAttempt, MCQAnswer, EssayAnswer, QuestionBookmark, QuestionStatistics,
+    PracticeSession, MockExam, MockExamQuestion, ReviewItem
 )
+from .item_statistics import suggested_difficulty
 
 
 class MCQInline(admin.TabularInline):
@@ -38,19 +41,29 @@ class QuestionTopicAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     ordering = ['subject', 'order', 'name']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            mcq_count=Count('mcq_questions', distinct=True),
+            essay_count=Count('essay_questions', distinct=True),
+        )
+    
     def question_count(self, obj):
-        mcq_count = obj.mcq_questions.count()
-        essay_count = obj.essay_questions.count()
-        return f"{mcq_count + essay_count} questions"
+        return f"{obj.mcq_count + obj.essay_count} questions"
     question_count.short_description = 'Total Questions'
 
 
 @admin.register(MultipleChoiceQuestion)
 class MultipleChoiceQuestionAdmin(admin.ModelAdmin):
-    list_display = ['paper', 'question_number', 'topic', 'correct_answer', 'difficulty', 'marks']
+    list_display = ['paper', 'question_number', 'topic', 'correct_answer', 'difficulty', 'measured_p_value', 'marks']
     list_filter = ['paper__subject', 'paper__year', 'topic', 'difficulty']
     search_fields = ['question_text', 'paper__subject__name', 'topic__name']
     ordering = ['paper', 'question_number']
+    list_select_related = ['paper__subject', 'topic', 'statistics']
+    
+    def measured_p_value(self, obj):
+        stats = getattr(obj, 'statistics', None)
+        return stats.p_value if stats else None
+    measured_p_value.short_description = 'P-value'
 
 
 @admin.register(EssayQuestion)
@@ -99,3 +112,70 @@ class QuestionBookmarkAdmin(admin.ModelAdmin):
     list_filter = ['paper__subject', 'paper__year']
     search_fields = ['student__username', 'notes']
     ordering = ['-created_at']
+
+
+@admin.register(QuestionStatistics)
+class QuestionStatisticsAdmin(admin.ModelAdmin):
+    list_display = [
+        'question', 'attempts_count', 'p_value', 'discrimination', 'labelled_difficulty',
+        'measured_difficulty', 'updated_at'
+    ]
+    list_filter = ['question__paper__subject', 'question__difficulty']
+    search_fields = ['question__question_text', 'question__paper__subject__name']
+    list_select_related = ['question__paper__subject']
+    ordering = ['discrimination']
+    readonly_fields = [
+        'question', 'attempts_count', 'correct_count', 'omitted_count', 'option_counts', 'sum_total',
+        'sum_total_sq', 'sum_correct_total', 'p_value', 'discrimination', 'irt_discrimination',
+        'irt_difficulty', 'updated_at'
+    ]
+    
+    def labelled_difficulty(self, obj):
+        return obj.question.difficulty
+    labelled_difficulty.short_description = 'Labelled'
+    
+    def measured_difficulty(self, obj):
+        return suggested_difficulty(obj.p_value)
+    measured_difficulty.short_description = 'Measured'
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(PracticeSession)
+class PracticeSessionAdmin(admin.ModelAdmin):
+    list_display = ['student', 'subject', 'status', 'answered_count', 'ability', 'standard_error', 'started_at']
+    list_filter = ['status', 'subject']
+    search_fields = ['student__username', 'subject__name']
+    list_select_related = ['student', 'subject']
+    readonly_fields = ['started_at', 'updated_at']
+    ordering = ['-started_at']
+    
+    def answered_count(self, obj):
+        return len(obj.responses)
+    answered_count.short_description = 'Answered'
+
+
+class MockExamQuestionInline(admin.TabularInline):
+    model = MockExamQuestion
+    extra = 0
+    raw_id_fields = ['question']
+
+
+@admin.register(MockExam)
+class MockExamAdmin(admin.ModelAdmin):
+    list_display = ['title', 'subject', 'duration_minutes', 'is_shared', 'created_by', 'created_at']
+    list_filter = ['subject', 'is_shared']
+    search_fields = ['title', 'subject__name']
+    readonly_fields = ['blueprint_hash', 'created_at']
+    ordering = ['-created_at']
+    inlines = [MockExamQuestionInline]
+
+
+@admin.register(ReviewItem)
+class ReviewItemAdmin(admin.ModelAdmin):
+    list_display = ['student', 'question', 'source', 'due_at', 'interval_days', 'repetitions', 'lapses']
+    list_filter = ['source', 'question__paper__subject']
+    search_fields = ['student__username']
+    raw_id_fields = ['student', 'question']
+    ordering = ['due_at']
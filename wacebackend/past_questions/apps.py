@@ -5,3 +5,6 @@ class PastQuestionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'past_questions'
     verbose_name = 'WASSCE Past Questions'
+
+    def ready(self):
+        from . import signals  # noqa: F401
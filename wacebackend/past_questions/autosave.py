@@ -0,0 +1,193 @@
+"""
+Autosave for in-progress past paper attempts
+
+Clients autosave every few seconds while a student sits a paper. Each
+autosave merges the changed answers into StudentAttempt.autosave_state,
+a pending-changes buffer on the attempt row, so an option change costs
+one row update rather than an upsert per answer. The buffer is flushed
+into the answer tables with one bulk upsert per answer type once
+AUTOSAVE_FLUSH_SECONDS have passed since the last flush, and always
+before the attempt is graded.
+
+Time is tracked on the server from the gaps between autosaves. A gap
+longer than AUTOSAVE_MAX_GAP_SECONDS (the app was closed or the device
+slept) only counts up to that cap. The total is written to
+StudentAttempt.time_spent_minutes with every autosave.
+
+Every autosave and flush locks the attempt row (grading takes the same
+lock), so concurrent autosaves and a submit can't overwrite each other's
+changes, and nothing is written once the attempt has been graded.
+Changes that arrive after time is up are refused, but everything
+buffered before then is kept and graded on submit.
+"""
+import time
+
+from django.db import transaction
+
+from .grading import VALID_OPTIONS, GradingError, load_answer_key, save_mcq_answers
+from .models import EssayAnswer, EssayQuestion, MCQAnswer, StudentAttempt
+
+AUTOSAVE_FLUSH_SECONDS = 30
+AUTOSAVE_MAX_GAP_SECONDS = 120
+# Extra time allowed after the paper's duration for the last autosave to arrive
+AUTOSAVE_GRACE_SECONDS = 60
+MAX_ESSAY_LENGTH = 50000
+
+
+class AutosaveError(Exception):
+    """Raised when an autosave cannot be accepted"""
+
+
+def _new_state(attempt, now):
+    return {
+        'active_seconds': attempt.time_spent_minutes * 60,
+        'last_seen': now,
+        'flushed_at': now,
+        'mcq': {},
+        'essay': {},
+    }
+
+
+def _lock_attempt(attempt_id, **filters):
+    """The attempt with its paper, its row locked until the end of the transaction"""
+    return StudentAttempt.objects.select_for_update(of=('self',)).select_related('paper').filter(
+        id=attempt_id, **filters
+    ).first()
+
+
+def parse_changes(data):
+    """
+    Validate an autosave body into ({question_id: option or None}, {question_id: text})
+
+    A null MCQ option clears the student's selection.
+    """
+    mcq, essay = data.get('mcq') or {}, data.get('essay') or {}
+    if not isinstance(mcq, dict) or not isinstance(essay, dict):
+        raise AutosaveError('mcq and essay must be objects keyed by question id')
+
+    mcq_changes, essay_changes = {}, {}
+    try:
+        for question_id, option in mcq.items():
+            if option is not None:
+                option = str(option).strip().upper()
+                if option not in VALID_OPTIONS:
+                    raise AutosaveError(f'Invalid option {option!r} for question {question_id}')
+            mcq_changes[int(question_id)] = option
+        for question_id, text in essay.items():
+            if not isinstance(text, str) or len(text) > MAX_ESSAY_LENGTH:
+                raise AutosaveError(f'Invalid answer text for question {question_id}')
+            essay_changes[int(question_id)] = text
+    except ValueError:
+        raise AutosaveError('Question ids must be integers')
+    return mcq_changes, essay_changes
+
+
+def autosave(attempt_id, student, mcq_changes, essay_changes, now=None):
+    """
+    Buffer answer changes for an attempt, flushing when the interval has passed
+
+    Args:
+        attempt_id: Id of the StudentAttempt being autosaved
+        student: The auth.User sitting the attempt
+        mcq_changes, essay_changes: Output of parse_changes()
+
+    Returns:
+        Dict with the pending change count, whether a flush happened, and
+        the tracked and remaining time in seconds; None if the attempt
+        doesn't exist or belongs to someone else
+    """
+    now = time.time() if now is None else now
+    with transaction.atomic():
+        attempt = _lock_attempt(attempt_id, student=student)
+        if attempt is None:
+            return None
+        if attempt.status != 'in_progress':
+            raise AutosaveError('This attempt has already been submitted')
+
+        state = attempt.autosave_state or _new_state(attempt, now)
+        deadline = attempt.started_at.timestamp() + attempt.paper.duration_minutes * 60
+        time_up = now > deadline + AUTOSAVE_GRACE_SECONDS
+        if time_up:
+            # Keep what was saved before time ran out; only these late changes are refused
+            mcq_changes, essay_changes = {}, {}
+        else:
+            state['active_seconds'] += min(max(now - state['last_seen'], 0), AUTOSAVE_MAX_GAP_SECONDS)
+            state['last_seen'] = now
+        # JSON object keys are strings
+        state['mcq'].update({str(q): option for q, option in mcq_changes.items()})
+        state['essay'].update({str(q): text for q, text in essay_changes.items()})
+
+        flushed = time_up or now - state['flushed_at'] >= AUTOSAVE_FLUSH_SECONDS
+        if flushed:
+            _write_pending(attempt, state)
+            state['mcq'], state['essay'] = {}, {}
+            state['flushed_at'] = now
+        StudentAttempt.objects.filter(id=attempt_id).update(
+            autosave_state=state,
+            time_spent_minutes=int(state['active_seconds'] // 60)
+        )
+
+    if time_up:
+        raise AutosaveError('Time is up for this attempt; submit it to be graded')
+    return {
+        'pending': len(state['mcq']) + len(state['essay']),
+        'flushed': flushed,
+        'time_spent_seconds': int(state['active_seconds']),
+        'remaining_seconds': max(0, int(deadline - now)),
+    }
+
+
+def _write_pending(attempt, state):
+    """Write an attempt's pending answers to the answer tables; the caller holds the row lock"""
+    mcq = {int(q): option for q, option in state['mcq'].items()}
+    essay = {int(q): text for q, text in state['essay'].items()}
+    if mcq:
+        answer_key = load_answer_key(attempt.paper_id)
+        save_mcq_answers(
+            attempt,
+            {q: option for q, option in mcq.items() if option is not None and q in answer_key},
+            answer_key
+        )
+        cleared = [q for q, option in mcq.items() if option is None]
+        if cleared:
+            MCQAnswer.objects.filter(attempt_id=attempt.id, question_id__in=cleared).delete()
+    if essay:
+        question_ids = set(
+            EssayQuestion.objects.filter(
+                paper_id=attempt.paper_id, id__in=essay.keys()
+            ).order_by().values_list('id', flat=True)
+        )
+        EssayAnswer.objects.bulk_create(
+            [
+                EssayAnswer(attempt_id=attempt.id, question_id=q, answer_text=text)
+                for q, text in essay.items() if q in question_ids
+            ],
+            update_conflicts=True,
+            unique_fields=['attempt', 'question'],
+            update_fields=['answer_text'],
+        )
+
+
+def flush_attempt(attempt):
+    """
+    Write and clear any pending autosaved changes for an attempt, e.g. before grading
+
+    Call it in the transaction that grades the attempt, so the row stays
+    locked until the grade is written.
+
+    Returns:
+        Server-tracked time spent in minutes, or None if the attempt was never autosaved
+    """
+    locked = _lock_attempt(attempt.id)
+    if locked is None or locked.student_id != attempt.student_id:
+        raise GradingError('Attempt does not belong to this student')
+    if locked.status != 'in_progress':
+        raise GradingError('This attempt has already been submitted')
+    state = locked.autosave_state
+    if state is None:
+        return None
+    if state['mcq'] or state['essay']:
+        _write_pending(locked, state)
+        state['mcq'], state['essay'] = {}, {}
+        StudentAttempt.objects.filter(id=attempt.id).update(autosave_state=state)
+    return int(state['active_seconds'] // 60)
@@ -0,0 +1,169 @@
+"""
+Bulk grading of objective (MCQ) answer sheets for StudentAttempt
+
+A whole answer sheet is graded in memory against the paper's answer key,
+which is loaded in one query. MCQAnswer rows are written with a single
+bulk upsert, with is_correct computed beforehand, so MCQAnswer.save() and
+its per-answer question lookup are never called. A paper of any length
+is graded in a fixed number of queries.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import MultipleChoiceQuestion, MCQAnswer, StudentAttempt
+from .review import enqueue as enqueue_for_review
+
+VALID_OPTIONS = {'A', 'B', 'C', 'D', 'E'}
+
+
+class GradingError(Exception):
+    """Raised when an answer sheet cannot be graded"""
+
+
+def normalize_answers(answers):
+    """
+    Turn a submitted answer sheet into {question_id: option}
+
+    Accepts {"<question_id>": "A"} or [{"question_id": 1, "selected_answer": "A"}].
+    Blank answers are dropped. Raises GradingError for malformed sheets.
+    """
+    if isinstance(answers, dict):
+        items = answers.items()
+    elif isinstance(answers, list):
+        try:
+            items = [(item['question_id'], item.get('selected_answer')) for item in answers]
+        except (KeyError, TypeError, AttributeError):
+            raise GradingError('Each answer needs a question_id and selected_answer')
+    else:
+        raise GradingError('answers must be an object or a list')
+
+    normalized = {}
+    for question_id, option in items:
+        try:
+            question_id = int(question_id)
+        except (TypeError, ValueError):
+            raise GradingError(f'Invalid question id: {question_id!r}')
+        if option in (None, ''):
+            continue
+        option = str(option).strip().upper()
+        if option not in VALID_OPTIONS:
+            raise GradingError(f'Invalid option {option!r} for question {question_id}')
+        normalized[question_id] = option
+    return normalized
+
+
+def load_answer_key(paper_id):
+    """{question_id: (correct_answer, marks, explanation)} for a paper, in one query"""
+    return {
+        question_id: (correct_answer, marks, explanation)
+        for question_id, correct_answer, marks, explanation in MultipleChoiceQuestion.objects.filter(
+            paper_id=paper_id
+        ).order_by().values_list('id', 'correct_answer', 'marks', 'explanation')
+    }
+
+
+def save_mcq_answers(attempt, answers, answer_key):
+    """
+    Upsert MCQAnswer rows for an attempt in one statement
+
+    Args:
+        attempt: The StudentAttempt being answered
+        answers: {question_id: option}, already restricted to the paper's questions
+        answer_key: Result of load_answer_key()
+    """
+    if not answers:
+        return
+    MCQAnswer.objects.bulk_create(
+        [
+            MCQAnswer(
+                attempt=attempt,
+                question_id=question_id,
+                selected_answer=option,
+                is_correct=(option == answer_key[question_id][0]),
+            )
+            for question_id, option in answers.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['attempt', 'question'],
+        update_fields=['selected_answer', 'is_correct'],
+    )
+
+
+def grade_attempt(attempt, answers, time_spent_minutes=None):
+    """
+    Grade and complete an in-progress attempt
+
+    Submitted answers replace any saved earlier for the same questions.
+    Answers to questions that are not on the paper are ignored.
+
+    Returns:
+        Dict with the score, percentage and per-question results
+    """
+    if attempt.status != 'in_progress':
+        raise GradingError('This attempt has already been submitted')
+
+    answer_key = load_answer_key(attempt.paper_id)
+    ignored = sorted(question_id for question_id in answers if question_id not in answer_key)
+    answers = {question_id: option for question_id, option in answers.items() if question_id in answer_key}
+
+    with transaction.atomic():
+        # Lock the attempt first so an autosave flush can't change answers while they're scored
+        if not StudentAttempt.objects.select_for_update().filter(pk=attempt.pk, status='in_progress').exists():
+            raise GradingError('This attempt has already been submitted')
+        saved = dict(
+            MCQAnswer.objects.filter(attempt=attempt).order_by().values_list('question_id', 'selected_answer')
+        )
+        save_mcq_answers(attempt, answers, answer_key)
+        saved.update(answers)
+
+        score = sum(marks for question_id, (correct, marks, _) in answer_key.items() if saved.get(question_id) == correct)
+        max_score = sum(marks for _, marks, _ in answer_key.values())
+        percentage = Decimal(score * 100) / max_score if max_score else Decimal(0)
+
+        now = timezone.now()
+        if time_spent_minutes is None:
+            time_spent_minutes = int((now - attempt.started_at).total_seconds() // 60)
+        updates = {
+            'status': 'completed',
+            'completed_at': now,
+            'total_score': Decimal(score),
+            'percentage': percentage.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+            'time_spent_minutes': time_spent_minutes,
+        }
+        # Conditional update so two concurrent submissions can't both complete the attempt
+        if not StudentAttempt.objects.filter(pk=attempt.pk, status='in_progress').update(**updates):
+            raise GradingError('This attempt has already been submitted')
+        for field, value in updates.items():
+            setattr(attempt, field, value)
+
+        # Wrong answers join the student's spaced-repetition review queue
+        enqueue_for_review(
+            attempt.student_id,
+            [q for q, option in saved.items() if q in answer_key and option != answer_key[q][0]],
+            'wrong_answer'
+        )
+
+    return {
+        'attempt_id': attempt.id,
+        'status': attempt.status,
+        'score': score,
+        'max_score': max_score,
+        'percentage': float(attempt.percentage),
+        'answered_count': len(saved),
+        'correct_count': sum(1 for question_id, (correct, _, _) in answer_key.items() if saved.get(question_id) == correct),
+        'question_count': len(answer_key),
+        'time_spent_minutes': attempt.time_spent_minutes,
+        'ignored_question_ids': ignored,
+        'results': [
+            {
+                'question_id': question_id,
+                'selected_answer': saved.get(question_id),
+                'correct_answer': correct,
+                'is_correct': saved.get(question_id) == correct,
+                'explanation': explanation,
+            }
+            for question_id, (correct, _, explanation) in answer_key.items()
+        ],
+    }
@@ -0,0 +1,219 @@
+"""
+Incremental item statistics for multiple choice questions
+
+For every question, QuestionStatistics keeps running sums over the
+completed attempts of its paper: attempt and correct counts, how often
+each option was chosen, and sums of the attempts' MCQ scores. The p-value
+(share answering correctly) and the point-biserial discrimination are
+derived from those sums.
+
+Each run only reads attempts completed after the watermark, so it costs
+a few queries per batch however many answers exist. The discrimination
+correlates the item with the rest of the paper's MCQ score, i.e. the
+score with the item's own marks taken out. This keeps an item from
+correlating with itself. Omitted questions count as incorrect.
+"""
+import math
+from datetime import timedelta
+from statistics import NormalDist
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    MCQAnswer, MultipleChoiceQuestion, QuestionStatistics, StatisticsWatermark, StudentAttempt
+)
+
+WATERMARK_NAME = 'item_statistics'
+BATCH_SIZE = 2000
+# Attempts completed this recently are left for the next run, so an attempt whose
+# transaction commits late can't slip in behind the watermark
+SETTLE_SECONDS = 60
+MIN_ATTEMPTS = 10  # Fewer attempts than this give no usable statistics
+# Bounds for the estimated 2PL item parameters
+IRT_DISCRIMINATION_RANGE = (0.2, 2.5)
+IRT_DIFFICULTY_RANGE = (-3.0, 3.0)
+
+
+def _clamp(value, bounds):
+    return min(max(value, bounds[0]), bounds[1])
+
+
+def estimate_irt_parameters(p_value, discrimination):
+    """
+    Approximate 2PL (a, b) from classical statistics
+
+    Converts the point-biserial to a biserial correlation and applies
+    Lord's approximations a = r / sqrt(1 - r^2), b = -z / r, where z is
+    the normal quantile of the p-value. Returns (None, None) when the item
+    doesn't discriminate positively.
+    """
+    if p_value is None or discrimination is None or discrimination <= 0 or not 0 < p_value < 1:
+        return None, None
+    z = NormalDist().inv_cdf(p_value)
+    biserial = min(discrimination * math.sqrt(p_value * (1 - p_value)) / NormalDist().pdf(z), 0.99)
+    a = _clamp(biserial / math.sqrt(1 - biserial ** 2), IRT_DISCRIMINATION_RANGE)
+    b = _clamp(-z / biserial, IRT_DIFFICULTY_RANGE)
+    return round(a, 4), round(b, 4)
+
+
+def derive_statistics(stats, marks):
+    """Set p_value, discrimination and IRT parameters on a QuestionStatistics from its running sums"""
+    _derive_classical(stats, marks)
+    stats.irt_discrimination, stats.irt_difficulty = estimate_irt_parameters(stats.p_value, stats.discrimination)
+
+
+def _derive_classical(stats, marks):
+    n = stats.attempts_count
+    if n < MIN_ATTEMPTS:
+        stats.p_value = stats.discrimination = None
+        return
+
+    correct = stats.correct_count
+    p = correct / n
+    stats.p_value = round(p, 4)
+    stats.discrimination = None
+    if correct in (0, n):
+        return
+
+    # Rest score r = total - marks * x, with x = 1 if correct else 0 (so x**2 == x)
+    sum_rest = stats.sum_total - marks * correct
+    sum_rest_sq = stats.sum_total_sq - 2 * marks * stats.sum_correct_total + marks * marks * correct
+    sum_rest_correct = stats.sum_correct_total - marks * correct
+
+    variance = sum_rest_sq / n - (sum_rest / n) ** 2
+    if variance <= 1e-12:
+        return
+    mean_correct = sum_rest_correct / correct
+    mean_incorrect = (sum_rest - sum_rest_correct) / (n - correct)
+    stats.discrimination = round((mean_correct - mean_incorrect) / math.sqrt(variance) * math.sqrt(p * (1 - p)), 4)
+
+
+def suggested_difficulty(p_value):
+    """Map a p-value onto MultipleChoiceQuestion.difficulty choices"""
+    if p_value is None:
+        return None
+    if p_value >= 0.7:
+        return 'easy'
+    if p_value >= 0.3:
+        return 'medium'
+    return 'hard'
+
+
+def _fold_batch(attempts):
+    """
+    Add a batch of completed attempts to the statistics of their papers' questions
+
+    Args:
+        attempts: List of (attempt_id, paper_id) tuples
+    """
+    paper_by_attempt = dict(attempts)
+    questions_by_paper = {}
+    marks_by_question = {}
+    for question_id, paper_id, marks in MultipleChoiceQuestion.objects.filter(
+        paper_id__in=set(paper_by_attempt.values())
+    ).order_by().values_list('id', 'paper_id', 'marks'):
+        questions_by_paper.setdefault(paper_id, []).append(question_id)
+        marks_by_question[question_id] = marks
+
+    answers_by_attempt = {}
+    for attempt_id, question_id, selected_answer, is_correct in MCQAnswer.objects.filter(
+        attempt_id__in=paper_by_attempt.keys()
+    ).order_by().values_list('attempt_id', 'question_id', 'selected_answer', 'is_correct'):
+        answers_by_attempt.setdefault(attempt_id, {})[question_id] = (selected_answer, is_correct)
+
+    stats_by_question = {
+        stats.question_id: stats
+        for stats in QuestionStatistics.objects.filter(question_id__in=marks_by_question.keys())
+    }
+    new_stats = []
+
+    for attempt_id, paper_id in attempts:
+        answers = answers_by_attempt.get(attempt_id, {})
+        question_ids = questions_by_paper.get(paper_id, [])
+        total = sum(
+            marks_by_question[question_id]
+            for question_id in question_ids
+            if answers.get(question_id, (None, False))[1]
+        )
+        for question_id in question_ids:
+            stats = stats_by_question.get(question_id)
+            if stats is None:
+                stats = QuestionStatistics(question_id=question_id, option_counts={})
+                stats_by_question[question_id] = stats
+                new_stats.append(stats)
+
+            selected_answer, is_correct = answers.get(question_id, (None, False))
+            stats.attempts_count += 1
+            stats.sum_total += total
+            stats.sum_total_sq += total * total
+            if is_correct:
+                stats.correct_count += 1
+                stats.sum_correct_total += total
+            if selected_answer:
+                stats.option_counts[selected_answer] = stats.option_counts.get(selected_answer, 0) + 1
+            else:
+                stats.omitted_count += 1
+
+    for question_id, stats in stats_by_question.items():
+        derive_statistics(stats, marks_by_question[question_id])
+
+    now = timezone.now()
+    for stats in stats_by_question.values():
+        stats.updated_at = now
+    new_ids = {stats.question_id for stats in new_stats}
+    QuestionStatistics.objects.bulk_create(new_stats, batch_size=500)
+    QuestionStatistics.objects.bulk_update(
+        [stats for question_id, stats in stats_by_question.items() if question_id not in new_ids],
+        [
+            'attempts_count', 'correct_count', 'omitted_count', 'option_counts', 'sum_total',
+            'sum_total_sq', 'sum_correct_total', 'p_value', 'discrimination', 'irt_discrimination',
+            'irt_difficulty', 'updated_at',
+        ],
+        batch_size=500
+    )
+    return len(stats_by_question)
+
+
+def compute_item_statistics(full=False, batch_size=BATCH_SIZE):
+    """
+    Fold attempts completed since the last run into QuestionStatistics
+
+    Args:
+        full: Discard all statistics and the watermark, and start over
+        batch_size: Attempts read per batch
+
+    Returns:
+        Tuple of (attempts processed, question statistics rows written)
+    """
+    if full:
+        with transaction.atomic():
+            QuestionStatistics.objects.all().delete()
+            StatisticsWatermark.objects.filter(name=WATERMARK_NAME).delete()
+
+    cutoff = timezone.now() - timedelta(seconds=SETTLE_SECONDS)
+    attempts_processed = rows_written = 0
+
+    while True:
+        with transaction.atomic():
+            watermark, _ = StatisticsWatermark.objects.select_for_update().get_or_create(name=WATERMARK_NAME)
+            attempts = StudentAttempt.objects.filter(status='completed', completed_at__lte=cutoff)
+            if watermark.completed_at is not None:
+                attempts = attempts.filter(completed_at__gte=watermark.completed_at).exclude(
+                    completed_at=watermark.completed_at, id__lte=watermark.attempt_id
+                )
+            batch = list(
+                attempts.order_by('completed_at', 'id').values_list('id', 'paper_id', 'completed_at')[:batch_size]
+            )
+            if not batch:
+                break
+
+            rows_written += _fold_batch([(attempt_id, paper_id) for attempt_id, paper_id, _ in batch])
+            attempts_processed += len(batch)
+            watermark.attempt_id, _, watermark.completed_at = batch[-1]
+            watermark.save(update_fields=['attempt_id', 'completed_at', 'updated_at'])
+
+        if len(batch) < batch_size:
+            break
+
+    return attempts_processed, rows_written
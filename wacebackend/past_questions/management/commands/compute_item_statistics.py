@@ -0,0 +1,43 @@
+"""
+Django management command to update per-question item statistics
+Usage: python manage.py compute_item_statistics [--full] [--batch-size 2000]
+
+Only attempts completed since the previous run are read, so it is cheap to
+run periodically (e.g. from a cron job every few minutes).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from past_questions.item_statistics import BATCH_SIZE, compute_item_statistics
+from past_questions.models import QuestionStatistics, StatisticsWatermark
+
+
+class Command(BaseCommand):
+    help = 'Fold newly completed attempts into MCQ difficulty and discrimination statistics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Discard existing statistics and recompute from every completed attempt',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f'Attempts processed per transaction (default: {BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Computing item statistics from completed attempts...")
+
+        start = time.perf_counter()
+        attempts, rows = compute_item_statistics(full=options['full'], batch_size=max(1, options['batch_size']))
+        elapsed = time.perf_counter() - start
+
+        watermark = StatisticsWatermark.objects.filter(name='item_statistics').first()
+        self.stdout.write(self.style.SUCCESS(f"✅ Processed {attempts} attempts in {elapsed:.2f}s"))
+        self.stdout.write(f"  • Statistics rows written: {rows}")
+        self.stdout.write(f"  • Questions with statistics: {QuestionStatistics.objects.count()}")
+        self.stdout.write(f"  • Watermark: {watermark.completed_at if watermark else 'none'}")
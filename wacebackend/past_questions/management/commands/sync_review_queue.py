@@ -0,0 +1,51 @@
+"""
+Django management command to backfill spaced-repetition review queues
+Usage: python manage.py sync_review_queue [--batch-size 5000]
+
+Adds every bookmarked MCQ and every MCQ answered wrongly in a completed
+attempt to its student's review queue. Items already queued keep their
+schedule, so the command is safe to re-run.
+"""
+from django.core.management.base import BaseCommand
+
+from past_questions.models import MCQAnswer, QuestionBookmark, ReviewItem
+from past_questions.review import enqueue_pairs
+
+
+class Command(BaseCommand):
+    help = 'Queue bookmarked and wrongly answered questions for spaced-repetition review'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='(student, question) pairs inserted per batch (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        before = ReviewItem.objects.count()
+
+        sources = [
+            ('bookmark', QuestionBookmark.objects.filter(mcq_question__isnull=False).values_list(
+                'student_id', 'mcq_question_id'
+            )),
+            ('wrong_answer', MCQAnswer.objects.filter(
+                is_correct=False, attempt__status='completed'
+            ).values_list('attempt__student_id', 'question_id')),
+        ]
+        for source, pairs in sources:
+            self.stdout.write(f"Queueing {source.replace('_', ' ')}s...")
+            batch = []
+            for pair in pairs.order_by().distinct().iterator(chunk_size=batch_size):
+                batch.append(pair)
+                if len(batch) >= batch_size:
+                    enqueue_pairs(batch, source)
+                    batch = []
+            enqueue_pairs(batch, source)
+
+        added = ReviewItem.objects.count() - before
+        self.stdout.write(self.style.SUCCESS(f"✅ Added {added} review items"))
+        self.stdout.write(f"  • Total review items: {before + added}")
+
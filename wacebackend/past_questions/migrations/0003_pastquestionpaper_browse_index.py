@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('past_questions', '0002_questiontopic_essayquestion_topic_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pastquestionpaper',
+            index=models.Index(fields=['subject', 'is_published', 'year'], name='pastpaper_subj_pub_year_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('past_questions', '0003_pastquestionpaper_browse_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts_count', models.PositiveIntegerField(default=0)),
+                ('correct_count', models.PositiveIntegerField(default=0)),
+                ('omitted_count', models.PositiveIntegerField(default=0)),
+                ('option_counts', models.JSONField(default=dict)),
+                ('sum_total', models.FloatField(default=0)),
+                ('sum_total_sq', models.FloatField(default=0)),
+                ('sum_correct_total', models.FloatField(default=0)),
+                ('p_value', models.FloatField(blank=True, help_text='Proportion of attempts answering correctly', null=True)),
+                ('discrimination', models.FloatField(blank=True, help_text="Point-biserial correlation with the rest of the paper's MCQ score", null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Question statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='StatisticsWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempt_id', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='studentattempt',
+            index=models.Index(fields=['status', 'completed_at', 'id'], name='attempt_status_completed_idx'),
+        ),
+        migrations.AddField(
+            model_name='questionstatistics',
+            name='question',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='past_questions.multiplechoicequestion'),
+        ),
+    ]
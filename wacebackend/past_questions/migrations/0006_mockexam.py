@@ -0,0 +1,56 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_subjectprogress'),
+        ('past_questions', '0005_practicesession'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MockExam',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('blueprint', models.JSONField()),
+                ('blueprint_hash', models.CharField(db_index=True, max_length=40)),
+                ('duration_minutes', models.IntegerField(default=90)),
+                ('is_shared', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mock_exams', to='courses.subject')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MockExamQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_number', models.IntegerField()),
+                ('mock_exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mock_questions', to='past_questions.mockexam')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='past_questions.multiplechoicequestion')),
+            ],
+            options={
+                'ordering': ['mock_exam', 'question_number'],
+                'unique_together': {('mock_exam', 'question_number')},
+            },
+        ),
+        migrations.AddField(
+            model_name='mockexam',
+            name='questions',
+            field=models.ManyToManyField(related_name='mock_exams', through='past_questions.MockExamQuestion', to='past_questions.multiplechoicequestion'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='mockexam',
+            unique_together={('subject', 'blueprint_hash')},
+        ),
+    ]
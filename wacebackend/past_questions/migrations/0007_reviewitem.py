@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('past_questions', '0006_mockexam'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('bookmark', 'Bookmark'), ('wrong_answer', 'Wrong answer')], max_length=20)),
+                ('due_at', models.DateTimeField()),
+                ('interval_days', models.PositiveIntegerField(default=0)),
+                ('ease_factor', models.PositiveSmallIntegerField(default=250)),
+                ('repetitions', models.PositiveSmallIntegerField(default=0)),
+                ('lapses', models.PositiveSmallIntegerField(default=0)),
+                ('last_reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='past_questions.multiplechoicequestion')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['due_at'],
+                'indexes': [models.Index(fields=['student', 'due_at'], name='review_student_due_idx')],
+                'unique_together': {('student', 'question')},
+            },
+        ),
+    ]
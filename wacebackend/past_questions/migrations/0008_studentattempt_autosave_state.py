@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('past_questions', '0007_reviewitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentattempt',
+            name='autosave_state',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
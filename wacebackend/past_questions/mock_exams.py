@@ -0,0 +1,319 @@
+"""
+Blueprint-based mock exams assembled from past questions of every year
+
+A blueprint asks for a number of questions per QuestionTopic and,
+optionally, a difficulty mix:
+
+    {"topics": {"12": 10, "15": 5}, "difficulty": {"easy": 0.3, "medium": 0.5, "hard": 0.2},
+     "year_from": 2015, "year_to": 2024}
+
+Selection runs on the cached per-topic question pools (see quiz.py). A
+greedy pass fills each topic, scarcest first, from the difficulty that
+is furthest below its target. A repair pass then swaps questions within
+a topic until the mix can't get closer to the target. The topic counts
+are hard constraints and the difficulty mix is a soft one.
+
+Mocks are stored and deduplicated by blueprint, and their serialized
+bodies are cached. A shared mock (assembled by staff) serves every
+student who asks for it. Students can assemble private mocks: their
+hash includes the owner, and only the MAX_PRIVATE_MOCKS most recent are
+kept per student.
+"""
+import hashlib
+import json
+import random
+import time
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from courses.catalog import to_json_bytes
+from .models import MockExam, MockExamQuestion, QuestionTopic
+from .paper_cache import PAPER_BODY_TIMEOUT, serialize_mcq
+from .quiz import allocate, get_question_bank_version, get_topic_pool
+
+MAX_MOCK_QUESTIONS = 100
+MAX_PRIVATE_MOCKS = 20
+MIN_DURATION_MINUTES = 1
+MAX_DURATION_MINUTES = 300
+DIFFICULTIES = ('easy', 'medium', 'hard')
+# Time after a mock's duration during which it still counts as open
+OPEN_MOCK_GRACE_SECONDS = 60 * 10
+
+
+class BlueprintError(Exception):
+    """Raised when a blueprint is invalid or can't be met"""
+
+
+def normalize_blueprint(data):
+    """
+    Validate a blueprint into a canonical form
+
+    Returns:
+        Dict with topics ([[topic_id, count], ...] sorted by topic id),
+        difficulty ({label: share} summing to 1, or None), year_from and year_to
+    """
+    if not isinstance(data, dict):
+        raise BlueprintError('blueprint must be an object')
+
+    topics = data.get('topics')
+    if not isinstance(topics, dict) or not topics:
+        raise BlueprintError('blueprint.topics must map topic ids to question counts')
+    try:
+        topics = sorted((int(topic_id), int(count)) for topic_id, count in topics.items())
+    except (TypeError, ValueError):
+        raise BlueprintError('Topic ids and question counts must be integers')
+    if any(count < 1 for _, count in topics):
+        raise BlueprintError('Question counts must be at least 1')
+    if sum(count for _, count in topics) > MAX_MOCK_QUESTIONS:
+        raise BlueprintError(f'A mock can have at most {MAX_MOCK_QUESTIONS} questions')
+
+    difficulty = data.get('difficulty')
+    if difficulty is not None:
+        if not isinstance(difficulty, dict) or not set(difficulty) <= set(DIFFICULTIES):
+            raise BlueprintError(f"blueprint.difficulty keys must be among: {', '.join(DIFFICULTIES)}")
+        try:
+            difficulty = {label: float(share) for label, share in difficulty.items()}
+        except (TypeError, ValueError):
+            raise BlueprintError('Difficulty shares must be numbers')
+        total = sum(difficulty.values())
+        if any(share < 0 for share in difficulty.values()) or total <= 0:
+            raise BlueprintError('Difficulty shares must be non-negative and not all zero')
+        difficulty = {label: round(share / total, 4) for label, share in sorted(difficulty.items()) if share}
+
+    years = []
+    for name in ('year_from', 'year_to'):
+        value = data.get(name)
+        try:
+            years.append(int(value) if value is not None else None)
+        except (TypeError, ValueError):
+            raise BlueprintError(f'{name} must be an integer')
+
+    return {
+        'topics': [list(item) for item in topics],
+        'difficulty': difficulty,
+        'year_from': years[0],
+        'year_to': years[1],
+    }
+
+
+def blueprint_hash(blueprint, seed=None, owner_id=None):
+    payload = {'blueprint': blueprint, 'seed': seed}
+    if owner_id is not None:
+        payload['owner'] = owner_id
+    payload = json.dumps(payload, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def select_questions(pools, topic_counts, difficulty_targets, rng=random):
+    """
+    Choose questions per topic that meet the counts and approach the difficulty targets
+
+    Args:
+        pools: {topic_id: [(question_id, difficulty, year), ...]}
+        topic_counts: {topic_id: number of questions wanted}
+        difficulty_targets: {difficulty: number of questions wanted}, or None
+        rng: random.Random instance
+
+    Returns:
+        {topic_id: [(question_id, difficulty), ...]}
+    """
+    # Unused questions per topic, bucketed by difficulty in random order
+    remaining = {}
+    for topic_id in topic_counts:
+        buckets = {}
+        for question_id, difficulty, _ in pools[topic_id]:
+            buckets.setdefault(difficulty, []).append(question_id)
+        for question_ids in buckets.values():
+            rng.shuffle(question_ids)
+        remaining[topic_id] = buckets
+
+    targets = difficulty_targets or {}
+    picked = {}
+    selected = {topic_id: [] for topic_id in topic_counts}
+
+    def deficit(difficulty):
+        return targets.get(difficulty, 0) - picked.get(difficulty, 0)
+
+    # Greedy: scarcest topics first, each pick from the most under-filled difficulty
+    for topic_id in sorted(topic_counts, key=lambda t: len(pools[t]) - topic_counts[t]):
+        buckets = remaining[topic_id]
+        for _ in range(topic_counts[topic_id]):
+            available = [difficulty for difficulty, question_ids in buckets.items() if question_ids]
+            if not available:
+                break
+            difficulty = max(available, key=lambda d: (deficit(d), rng.random()))
+            selected[topic_id].append((buckets[difficulty].pop(), difficulty))
+            picked[difficulty] = picked.get(difficulty, 0) + 1
+
+    if not targets:
+        return selected
+
+    # Repair: within a topic, swap a question of an over-filled difficulty for one
+    # of an under-filled difficulty; every swap moves the mix closer to the target
+    improved = True
+    while improved:
+        improved = False
+        for topic_id, chosen in selected.items():
+            buckets = remaining[topic_id]
+            for i, (question_id, difficulty) in enumerate(chosen):
+                if deficit(difficulty) >= 0:
+                    continue
+                under = [d for d, question_ids in buckets.items() if question_ids and deficit(d) > 0]
+                if not under:
+                    continue
+                replacement = max(under, key=deficit)
+                chosen[i] = (buckets[replacement].pop(), replacement)
+                buckets.setdefault(difficulty, []).append(question_id)
+                picked[difficulty] -= 1
+                picked[replacement] = picked.get(replacement, 0) + 1
+                improved = True
+    return selected
+
+
+def assemble_mock_exam(subject_id, blueprint, title=None, duration_minutes=90, seed=None, created_by=None,
+                       shared=True):
+    """
+    Return the mock for a blueprint, assembling and storing it if it doesn't exist yet
+
+    A private mock (shared=False) belongs to created_by. Creating one drops
+    that student's private mocks beyond the MAX_PRIVATE_MOCKS most recent.
+
+    Returns:
+        Tuple of (MockExam, created)
+    """
+    if not MIN_DURATION_MINUTES <= duration_minutes <= MAX_DURATION_MINUTES:
+        raise BlueprintError(
+            f'duration_minutes must be between {MIN_DURATION_MINUTES} and {MAX_DURATION_MINUTES}'
+        )
+    if not shared and created_by is None:
+        raise BlueprintError('A private mock needs an owner')
+    blueprint = normalize_blueprint(blueprint)
+    digest = blueprint_hash(blueprint, seed, owner_id=None if shared else created_by.id)
+    existing = MockExam.objects.filter(subject_id=subject_id, blueprint_hash=digest).first()
+    if existing is not None:
+        return existing, False
+
+    topic_counts = dict((topic_id, count) for topic_id, count in blueprint['topics'])
+    topics = {
+        topic.id: topic
+        for topic in QuestionTopic.objects.filter(subject_id=subject_id, id__in=topic_counts.keys())
+    }
+    missing = sorted(set(topic_counts) - set(topics))
+    if missing:
+        raise BlueprintError(f'Topics not found for this subject: {missing}')
+
+    year_from, year_to = blueprint['year_from'], blueprint['year_to']
+    pools = {
+        topic_id: [
+            item for item in get_topic_pool(topic_id)
+            if (year_from is None or item[2] >= year_from) and (year_to is None or item[2] <= year_to)
+        ]
+        for topic_id in topic_counts
+    }
+    short = {topics[t].name: len(pools[t]) for t, count in topic_counts.items() if len(pools[t]) < count}
+    if short:
+        raise BlueprintError(f'Not enough published questions for: {short}')
+
+    total = sum(topic_counts.values())
+    targets = allocate(blueprint['difficulty'], total) if blueprint['difficulty'] else None
+    selected = select_questions(
+        pools, topic_counts, targets, rng=random.Random(seed) if seed is not None else random
+    )
+
+    # Questions appear topic by topic in topic order, easiest first within a topic
+    ordered = []
+    for topic_id in sorted(topic_counts, key=lambda t: (topics[t].order, topics[t].name)):
+        ordered.extend(sorted(selected[topic_id], key=lambda item: DIFFICULTIES.index(item[1])))
+
+    try:
+        with transaction.atomic():
+            mock = MockExam.objects.create(
+                subject_id=subject_id,
+                title=title or f'Mock exam ({total} questions)',
+                blueprint=blueprint,
+                blueprint_hash=digest,
+                duration_minutes=duration_minutes,
+                created_by=created_by,
+                is_shared=shared,
+            )
+            MockExamQuestion.objects.bulk_create([
+                MockExamQuestion(mock_exam=mock, question_id=question_id, question_number=number)
+                for number, (question_id, _) in enumerate(ordered, start=1)
+            ])
+            if not shared:
+                stale = MockExam.objects.filter(created_by=created_by, is_shared=False).order_by(
+                    '-created_at', '-id'
+                ).values_list('id', flat=True)[MAX_PRIVATE_MOCKS:]
+                MockExam.objects.filter(id__in=list(stale)).delete()
+    except IntegrityError:
+        # Another request assembled the same blueprint first
+        return MockExam.objects.get(subject_id=subject_id, blueprint_hash=digest), False
+    return mock, True
+
+
+def serialize_mock_exam(mock):
+    """Student-facing body of a mock exam, without answers (two queries)"""
+    mock_questions = MockExamQuestion.objects.filter(mock_exam=mock).select_related(
+        'question__topic', 'question__paper'
+    ).order_by('question_number')
+
+    questions = []
+    difficulty_mix = {label: 0 for label in DIFFICULTIES}
+    for mock_question in mock_questions:
+        question = mock_question.question
+        data = serialize_mcq(question)
+        data['question_number'] = mock_question.question_number
+        data['source'] = {'paper_id': question.paper_id, 'year': question.paper.year}
+        questions.append(data)
+        difficulty_mix[question.difficulty] = difficulty_mix.get(question.difficulty, 0) + 1
+
+    return {
+        'mock': {
+            'id': mock.id,
+            'subject': mock.subject.name,
+            'title': mock.title,
+            'duration_minutes': mock.duration_minutes,
+            'total_marks': sum(question['marks'] for question in questions),
+            'blueprint': mock.blueprint,
+            'difficulty_mix': difficulty_mix,
+        },
+        'mcq_questions': questions,
+        'total_questions': len(questions)
+    }
+
+
+def get_mock_exam_body(mock_id):
+    """Serialized JSON body of a mock exam, from the cache when possible; None if missing"""
+    key = f'past_questions:mock:{mock_id}:{get_question_bank_version()}'
+    content = cache.get(key)
+    if content is None:
+        mock = MockExam.objects.select_related('subject').filter(id=mock_id).first()
+        if mock is None:
+            return None
+        content = to_json_bytes(serialize_mock_exam(mock))
+        cache.set(key, content, timeout=PAPER_BODY_TIMEOUT)
+    return content
+
+
+def _open_mocks_key(user_id):
+    return f'past_questions:open_mocks:{user_id}'
+
+
+def mark_mock_open(user_id, mock_id, duration_minutes):
+    """Record that a student opened a mock, which stays open for its duration"""
+    now = time.time()
+    timeout = duration_minutes * 60 + OPEN_MOCK_GRACE_SECONDS
+    mocks = {
+        other_id: expires_at
+        for other_id, expires_at in (cache.get(_open_mocks_key(user_id)) or {}).items()
+        if expires_at > now
+    }
+    mocks[mock_id] = max(mocks.get(mock_id, 0), now + timeout)
+    cache.set(_open_mocks_key(user_id), mocks, timeout=int(max(mocks.values()) - now) + 1)
+
+
+def open_mock_ids(user_id):
+    """Ids of the mocks a student opened whose time hasn't run out"""
+    now = time.time()
+    return [mock_id for mock_id, expires_at in (cache.get(_open_mocks_key(user_id)) or {}).items() if expires_at > now]
@@ -43,6 +43,9 @@ class PastQuestionPaper(models.Model):
     class Meta:
         ordering = ['-year', 'subject', 'paper_number']
         unique_together = ['subject', 'year', 'paper_number']
+        indexes = [
+            models.Index(fields=['subject', 'is_published', 'year'], name='pastpaper_subj_pub_year_idx'),
+        ]
     
     def __str__(self):
         return f"{self.subject.name} {self.year} - Paper {self.paper_number}"
@@ -160,8 +163,15 @@ class StudentAttempt(models.Model):
     # Time tracking
     time_spent_minutes = models.IntegerField(default=0)
     
+    # Autosaved changes not yet written to the answer tables, and time tracking state (see autosave.py)
+    autosave_state = models.JSONField(null=True, blank=True)
+    
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            # Incremental statistics jobs scan completed attempts by completion time
+            models.Index(fields=['status', 'completed_at', 'id'], name='attempt_status_completed_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.paper} ({self.status})"
@@ -227,3 +237,159 @@ class QuestionBookmark(models.Model):
     
     def __str__(self):
         return f"{self.student.username} - {self.paper}"
+
+
+class QuestionStatistics(models.Model):
+    """
+    Item statistics for a multiple choice question, computed from completed attempts
+
+    The running sums are updated incrementally by `python manage.py
+    compute_item_statistics`; p_value and discrimination are derived from
+    them so they can be read without scanning answers.
+    """
+    question = models.OneToOneField(MultipleChoiceQuestion, on_delete=models.CASCADE, related_name='statistics')
+
+    # Running sums over completed attempts of the question's paper
+    attempts_count = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+    omitted_count = models.PositiveIntegerField(default=0)
+    option_counts = models.JSONField(default=dict)  # {"A": 12, "B": 3, ...}
+    sum_total = models.FloatField(default=0)  # Sum of attempts' MCQ scores
+    sum_total_sq = models.FloatField(default=0)
+    sum_correct_total = models.FloatField(default=0)  # Sum of MCQ scores of attempts answering correctly
+
+    # Derived statistics
+    p_value = models.FloatField(null=True, blank=True, help_text="Proportion of attempts answering correctly")
+    discrimination = models.FloatField(
+        null=True, blank=True, help_text="Point-biserial correlation with the rest of the paper's MCQ score"
+    )
+    # Two-parameter logistic IRT parameters estimated from p_value and discrimination
+    irt_discrimination = models.FloatField(null=True, blank=True)
+    irt_difficulty = models.FloatField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Question statistics'
+
+    def __str__(self):
+        return f"Statistics for {self.question}"
+
+
+class StatisticsWatermark(models.Model):
+    """Last completed attempt folded into an incremental statistics job"""
+    name = models.CharField(max_length=50, unique=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    attempt_id = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.completed_at}"
+
+
+class PracticeSession(models.Model):
+    """Adaptive practice session over a subject's multiple choice questions"""
+    SESSION_STATUS = [
+        ('active', 'Active'),
+        ('completed', 'Completed'),
+    ]
+    
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='practice_sessions')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='practice_sessions')
+    status = models.CharField(max_length=20, choices=SESSION_STATUS, default='active')
+    
+    # Ability estimate (EAP) and its standard error after the answers so far
+    ability = models.FloatField(default=0)
+    standard_error = models.FloatField(default=1)
+    max_questions = models.PositiveIntegerField(default=20)
+    
+    # [[question_id, selected_answer, is_correct], ...] in answer order
+    responses = models.JSONField(default=list)
+    current_question = models.ForeignKey(
+        MultipleChoiceQuestion, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"{self.student.username} - {self.subject.name} practice ({self.status})"
+
+
+class MockExam(models.Model):
+    """
+    Mock paper assembled from past questions of all years to match a blueprint
+
+    Mocks assembled by staff are shared: requesting the same blueprint for a
+    subject returns the existing mock, so its cached body serves every
+    student. Mocks students assemble for themselves are private to them.
+    """
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='mock_exams')
+    title = models.CharField(max_length=200)
+    blueprint = models.JSONField()
+    blueprint_hash = models.CharField(max_length=40, db_index=True)
+    duration_minutes = models.IntegerField(default=90)
+    questions = models.ManyToManyField(MultipleChoiceQuestion, through='MockExamQuestion', related_name='mock_exams')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    is_shared = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['subject', 'blueprint_hash']
+    
+    def __str__(self):
+        return f"{self.subject.name} - {self.title}"
+
+
+class MockExamQuestion(models.Model):
+    """A past question's position in a mock exam"""
+    mock_exam = models.ForeignKey(MockExam, on_delete=models.CASCADE, related_name='mock_questions')
+    question = models.ForeignKey(MultipleChoiceQuestion, on_delete=models.CASCADE, related_name='+')
+    question_number = models.IntegerField()
+    
+    class Meta:
+        ordering = ['mock_exam', 'question_number']
+        unique_together = ['mock_exam', 'question_number']
+    
+    def __str__(self):
+        return f"{self.mock_exam} - Q{self.question_number}"
+
+
+class ReviewItem(models.Model):
+    """
+    A multiple choice question in a student's spaced-repetition review queue
+
+    Scheduled with SM-2 (see past_questions/review.py). The ease factor is
+    stored in hundredths (250 = 2.5) to keep rows small.
+    """
+    SOURCES = [
+        ('bookmark', 'Bookmark'),
+        ('wrong_answer', 'Wrong answer'),
+    ]
+    
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='review_items')
+    question = models.ForeignKey(MultipleChoiceQuestion, on_delete=models.CASCADE, related_name='+')
+    source = models.CharField(max_length=20, choices=SOURCES)
+    
+    due_at = models.DateTimeField()
+    interval_days = models.PositiveIntegerField(default=0)
+    ease_factor = models.PositiveSmallIntegerField(default=250)
+    repetitions = models.PositiveSmallIntegerField(default=0)
+    lapses = models.PositiveSmallIntegerField(default=0)
+    last_reviewed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['due_at']
+        unique_together = ['student', 'question']
+        indexes = [
+            # "What's due" is a range scan over one student's slice of this index
+            models.Index(fields=['student', 'due_at'], name='review_student_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.username} - {self.question} (due {self.due_at:%Y-%m-%d})"
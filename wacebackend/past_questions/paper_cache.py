@@ -0,0 +1,132 @@
+"""
+Cached, serialized past paper bodies
+
+Published papers rarely change, and thousands of students open the same
+paper, so the question body (without answers) is serialized once and
+cached per paper_id + updated_at. Question, sub-question and topic edits
+touch the paper's updated_at (see past_questions/signals.py), and subject
+renames bump the course catalog version, so either produces a new key.
+"""
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from courses.catalog import get_catalog_version, to_json_bytes
+from .models import PastQuestionPaper, MultipleChoiceQuestion, EssayQuestion
+
+PAPER_BODY_TIMEOUT = 60 * 60 * 24
+
+
+def serialize_mcq(mcq):
+    """Student-facing body of a multiple choice question, without the answer"""
+    return {
+        'id': mcq.id,
+        'question_number': mcq.question_number,
+        'question_text': mcq.question_text,
+        'options': {
+            'A': mcq.option_a,
+            'B': mcq.option_b,
+            'C': mcq.option_c,
+            'D': mcq.option_d,
+            'E': mcq.option_e if mcq.option_e else None
+        },
+        'marks': mcq.marks,
+        'difficulty': mcq.difficulty,
+        'topic': mcq.topic.name if mcq.topic else None
+    }
+
+
+def serialize_paper(paper):
+    """
+    Student-facing body of a paper, without answers or marking schemes
+
+    Expects the paper to be loaded with load_paper() so that no per-question
+    queries are needed.
+    """
+    mcq_data = [serialize_mcq(mcq) for mcq in paper.mcq_questions.all()]
+
+    essay_data = []
+    for essay in paper.essay_questions.all():
+        sub_questions = []
+        if essay.has_sub_questions:
+            for sub in essay.sub_questions.all():
+                sub_questions.append({
+                    'sub_number': sub.sub_number,
+                    'question_text': sub.question_text,
+                    'marks': sub.marks
+                })
+
+        essay_data.append({
+            'id': essay.id,
+            'question_number': essay.question_number,
+            'section': essay.section,
+            'question_text': essay.question_text,
+            'marks': essay.marks,
+            'suggested_time_minutes': essay.suggested_time_minutes,
+            'difficulty': essay.difficulty,
+            'topic': essay.topic.name if essay.topic else None,
+            'has_sub_questions': essay.has_sub_questions,
+            'sub_questions': sub_questions
+        })
+
+    return {
+        'paper': {
+            'id': paper.id,
+            'subject': paper.subject.name,
+            'year': paper.year,
+            'paper_number': paper.paper_number,
+            'paper_type': paper.paper_type,
+            'title': paper.title,
+            'instructions': paper.instructions,
+            'duration_minutes': paper.duration_minutes,
+            'total_marks': paper.total_marks
+        },
+        'mcq_questions': mcq_data,
+        'essay_questions': essay_data,
+        'total_questions': len(mcq_data) + len(essay_data)
+    }
+
+
+def load_paper(papers, paper_id):
+    """Load a paper with its subject, questions, topics and sub-questions in four queries"""
+    return papers.select_related('subject').prefetch_related(
+        Prefetch(
+            'mcq_questions',
+            queryset=MultipleChoiceQuestion.objects.select_related('topic').order_by('question_number')
+        ),
+        Prefetch(
+            'essay_questions',
+            queryset=EssayQuestion.objects.select_related('topic').prefetch_related('sub_questions').order_by(
+                'section', 'question_number'
+            )
+        ),
+    ).get(id=paper_id)
+
+
+def get_paper_body(paper_id, papers=None):
+    """
+    Serialized JSON body of a paper, from the cache when possible
+
+    Args:
+        paper_id: ID of the paper
+        papers: Queryset the paper must belong to (default: published papers)
+
+    Returns:
+        JSON bytes, or None if the paper doesn't exist in `papers`
+    """
+    if papers is None:
+        papers = PastQuestionPaper.objects.filter(is_published=True)
+
+    updated_at = papers.filter(id=paper_id).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+
+    key = f'past_questions:paper:{paper_id}:{updated_at.timestamp()}:{get_catalog_version()}'
+    content = cache.get(key)
+    if content is None:
+        try:
+            paper = load_paper(papers, paper_id)
+        except PastQuestionPaper.DoesNotExist:
+            return None
+        content = to_json_bytes(serialize_paper(paper))
+        cache.set(key, content, timeout=PAPER_BODY_TIMEOUT)
+    return content
@@ -0,0 +1,197 @@
+"""
+Random topic quizzes drawn from the past question bank
+
+Drawing "20 random questions on a topic" with ORDER BY RANDOM() sorts the
+whole question table on every request. Instead, the ids of a topic's
+published questions are cached together with their difficulty and year.
+The sample is drawn in Python and the chosen rows are fetched with one
+IN query.
+
+Cached pools are keyed by a question bank version. Signals (see
+past_questions/signals.py) bump it whenever a question or paper changes,
+and QUIZ_POOL_TIMEOUT is a backstop for bulk edits that send no signals.
+
+Answers are only marked for quizzes the server drew: each quiz gets a
+single-use token stored with the student and the question ids. Questions
+the student is being examined on right now (an in-progress paper attempt
+or an open mock exam) are never marked, so the checker can't be used as
+an answer key during a timed attempt.
+"""
+import random
+import uuid
+
+from django.core.cache import cache
+
+from .models import MultipleChoiceQuestion
+from .paper_cache import serialize_mcq
+
+QUESTION_BANK_VERSION_KEY = 'past_questions:question_bank:version'
+QUIZ_POOL_TIMEOUT = 60 * 10
+QUIZ_TOKEN_TIMEOUT = 60 * 60 * 3
+MAX_QUIZ_QUESTIONS = 50
+STRATIFY_FIELDS = ('difficulty', 'year')
+
+
+def get_question_bank_version():
+    version = cache.get(QUESTION_BANK_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex[:12]
+        if not cache.add(QUESTION_BANK_VERSION_KEY, version, timeout=None):
+            version = cache.get(QUESTION_BANK_VERSION_KEY, version)
+    return version
+
+
+def bump_question_bank_version():
+    """Invalidate every cached quiz pool"""
+    cache.set(QUESTION_BANK_VERSION_KEY, uuid.uuid4().hex[:12], timeout=None)
+
+
+def get_topic_pool(topic_id):
+    """
+    Published MCQs of a topic as a list of (id, difficulty, year) tuples
+
+    Served from the cache; only the three columns are read on a miss.
+    """
+    key = f'past_questions:quiz_pool:{get_question_bank_version()}:{topic_id}'
+    pool = cache.get(key)
+    if pool is None:
+        pool = list(
+            MultipleChoiceQuestion.objects.filter(
+                topic_id=topic_id,
+                paper__is_published=True
+            ).order_by().values_list('id', 'difficulty', 'paper__year')
+        )
+        cache.set(key, pool, timeout=QUIZ_POOL_TIMEOUT)
+    return pool
+
+
+def allocate(weights, count):
+    """
+    Split `count` across keys in proportion to their weights (largest remainder)
+
+    Args:
+        weights: Dict mapping each key to a non-negative weight
+        count: Whole number to distribute
+
+    Returns:
+        Dict mapping each key to its whole share; the shares sum to `count`
+    """
+    total = sum(weights.values())
+    quotas = {key: count * weight / total for key, weight in weights.items()}
+    allocation = {key: int(quota) for key, quota in quotas.items()}
+    by_remainder = sorted(quotas, key=lambda key: quotas[key] - allocation[key], reverse=True)
+    for key in by_remainder[:count - sum(allocation.values())]:
+        allocation[key] += 1
+    return allocation
+
+
+def sample_questions(pool, count, difficulties=None, year_from=None, year_to=None, stratify=None, rng=random):
+    """
+    Choose up to `count` question ids from a topic pool without replacement
+
+    Args:
+        pool: Output of get_topic_pool()
+        count: Number of questions wanted
+        difficulties: Optional collection of allowed difficulty labels
+        year_from, year_to: Optional inclusive paper year range
+        stratify: Optional 'difficulty' or 'year'. The sample then keeps
+            each group's share of the filtered pool.
+        rng: random.Random instance, for reproducible quizzes
+
+    Returns:
+        List of question ids in random order
+    """
+    candidates = [
+        item for item in pool
+        if (not difficulties or item[1] in difficulties)
+        and (year_from is None or item[2] >= year_from)
+        and (year_to is None or item[2] <= year_to)
+    ]
+    if not candidates:
+        return []
+    if not stratify:
+        chosen = rng.sample(candidates, min(count, len(candidates)))
+        return [item[0] for item in chosen]
+
+    position = STRATIFY_FIELDS.index(stratify) + 1
+    strata = {}
+    for item in candidates:
+        strata.setdefault(item[position], []).append(item[0])
+
+    chosen = []
+    sizes = {key: len(ids) for key, ids in strata.items()}
+    # Proportional shares never exceed a stratum's size once count <= len(candidates)
+    for key, quota in allocate(sizes, min(count, len(candidates))).items():
+        chosen.extend(rng.sample(strata[key], quota))
+    rng.shuffle(chosen)
+    return chosen
+
+
+def build_quiz(question_ids):
+    """Student-facing questions for the sampled ids, in sampled order (one query)"""
+    questions = MultipleChoiceQuestion.objects.filter(
+        id__in=question_ids
+    ).select_related('topic', 'paper').order_by()
+    by_id = {question.id: question for question in questions}
+    quiz = []
+    for question_id in question_ids:
+        question = by_id.get(question_id)
+        if question is None:  # Deleted since the pool was cached
+            continue
+        data = serialize_mcq(question)
+        data['paper'] = {'id': question.paper_id, 'year': question.paper.year, 'title': question.paper.title}
+        quiz.append(data)
+    return quiz
+
+
+def issue_quiz(student_id, question_ids):
+    """Remember a drawn quiz for checking later; returns its token"""
+    token = uuid.uuid4().hex
+    cache.set(
+        f'past_questions:quiz:{token}',
+        {'student_id': student_id, 'question_ids': list(question_ids)},
+        timeout=QUIZ_TOKEN_TIMEOUT
+    )
+    return token
+
+
+def take_issued_quiz(token, student_id):
+    """
+    Question ids of a quiz issued to the student, consuming its token
+
+    Returns:
+        Set of question ids, or None if the token is unknown, expired or someone else's
+    """
+    key = f'past_questions:quiz:{token}'
+    quiz = cache.get(key)
+    if quiz is None or quiz['student_id'] != student_id:
+        return None
+    cache.delete(key)
+    return set(quiz['question_ids'])
+
+
+def check_answers(answers, withheld=()):
+    """
+    Mark a quiz answer sheet against the answer key (one query)
+
+    Args:
+        answers: {question_id: option}, as returned by grading.normalize_answers()
+        withheld: Question ids that must not be marked
+
+    Returns:
+        List of per-question results for the questions that exist
+    """
+    key = MultipleChoiceQuestion.objects.filter(
+        id__in=answers.keys() - set(withheld),
+        paper__is_published=True
+    ).order_by().values_list('id', 'correct_answer', 'explanation')
+    return [
+        {
+            'question_id': question_id,
+            'selected_answer': answers[question_id],
+            'correct_answer': correct_answer,
+            'is_correct': answers[question_id] == correct_answer,
+            'explanation': explanation,
+        }
+        for question_id, correct_answer, explanation in key
+    ]
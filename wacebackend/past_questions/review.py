@@ -0,0 +1,94 @@
+"""
+Spaced-repetition review of bookmarked and wrongly answered questions
+
+Every MCQ a student bookmarks or gets wrong in a graded attempt or a
+practice session joins their review queue as a ReviewItem. Reviews are
+scheduled with SM-2:
+
+- a wrong answer is a lapse: the item comes back tomorrow and its ease
+  drops;
+- a right answer moves the interval from 1 to 6 days and then multiplies
+  it by the ease factor, which the student's rating ('hard', 'good' or
+  'easy') adjusts.
+
+Items are only ever looked up through the (student, due_at) index, so
+"what's due now" is one range scan of the student's own entries however
+many review items exist in total.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import ReviewItem
+
+RATING_QUALITY = {'hard': 3, 'good': 4, 'easy': 5}
+LAPSE_QUALITY = 1
+MIN_EASE_FACTOR = 130  # Hundredths, i.e. 1.3
+MAX_INTERVAL_DAYS = 365
+DEFAULT_DUE_LIMIT = 20
+MAX_DUE_LIMIT = 100
+
+
+def enqueue(student_id, question_ids, source, due_at=None):
+    """
+    Add questions to a student's review queue in one insert
+
+    Questions already in the queue keep their schedule.
+    """
+    enqueue_pairs([(student_id, question_id) for question_id in question_ids], source, due_at=due_at)
+
+
+def enqueue_pairs(pairs, source, due_at=None):
+    """Queue (student_id, question_id) pairs for review, across students, in one insert"""
+    due_at = due_at or timezone.now()
+    ReviewItem.objects.bulk_create(
+        [
+            ReviewItem(student_id=student_id, question_id=question_id, source=source, due_at=due_at)
+            for student_id, question_id in set(pairs)
+        ],
+        ignore_conflicts=True,
+        batch_size=500
+    )
+
+
+def schedule(item, is_correct, rating='good', now=None):
+    """Apply one SM-2 review to `item` in place (doesn't save it)"""
+    now = now or timezone.now()
+    quality = RATING_QUALITY[rating] if is_correct else LAPSE_QUALITY
+
+    # EF' = EF + 0.1 - (5 - q) * (0.08 + (5 - q) * 0.02), in hundredths
+    miss = 5 - quality
+    item.ease_factor = max(MIN_EASE_FACTOR, item.ease_factor + 10 - miss * (8 + miss * 2))
+
+    if not is_correct:
+        item.repetitions = 0
+        item.lapses += 1
+        item.interval_days = 1
+    else:
+        item.repetitions += 1
+        if item.repetitions == 1:
+            item.interval_days = 1
+        elif item.repetitions == 2:
+            item.interval_days = 6
+        else:
+            item.interval_days = round(item.interval_days * item.ease_factor / 100)
+        item.interval_days = min(item.interval_days, MAX_INTERVAL_DAYS)
+
+    item.last_reviewed_at = now
+    item.due_at = now + timedelta(days=item.interval_days)
+    return item
+
+
+def due_items(student, now=None, limit=DEFAULT_DUE_LIMIT):
+    """Review items due for a student, most overdue first, with their questions"""
+    now = now or timezone.now()
+    return list(
+        ReviewItem.objects.filter(student=student, due_at__lte=now).select_related(
+            'question__topic', 'question__paper'
+        ).order_by('due_at')[:limit]
+    )
+
+
+def due_count(student, now=None):
+    now = now or timezone.now()
+    return ReviewItem.objects.filter(student=student, due_at__lte=now).count()
@@ -0,0 +1,68 @@
+"""
+Signal handlers for the past_questions app
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.utils import timezone
+
+from .models import (
+    PastQuestionPaper, QuestionTopic, MultipleChoiceQuestion, EssayQuestion, EssaySubQuestion, MockExam,
+    MockExamQuestion, QuestionBookmark
+)
+from .quiz import bump_question_bank_version
+from .review import enqueue as enqueue_for_review
+
+
+def touch_papers(papers):
+    """Mark papers as changed so their cached bodies are rebuilt"""
+    papers.update(updated_at=timezone.now())
+
+
+def touch_question_paper(sender, instance, **kwargs):
+    touch_papers(PastQuestionPaper.objects.filter(pk=instance.paper_id))
+
+
+def touch_sub_question_paper(sender, instance, **kwargs):
+    touch_papers(PastQuestionPaper.objects.filter(essay_questions=instance.essay_question_id))
+
+
+def touch_topic_papers(sender, instance, **kwargs):
+    touch_papers(PastQuestionPaper.objects.filter(
+        Q(mcq_questions__topic=instance) | Q(essay_questions__topic=instance)
+    ))
+
+
+def invalidate_question_bank(sender, **kwargs):
+    """Rebuild quiz pools once the change is committed"""
+    transaction.on_commit(bump_question_bank_version)
+
+
+def invalidate_edited_mock(sender, created=False, **kwargs):
+    # Assembling a mock creates it and bulk-inserts its questions; only later edits matter
+    if not created:
+        transaction.on_commit(bump_question_bank_version)
+
+
+def review_bookmarked_question(sender, instance, created=False, **kwargs):
+    """Bookmarked MCQs join the student's review queue"""
+    if created and instance.mcq_question_id:
+        enqueue_for_review(instance.student_id, [instance.mcq_question_id], 'bookmark')
+
+
+for model in (MultipleChoiceQuestion, EssayQuestion):
+    post_save.connect(touch_question_paper, sender=model, dispatch_uid=f'touch_paper_save_{model.__name__}')
+    post_delete.connect(touch_question_paper, sender=model, dispatch_uid=f'touch_paper_delete_{model.__name__}')
+post_save.connect(touch_sub_question_paper, sender=EssaySubQuestion, dispatch_uid='touch_paper_save_EssaySubQuestion')
+post_delete.connect(touch_sub_question_paper, sender=EssaySubQuestion, dispatch_uid='touch_paper_delete_EssaySubQuestion')
+# Topic names appear in paper bodies. Deleting a topic nulls it on questions without
+# saving them, so papers are touched before the delete while the links still exist
+post_save.connect(touch_topic_papers, sender=QuestionTopic, dispatch_uid='touch_paper_save_QuestionTopic')
+pre_delete.connect(touch_topic_papers, sender=QuestionTopic, dispatch_uid='touch_paper_delete_QuestionTopic')
+# Quiz pools depend on which MCQs a topic has and whether their papers are published;
+# cached mock exam bodies are keyed by the same version
+for model in (MultipleChoiceQuestion, PastQuestionPaper, QuestionTopic, MockExamQuestion):
+    post_save.connect(invalidate_question_bank, sender=model, dispatch_uid=f'question_bank_save_{model.__name__}')
+    post_delete.connect(invalidate_question_bank, sender=model, dispatch_uid=f'question_bank_delete_{model.__name__}')
+post_save.connect(invalidate_edited_mock, sender=MockExam, dispatch_uid='question_bank_save_MockExam')
+post_save.connect(review_bookmarked_question, sender=QuestionBookmark, dispatch_uid='review_bookmarked_question')
@@ -0,0 +1,739 @@
+import math
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from courses.models import Subject, ProgrammeSubject
+from students.models import Programme, Student
+from .adaptive import PracticeError, answer_question, clear_item_indexes, estimate_ability, serialize_session
+from .quiz import sample_questions
+from .mock_exams import select_questions
+from .review import due_items, schedule
+from .autosave import AutosaveError, autosave
+from .grading import grade_attempt
+from .item_statistics import compute_item_statistics
+from .models import (
+    PastQuestionPaper, MultipleChoiceQuestion, EssayQuestion, MCQAnswer, StudentAttempt, QuestionStatistics, QuestionTopic,
+    QuestionBookmark, ReviewItem, PracticeSession, EssaySubQuestion
+)
+
+
+class SubmitAttemptTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('kofi', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        subject = Subject.objects.create(name='Chemistry', code='CHEM', description='')
+        self.paper = PastQuestionPaper.objects.create(
+            subject=subject, year=2023, paper_type='objective', title='Chemistry 2023', is_published=True
+        )
+        self.questions = [
+            MultipleChoiceQuestion.objects.create(
+                paper=self.paper, question_number=i + 1, question_text=f'Q{i + 1}',
+                option_a='a', option_b='b', option_c='c', option_d='d', correct_answer='ABCD'[i % 4]
+            )
+            for i in range(60)
+        ]
+
+    def start(self):
+        return self.client.post(reverse('start_attempt', args=[self.paper.id])).json()['attempt_id']
+
+    def test_sheet_is_graded_in_constant_queries(self):
+        attempt_id = self.start()
+        # First 45 answered correctly, the rest wrong
+        answers = {
+            str(q.id): q.correct_answer if i < 45 else ('B' if q.correct_answer == 'A' else 'A')
+            for i, q in enumerate(self.questions)
+        }
+        with self.assertNumQueries(12):
+            response = self.client.post(
+                reverse('submit_attempt', args=[attempt_id]), {'answers': answers}, format='json'
+            )
+        data = response.json()
+        self.assertEqual((data['score'], data['max_score'], data['percentage']), (45, 60, 75.0))
+
+        attempt = StudentAttempt.objects.get(id=attempt_id)
+        self.assertEqual(attempt.status, 'completed')
+        self.assertEqual(float(attempt.total_score), 45)
+        self.assertEqual(MCQAnswer.objects.filter(attempt=attempt, is_correct=True).count(), 45)
+        self.assertEqual(ReviewItem.objects.filter(student=self.user, source='wrong_answer').count(), 15)
+
+        response = self.client.post(reverse('submit_attempt', args=[attempt_id]), {'answers': answers}, format='json')
+        self.assertEqual(response.status_code, 409)
+
+    def test_submission_merges_saved_answers(self):
+        attempt_id = self.start()
+        first, second = self.questions[:2]
+        MCQAnswer.objects.create(attempt_id=attempt_id, question=first, selected_answer=first.correct_answer)
+        response = self.client.post(
+            reverse('submit_attempt', args=[attempt_id]),
+            {'answers': [{'question_id': second.id, 'selected_answer': second.correct_answer.lower()}]},
+            format='json'
+        )
+        self.assertEqual(response.json()['correct_count'], 2)
+
+    def test_invalid_option_is_rejected(self):
+        attempt_id = self.start()
+        response = self.client.post(
+            reverse('submit_attempt', args=[attempt_id]), {'answers': {str(self.questions[0].id): 'Z'}}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(StudentAttempt.objects.get(id=attempt_id).status, 'in_progress')
+
+    def last_seen(self, attempt_id):
+        return StudentAttempt.objects.get(id=attempt_id).autosave_state['last_seen']
+
+    def test_autosave_buffers_until_flush(self):
+        attempt_id = self.start()
+        first, second = self.questions[:2]
+        url = reverse('autosave_attempt', args=[attempt_id])
+        self.client.post(url, {'mcq': {str(first.id): 'D'}}, format='json')
+
+        # Later autosaves only update the attempt row until the flush interval passes
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'mcq': {str(first.id): first.correct_answer}}, format='json')
+        self.assertFalse(any('past_questions_mcqanswer' in q['sql'] for q in queries))
+        self.assertEqual(response.json()['pending'], 1)
+        self.assertFalse(MCQAnswer.objects.exists())
+
+        start = self.last_seen(attempt_id)
+        result = autosave(attempt_id, self.user, {second.id: 'A'}, {}, now=start + 90)
+        self.assertTrue(result['flushed'])
+        self.assertEqual(result['time_spent_seconds'], 90)
+        self.assertEqual(MCQAnswer.objects.filter(attempt_id=attempt_id).count(), 2)
+        self.assertEqual(StudentAttempt.objects.get(id=attempt_id).time_spent_minutes, 1)
+
+        # Pending changes are flushed before grading
+        self.client.post(url, {'mcq': {str(second.id): second.correct_answer}}, format='json')
+        data = self.client.post(reverse('submit_attempt', args=[attempt_id]), {}, format='json').json()
+        self.assertEqual(data['correct_count'], 2)
+
+        response = self.client.post(url, {'mcq': {str(first.id): 'A'}}, format='json')
+        self.assertEqual(response.status_code, 409)
+
+    def test_pending_answers_survive_the_cache(self):
+        attempt_id = self.start()
+        first, second = self.questions[:2]
+        url = reverse('autosave_attempt', args=[attempt_id])
+        self.client.post(url, {'mcq': {str(first.id): first.correct_answer}}, format='json')
+        self.client.post(url, {'essay': {}, 'mcq': {str(second.id): second.correct_answer}}, format='json')
+        self.assertFalse(MCQAnswer.objects.exists())
+
+        # Evicted, culled or never shared between workers: none of it matters
+        cache.clear()
+        data = self.client.post(reverse('submit_attempt', args=[attempt_id]), {}, format='json').json()
+        self.assertEqual(data['correct_count'], 2)
+
+    def test_changes_after_time_is_up_are_refused_but_earlier_ones_kept(self):
+        attempt_id = self.start()
+        first, second = self.questions[:2]
+        self.client.post(reverse('autosave_attempt', args=[attempt_id]), {'mcq': {str(first.id): 'A'}}, format='json')
+        late = self.last_seen(attempt_id) + self.paper.duration_minutes * 60 + 3600
+        with self.assertRaises(AutosaveError):
+            autosave(attempt_id, self.user, {second.id: 'A'}, {}, now=late)
+        self.assertEqual(
+            list(MCQAnswer.objects.filter(attempt_id=attempt_id).values_list('question_id', flat=True)), [first.id]
+        )
+
+    def test_stale_buffer_is_not_flushed_into_graded_attempt(self):
+        attempt_id = self.start()
+        first = self.questions[0]
+        url = reverse('autosave_attempt', args=[attempt_id])
+        self.client.post(url, {'mcq': {str(first.id): first.correct_answer}}, format='json')
+        start = self.last_seen(attempt_id)
+
+        # Graded by a request that never saw the pending changes
+        grade_attempt(StudentAttempt.objects.get(id=attempt_id), {first.id: 'D'})
+        with self.assertRaises(AutosaveError):
+            autosave(attempt_id, self.user, {first.id: 'A'}, {}, now=start + 90)
+        self.assertEqual(MCQAnswer.objects.get(attempt_id=attempt_id).selected_answer, 'D')
+
+
+class ItemStatisticsTests(TestCase):
+    def setUp(self):
+        subject = Subject.objects.create(name='Physics', code='PHY', description='')
+        self.paper = PastQuestionPaper.objects.create(
+            subject=subject, year=2022, paper_type='objective', title='Physics 2022', is_published=True
+        )
+        self.questions = [
+            MultipleChoiceQuestion.objects.create(
+                paper=self.paper, question_number=i + 1, question_text=f'Q{i + 1}',
+                option_a='a', option_b='b', option_c='c', option_d='d', correct_answer='A'
+            )
+            for i in range(4)
+        ]
+        self.sheets = []
+
+    def complete_attempts(self, count):
+        completed_at = timezone.now() - timedelta(minutes=5)
+        for _ in range(count):
+            n = len(self.sheets)
+            # Student n answers the first (n % 5) questions correctly, the next one wrong
+            sheet = {q.id: 'A' if i < n % 5 else 'B' for i, q in enumerate(self.questions) if i <= n % 5}
+            user = User.objects.create_user(f'student{n}')
+            attempt = StudentAttempt.objects.create(
+                student=user, paper=self.paper, status='completed', completed_at=completed_at
+            )
+            MCQAnswer.objects.bulk_create([
+                MCQAnswer(attempt=attempt, question_id=q, selected_answer=a, is_correct=a == 'A')
+                for q, a in sheet.items()
+            ])
+            self.sheets.append(sheet)
+
+    def expected_discrimination(self, question):
+        item, rest = [], []
+        for sheet in self.sheets:
+            x = 1 if sheet.get(question.id) == 'A' else 0
+            item.append(x)
+            rest.append(sum(1 for q, a in sheet.items() if a == 'A') - x)
+        n = len(item)
+        mean_x, mean_r = sum(item) / n, sum(rest) / n
+        cov = sum((x - mean_x) * (r - mean_r) for x, r in zip(item, rest)) / n
+        sd_x = math.sqrt(sum((x - mean_x) ** 2 for x in item) / n)
+        sd_r = math.sqrt(sum((r - mean_r) ** 2 for r in rest) / n)
+        return cov / (sd_x * sd_r)
+
+    def test_incremental_runs_match_full_recompute(self):
+        self.complete_attempts(12)
+        self.assertEqual(compute_item_statistics(batch_size=5)[0], 12)
+        self.complete_attempts(8)
+        self.assertEqual(compute_item_statistics()[0], 8)
+        self.assertEqual(compute_item_statistics()[0], 0)
+
+        incremental = {s.question_id: (s.p_value, s.discrimination) for s in QuestionStatistics.objects.all()}
+        compute_item_statistics(full=True)
+        full = {s.question_id: (s.p_value, s.discrimination) for s in QuestionStatistics.objects.all()}
+        self.assertEqual(incremental, full)
+
+        first = self.questions[0]
+        stats = QuestionStatistics.objects.get(question=first)
+        self.assertEqual(stats.attempts_count, 20)
+        self.assertEqual(stats.p_value, 0.8)
+        self.assertAlmostEqual(stats.discrimination, self.expected_discrimination(first), places=3)
+        self.assertEqual(stats.option_counts, {'A': 16, 'B': 4})
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='student0'))
+        data = client.get(reverse('paper_statistics', args=[self.paper.id])).json()
+        self.assertEqual(data['questions'][0]['measured_difficulty'], 'easy')
+        self.assertNotIn('option_rates', data['questions'][0])
+        self.assertNotIn('discrimination', data['questions'][0])
+
+        client.force_authenticate(User.objects.create_user('examiner', password='secret', is_staff=True))
+        data = client.get(reverse('paper_statistics', args=[self.paper.id])).json()
+        self.assertEqual(data['questions'][0]['option_rates'], {'A': 0.8, 'B': 0.2})
+
+
+class AdaptivePracticeTests(TestCase):
+    def setUp(self):
+        clear_item_indexes()
+        self.user = User.objects.create_user('esi', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        programme = Programme.objects.create(name='general_science', description='', price=100)
+        Student.objects.create(
+            user=self.user, phone_number='0240000000', date_of_birth='2007-01-01', programme=programme,
+            previous_school='Achimota', wassce_year=2025, index_number='0010001'
+        )
+        self.subject = Subject.objects.create(name='Biology', code='BIO', description='')
+        ProgrammeSubject.objects.create(programme=programme, subject=self.subject)
+        self.paper = paper = PastQuestionPaper.objects.create(
+            subject=self.subject, year=2021, paper_type='objective', title='Biology 2021', is_published=True
+        )
+        for i in range(60):
+            MultipleChoiceQuestion.objects.create(
+                paper=paper, question_number=i + 1, question_text=f'Q{i + 1}', option_a='a', option_b='b',
+                option_c='c', option_d='d', correct_answer='A', difficulty=['easy', 'medium', 'hard'][i % 3]
+            )
+
+    def test_estimate_moves_with_responses(self):
+        self.assertAlmostEqual(estimate_ability([])[0], 0, places=6)
+        strong, _ = estimate_ability([(1.0, 0.0, True)] * 5)
+        weak, _ = estimate_ability([(1.0, 0.0, False)] * 5)
+        self.assertGreater(strong, 1)
+        self.assertLess(weak, -1)
+
+    def test_session_stops_before_max_questions(self):
+        session = self.client.post(
+            reverse('start_practice_session'), {'subject_id': self.subject.id, 'max_questions': 60}, format='json'
+        ).json()
+        url = reverse('answer_practice_question', args=[session['session_id']])
+        seen = set()
+        while session['status'] == 'active':
+            question = session['current_question']
+            self.assertNotIn(question['id'], seen)
+            seen.add(question['id'])
+            # An average student: right on easy and medium questions, wrong on hard ones
+            answer = 'B' if question['difficulty'] == 'hard' else 'A'
+            # Selecting the next question uses the in-memory index, not the database
+            with CaptureQueriesContext(connection) as queries:
+                session = self.client.post(
+                    url, {'question_id': question['id'], 'selected_answer': answer}, format='json'
+                ).json()
+            # Wrong answers also add the question to the review queue
+            self.assertLessEqual(len(queries), 5 if answer == 'A' else 6)
+        question_id = question['id']
+
+        self.assertLess(session['answered_count'], 40)
+        self.assertLess(session['standard_error'], 0.4)
+        self.assertTrue(0 < session['ability'] < 1)
+
+        response = self.client.post(url, {'question_id': question_id, 'selected_answer': 'A'}, format='json')
+        self.assertEqual(response.status_code, 409)
+
+    def start_session(self, max_questions=20):
+        return self.client.post(
+            reverse('start_practice_session'), {'subject_id': self.subject.id, 'max_questions': max_questions},
+            format='json'
+        ).json()
+
+    def test_questions_of_a_paper_being_sat_are_never_chosen(self):
+        live_paper = PastQuestionPaper.objects.create(
+            subject=self.subject, year=2022, paper_type='objective', title='Biology 2022', is_published=True
+        )
+        live_ids = {
+            MultipleChoiceQuestion.objects.create(
+                paper=live_paper, question_number=i + 1, question_text=f'L{i + 1}', option_a='a', option_b='b',
+                option_c='c', option_d='d', correct_answer='C', difficulty='medium'
+            ).id
+            for i in range(30)
+        }
+        clear_item_indexes()
+        StudentAttempt.objects.create(student=self.user, paper=live_paper)
+
+        session = self.start_session(max_questions=60)
+        url = reverse('answer_practice_question', args=[session['session_id']])
+        while session['status'] == 'active':
+            self.assertNotIn(session['current_question']['id'], live_ids)
+            session = self.client.post(
+                url, {'question_id': session['current_question']['id'], 'selected_answer': 'A'}, format='json'
+            ).json()
+            self.assertNotIn(session['result']['question_id'], live_ids)
+
+    def test_answer_is_withheld_if_its_paper_is_started_mid_session(self):
+        session = self.start_session()
+        question_id = session['current_question']['id']
+        StudentAttempt.objects.create(student=self.user, paper=self.paper)
+
+        data = self.client.post(
+            reverse('answer_practice_question', args=[session['session_id']]),
+            {'question_id': question_id, 'selected_answer': 'B'}, format='json'
+        ).json()
+        self.assertTrue(data['result']['withheld'])
+        self.assertIsNone(data['result']['correct_answer'])
+        self.assertIsNone(data['result']['is_correct'])
+        # Every question of the subject is now live, so the session ends
+        self.assertEqual(data['status'], 'completed')
+
+    def test_deleted_current_question_is_not_a_server_error(self):
+        session = self.start_session()
+        question_id = session['current_question']['id']
+        loaded = PracticeSession.objects.get(id=session['session_id'])
+        MultipleChoiceQuestion.objects.filter(id=question_id).delete()
+
+        # Deleted after the session was loaded
+        with self.assertRaises(PracticeError):
+            serialize_session(loaded)
+        with self.assertRaises(PracticeError):
+            answer_question(loaded, question_id, 'A')
+
+        response = self.client.get(reverse('practice_session_detail', args=[session['session_id']]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(
+            reverse('answer_practice_question', args=[session['session_id']]),
+            {'question_id': question_id, 'selected_answer': 'A'}, format='json'
+        )
+        self.assertEqual(response.status_code, 409)
+
+
+class QuestionBankTestCase(TestCase):
+    """Two published English papers of 15 Grammar and Syntax questions each (5 hard, 10 easy)"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('yaw', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        programme = Programme.objects.create(name='general_arts', description='', price=100)
+        Student.objects.create(
+            user=self.user, phone_number='0240000001', date_of_birth='2007-01-01', programme=programme,
+            previous_school='Mfantsipim', wassce_year=2025, index_number='0010002'
+        )
+        subject = Subject.objects.create(name='English Language', code='ENG', description='')
+        ProgrammeSubject.objects.create(programme=programme, subject=subject)
+        self.topic = QuestionTopic.objects.create(subject=subject, name='Grammar and Syntax')
+        self.papers = [
+            PastQuestionPaper.objects.create(
+                subject=subject, year=year, paper_type='objective', title=f'English {year}', is_published=True
+            )
+            for year in (2020, 2021)
+        ]
+        for paper in self.papers:
+            for i in range(15):
+                MultipleChoiceQuestion.objects.create(
+                    paper=paper, question_number=i + 1, question_text=f'Q{i + 1}', option_a='a', option_b='b',
+                    option_c='c', option_d='d', correct_answer='C', topic=self.topic,
+                    difficulty='hard' if i < 5 else 'easy'
+                )
+
+
+class TopicQuizTests(QuestionBankTestCase):
+    def test_stratified_sample_keeps_proportions(self):
+        pool = [(i, 'hard' if i < 10 else 'easy', 2020) for i in range(40)]
+        chosen = sample_questions(pool, 8, stratify='difficulty')
+        self.assertEqual(len(set(chosen)), 8)
+        self.assertEqual(sum(1 for i in chosen if i < 10), 2)
+        self.assertEqual(len(sample_questions(pool, 100)), 40)
+        self.assertEqual(sample_questions(pool, 5, year_from=2021), [])
+
+    def test_quiz_uses_cached_pool_and_one_in_query(self):
+        url = reverse('topic_quiz', args=[self.topic.id])
+        self.client.get(url)
+        with self.assertNumQueries(3):
+            data = self.client.get(url, {'count': 12, 'difficulty': 'easy', 'year_from': 2021}).json()
+        self.assertEqual(data['count'], 10)
+        self.assertTrue(all(q['difficulty'] == 'easy' and q['paper']['year'] == 2021 for q in data['questions']))
+        self.assertNotIn('correct_answer', data['questions'][0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.papers[1].is_published = False
+            self.papers[1].save()
+        self.assertEqual(self.client.get(url, {'count': 50}).json()['count'], 15)
+
+        answers = {str(q['id']): 'C' for q in data['questions'][:3]}
+        check = {'quiz_token': data['quiz_token'], 'answers': answers}
+        result = self.client.post(reverse('check_quiz'), check, format='json').json()
+        self.assertEqual(result['correct_count'], 0)  # Unpublished since the quiz was drawn
+
+        # A token marks its quiz once
+        self.assertEqual(self.client.post(reverse('check_quiz'), check, format='json').status_code, 404)
+
+    def test_check_only_marks_issued_questions_outside_open_attempts(self):
+        quiz = self.client.get(reverse('topic_quiz', args=[self.topic.id]), {'count': 30}).json()
+        issued = [q['id'] for q in quiz['questions'] if q['paper']['id'] == self.papers[0].id]
+        other_paper = MultipleChoiceQuestion.objects.filter(paper=self.papers[1]).first()
+        # Drawn questions from the paper the student then starts sitting are withheld
+        self.client.post(reverse('start_attempt', args=[self.papers[0].id]))
+
+        answers = {str(question_id): 'C' for question_id in issued}
+        answers[str(other_paper.id)] = 'C'
+        result = self.client.post(
+            reverse('check_quiz'), {'quiz_token': quiz['quiz_token'], 'answers': answers}, format='json'
+        ).json()
+        self.assertEqual(result['withheld_question_ids'], sorted(issued))
+        self.assertEqual([r['question_id'] for r in result['results']], [other_paper.id])
+
+        # Answers without a token the server issued are not marked at all
+        response = self.client.post(reverse('check_quiz'), {'answers': answers}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+
+class MockExamTests(QuestionBankTestCase):
+    def test_repair_meets_difficulty_mix(self):
+        pools = {
+            1: [(i, 'easy', 2020) for i in range(10)] + [(10, 'hard', 2020)],
+            2: [(20 + i, 'hard', 2020) for i in range(10)] + [(30 + i, 'easy', 2020) for i in range(10)],
+        }
+        selected = select_questions(pools, {1: 5, 2: 5}, {'easy': 5, 'hard': 5})
+        mix = [difficulty for chosen in selected.values() for _, difficulty in chosen]
+        self.assertEqual((mix.count('easy'), mix.count('hard')), (5, 5))
+        self.assertEqual([len(selected[1]), len(selected[2])], [5, 5])
+
+    def test_same_blueprint_shares_one_mock(self):
+        other = QuestionTopic.objects.create(subject=self.topic.subject, name='Vocabulary')
+        MultipleChoiceQuestion.objects.filter(paper=self.papers[1]).update(topic=other)
+        request = {
+            'subject_id': self.topic.subject_id,
+            'blueprint': {'topics': {str(self.topic.id): 10, str(other.id): 10}, 'difficulty': {'easy': 2, 'hard': 1}},
+        }
+        created = self.client.post(reverse('mock_exams'), request, format='json')
+        self.assertEqual(created.status_code, 201)
+        again = self.client.post(reverse('mock_exams'), request, format='json')
+        self.assertEqual((again.status_code, again.json()['id']), (200, created.json()['id']))
+
+        url = reverse('mock_exam_detail', args=[created.json()['id']])
+        body = self.client.get(url).json()
+        self.assertEqual(body['total_questions'], 20)
+        self.assertEqual(body['mock']['difficulty_mix'], {'easy': 13, 'medium': 0, 'hard': 7})
+        self.assertEqual(len({q['id'] for q in body['mcq_questions']}), 20)
+        with self.assertNumQueries(3):  # Student, programme subjects and the mock's duration
+            self.client.get(url)
+
+        request['blueprint']['topics'][str(other.id)] = 16
+        self.assertEqual(self.client.post(reverse('mock_exams'), request, format='json').status_code, 400)
+
+
+    def test_student_mocks_are_private_and_bounded(self):
+        url = reverse('mock_exams')
+        request = {
+            'subject_id': self.topic.subject_id,
+            'blueprint': {'topics': {str(self.topic.id): 5}},
+            'title': 'Official WASSCE mock',
+        }
+        for duration in (0, 301):
+            response = self.client.post(url, {**request, 'duration_minutes': duration}, format='json')
+            self.assertEqual(response.status_code, 400)
+
+        with mock.patch('past_questions.mock_exams.MAX_PRIVATE_MOCKS', 2):
+            ids = [self.client.post(url, {**request, 'seed': seed}, format='json').json()['id'] for seed in range(3)]
+        mine = self.client.get(url).json()['mock_exams']
+        self.assertEqual(sorted(m['id'] for m in mine), sorted(ids[1:]))
+        self.assertFalse(any(m['is_shared'] or m['title'] == request['title'] for m in mine))
+
+        classmate = User.objects.create_user('esi', password='secret')
+        Student.objects.create(
+            user=classmate, phone_number='0240000002', date_of_birth='2007-01-01',
+            programme=Student.objects.get(user=self.user).programme, previous_school='Wesley Girls',
+            wassce_year=2025, index_number='0010003'
+        )
+        self.client.force_authenticate(classmate)
+        self.assertEqual(self.client.get(url).json()['mock_exams'], [])
+        self.assertEqual(self.client.get(reverse('mock_exam_detail', args=[ids[2]])).status_code, 404)
+
+
+class ReviewQueueTests(QuestionBankTestCase):
+    def test_sm2_intervals(self):
+        item = ReviewItem()
+        intervals = [schedule(item, True).interval_days for _ in range(4)]
+        self.assertEqual(intervals, [1, 6, 15, 38])
+        schedule(item, False)
+        self.assertEqual((item.interval_days, item.repetitions, item.lapses, item.ease_factor), (1, 0, 1, 196))
+
+    def test_due_query_is_an_index_range_scan(self):
+        queryset = ReviewItem.objects.filter(student=self.user, due_at__lte=timezone.now()).order_by('due_at')
+        self.assertIn('review_student_due_idx', queryset.explain())
+
+    def test_bookmarked_question_is_reviewed(self):
+        question = MultipleChoiceQuestion.objects.filter(paper=self.papers[0]).first()
+        QuestionBookmark.objects.create(student=self.user, paper=self.papers[0], mcq_question=question)
+
+        data = self.client.get(reverse('review_queue')).json()
+        self.assertEqual(data['due_count'], 1)
+        item = data['items'][0]
+        self.assertEqual((item['source'], item['question']['id']), ('bookmark', question.id))
+
+        response = self.client.post(
+            reverse('review_answer', args=[item['review_id']]), {'selected_answer': 'C', 'rating': 'easy'},
+            format='json'
+        ).json()
+        self.assertEqual((response['is_correct'], response['interval_days']), (True, 1))
+        self.assertEqual(due_items(self.user), [])
+        self.assertEqual(len(due_items(self.user, now=timezone.now() + timedelta(days=2))), 1)
+
+
+class PastPaperListingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('adwoa', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        programme = Programme.objects.create(name='general_science', description='', price=100)
+        Student.objects.create(
+            user=self.user, phone_number='0240000002', date_of_birth='2007-01-01', programme=programme,
+            previous_school='Prempeh College', wassce_year=2025, index_number='0010003'
+        )
+        self.subjects = []
+        for code in ('MATH', 'PHY', 'CHEM'):
+            subject = Subject.objects.create(name=code.title(), code=code, description='')
+            ProgrammeSubject.objects.create(programme=programme, subject=subject)
+            QuestionTopic.objects.create(subject=subject, name=f'{code} basics')
+            self.subjects.append(subject)
+        # Not in the programme
+        other = Subject.objects.create(name='Literature', code='LIT', description='')
+        PastQuestionPaper.objects.create(subject=other, year=2020, paper_type='essay', title='Lit', is_published=True)
+
+    def create_papers(self, subject, years):
+        for year in years:
+            paper = PastQuestionPaper.objects.create(
+                subject=subject, year=year, paper_type='objective', title=f'{subject.code} {year}', is_published=True
+            )
+            for i in range(3):
+                MultipleChoiceQuestion.objects.create(
+                    paper=paper, question_number=i + 1, question_text=f'Q{i + 1}',
+                    option_a='a', option_b='b', option_c='c', option_d='d', correct_answer='A'
+                )
+
+    def test_listing_query_count_is_constant(self):
+        url = reverse('student_past_questions')
+        self.create_papers(self.subjects[0], [2020])
+        # Student, programme, papers with question counts, topics
+        with self.assertNumQueries(4):
+            data = self.client.get(url).json()
+        self.assertEqual(data['total_papers'], 1)
+
+        for subject in self.subjects:
+            self.create_papers(subject, range(2000, 2015))
+        with self.assertNumQueries(4):
+            data = self.client.get(url).json()
+        self.assertEqual(data['total_papers'], 46)
+        papers = [paper for subject in data['subjects'] for paper in subject['papers']]
+        self.assertTrue(all(paper['question_count'] == 3 for paper in papers))
+        self.assertEqual(len(data['topics']), 3)
+
+
+class BrowsePastPapersTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('efua', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        programme = Programme.objects.create(name='general_science', description='', price=100)
+        Student.objects.create(
+            user=self.user, phone_number='0240000003', date_of_birth='2007-01-01', programme=programme,
+            previous_school='Wesley Girls', wassce_year=2025, index_number='0010004'
+        )
+        maths = Subject.objects.create(name='Mathematics', code='MATH', description='')
+        physics = Subject.objects.create(name='Physics', code='PHY', description='')
+        for subject in (maths, physics):
+            ProgrammeSubject.objects.create(programme=programme, subject=subject)
+        self.algebra = QuestionTopic.objects.create(subject=maths, name='Algebra', order=1)
+        self.geometry = QuestionTopic.objects.create(subject=maths, name='Geometry', order=2)
+
+        def paper(subject, year, paper_type, mcq_topics=(), essay_topics=()):
+            paper = PastQuestionPaper.objects.create(
+                subject=subject, year=year, paper_type=paper_type, title=f'{subject.code} {year}', is_published=True
+            )
+            for i, topic in enumerate(mcq_topics):
+                MultipleChoiceQuestion.objects.create(
+                    paper=paper, topic=topic, question_number=i + 1, question_text='Q', option_a='a',
+                    option_b='b', option_c='c', option_d='d', correct_answer='A'
+                )
+            for i, topic in enumerate(essay_topics):
+                EssayQuestion.objects.create(paper=paper, topic=topic, question_number=i + 1, question_text='Q')
+            return paper.id
+
+        self.papers = {
+            2018: paper(maths, 2018, 'objective', mcq_topics=[self.algebra, self.algebra]),
+            # Algebra on both its MCQs and essays: still one paper for the facet
+            2019: paper(maths, 2019, 'mixed', mcq_topics=[self.algebra], essay_topics=[self.algebra, self.geometry]),
+            2020: paper(maths, 2020, 'essay', essay_topics=[self.geometry]),
+            2021: paper(physics, 2021, 'objective', mcq_topics=[None]),
+        }
+        PastQuestionPaper.objects.create(subject=physics, year=2022, paper_type='objective', title='Draft')
+
+    def browse(self, **params):
+        response = self.client.get(reverse('browse_past_papers'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def years(self, data):
+        return [paper['year'] for paper in data['results']]
+
+    def test_cursor_pages_cover_every_paper_once(self):
+        data = self.browse(page_size=3)
+        self.assertIn('facets', data)
+        years = self.years(data)
+        self.assertIsNone(data['previous'])
+
+        data = self.client.get(data['next']).json()
+        self.assertNotIn('facets', data)
+        years += self.years(data)
+        self.assertIsNone(data['next'])
+        self.assertEqual(years, [2021, 2020, 2019, 2018])
+
+        previous = self.client.get(data['previous']).json()
+        self.assertEqual(self.years(previous), [2021, 2020, 2019])
+
+    def test_filters(self):
+        self.assertEqual(self.years(self.browse(year_from=2019, year_to=2020)), [2020, 2019])
+        self.assertEqual(self.years(self.browse(paper_type='objective')), [2021, 2018])
+        self.assertEqual(self.years(self.browse(topic=self.algebra.id)), [2019, 2018])
+        self.assertEqual(self.years(self.browse(topic=self.geometry.id, paper_type='essay')), [2020])
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({'year_from': 'last'}, {'topic': 'algebra'}, {'subject': '1.5'}):
+            response = self.client.get(reverse('browse_past_papers'), params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_facets_ignore_their_own_filter(self):
+        facets = self.browse()['facets']
+        self.assertEqual(
+            [(topic['name'], topic['count']) for topic in facets['topics']], [('Algebra', 2), ('Geometry', 2)]
+        )
+
+        facets = self.browse(topic=self.geometry.id, paper_type='essay')['facets']
+        self.assertEqual(facets['years'], [{'year': 2020, 'count': 1}])
+        self.assertEqual(
+            facets['paper_types'], [{'paper_type': 'essay', 'count': 1}, {'paper_type': 'mixed', 'count': 1}]
+        )
+        self.assertEqual([(topic['name'], topic['count']) for topic in facets['topics']], [('Geometry', 1)])
+
+        facets = self.browse(year_from=2020)['facets']
+        self.assertEqual([year['year'] for year in facets['years']], [2021, 2020, 2019, 2018])
+        self.assertEqual(
+            facets['paper_types'], [{'paper_type': 'essay', 'count': 1}, {'paper_type': 'objective', 'count': 1}]
+        )
+
+    def test_facets_take_one_grouped_query_each(self):
+        # Student, page, years, paper types, MCQ and essay topic counts, topic names
+        with self.assertNumQueries(7):
+            self.browse()
+
+
+class PaperBodyCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('kwame', password='secret'))
+        subject = Subject.objects.create(name='Economics', code='ECON', description='')
+        self.topic = QuestionTopic.objects.create(subject=subject, name='Demand')
+        self.paper = PastQuestionPaper.objects.create(
+            subject=subject, year=2019, paper_type='mixed', title='Economics 2019', is_published=True
+        )
+        self.mcq = MultipleChoiceQuestion.objects.create(
+            paper=self.paper, topic=self.topic, question_number=1, question_text='What is demand?',
+            option_a='a', option_b='b', option_c='c', option_d='d', correct_answer='B', explanation='Because'
+        )
+        essay = EssayQuestion.objects.create(
+            paper=self.paper, topic=self.topic, question_number=1, question_text='Discuss', has_sub_questions=True
+        )
+        self.sub_question = EssaySubQuestion.objects.create(
+            essay_question=essay, sub_number='a', question_text='Define elasticity', marking_scheme='secret'
+        )
+        self.url = reverse('paper_detail', args=[self.paper.id])
+
+    def test_cold_and_warm_query_counts(self):
+        # updated_at, paper with subject, MCQs, essays, sub-questions
+        with self.assertNumQueries(5):
+            cold = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            warm = self.client.get(self.url)
+        self.assertEqual(warm.content, cold.content)
+
+        data = cold.json()
+        self.assertEqual(data['mcq_questions'][0]['topic'], 'Demand')
+        self.assertEqual(data['essay_questions'][0]['sub_questions'][0]['sub_number'], 'a')
+        self.assertNotIn(b'correct_answer', cold.content)
+        self.assertNotIn(b'secret', cold.content)
+
+    def test_question_and_topic_edits_rebuild_the_body(self):
+        self.client.get(self.url)
+
+        self.mcq.question_text = 'Define demand'
+        self.mcq.save()
+        self.assertEqual(self.client.get(self.url).json()['mcq_questions'][0]['question_text'], 'Define demand')
+
+        self.sub_question.question_text = 'Define price elasticity'
+        self.sub_question.save()
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['essay_questions'][0]['sub_questions'][0]['question_text'], 'Define price elasticity')
+
+        self.topic.name = 'Demand and Supply'
+        self.topic.save()
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['mcq_questions'][0]['topic'], 'Demand and Supply')
+        self.assertEqual(data['essay_questions'][0]['topic'], 'Demand and Supply')
+
+        self.topic.delete()
+        self.assertIsNone(self.client.get(self.url).json()['mcq_questions'][0]['topic'])
+
+    def test_unpublished_paper_is_not_found(self):
+        PastQuestionPaper.objects.filter(id=self.paper.id).update(is_published=False)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
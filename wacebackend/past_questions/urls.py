@@ -3,6 +3,20 @@ from . import views
 
 urlpatterns = [
     path('student/', views.student_past_questions, name='student_past_questions'),
+    path('papers/', views.browse_past_papers, name='browse_past_papers'),
     path('paper/<int:paper_id>/', views.paper_detail, name='paper_detail'),
+    path('paper/<int:paper_id>/statistics/', views.paper_statistics, name='paper_statistics'),
+    path('paper/<int:paper_id>/attempts/', views.start_attempt, name='start_attempt'),
+    path('attempts/<int:attempt_id>/autosave/', views.autosave_attempt, name='autosave_attempt'),
+    path('attempts/<int:attempt_id>/submit/', views.submit_attempt, name='submit_attempt'),
+    path('topics/<int:topic_id>/quiz/', views.topic_quiz, name='topic_quiz'),
+    path('quiz/check/', views.check_quiz, name='check_quiz'),
+    path('mocks/', views.mock_exams, name='mock_exams'),
+    path('mocks/<int:mock_id>/', views.mock_exam_detail, name='mock_exam_detail'),
+    path('practice/', views.start_practice_session, name='start_practice_session'),
+    path('practice/<int:session_id>/', views.practice_session_detail, name='practice_session_detail'),
+    path('practice/<int:session_id>/answer/', views.answer_practice_question, name='answer_practice_question'),
+    path('review/', views.review_queue, name='review_queue'),
+    path('review/<int:review_id>/', views.review_answer, name='review_answer'),
     path('populate/', views.populate_past_questions_api, name='populate_past_questions'),
 ]
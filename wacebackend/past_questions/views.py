@@ -1,10 +1,50 @@
-from django.http import JsonResponse
+import random
+
+from django.db import transaction
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated
 from students.models import Student
 from courses.models import ProgrammeSubject
-from .models import PastQuestionPaper, QuestionTopic
+from jobs.views import enqueue_job_response
+from .models import (
+    PastQuestionPaper, QuestionTopic, MultipleChoiceQuestion, EssayQuestion, StudentAttempt, QuestionStatistics,
+    PracticeSession, MockExam, ReviewItem
+)
+from .paper_cache import get_paper_body, serialize_mcq
+from .grading import VALID_OPTIONS, GradingError, grade_attempt, normalize_answers
+from .autosave import AutosaveError, autosave, flush_attempt, parse_changes
+from .item_statistics import suggested_difficulty
+from .quiz import (
+    MAX_QUIZ_QUESTIONS, STRATIFY_FIELDS, build_quiz, check_answers, get_topic_pool, issue_quiz, sample_questions,
+    take_issued_quiz
+)
+from .review import DEFAULT_DUE_LIMIT, MAX_DUE_LIMIT, RATING_QUALITY, due_count, due_items, schedule
+from .mock_exams import BlueprintError, assemble_mock_exam, get_mock_exam_body, mark_mock_open, open_mock_ids
+from .adaptive import (
+    DEFAULT_MAX_QUESTIONS, MAX_QUESTIONS_LIMIT, PracticeError, answer_question, serialize_session, start_session
+)
+
+
+def _count_subquery(model, field):
+    """Correlated COUNT of `model` rows whose `field` points at the outer row"""
+    counts = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        count=Count('pk')
+    ).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def with_question_counts(papers):
+    """Annotate papers with mcq_count and essay_count in the same query"""
+    return papers.annotate(
+        mcq_count=_count_subquery(MultipleChoiceQuestion, 'paper'),
+        essay_count=_count_subquery(EssayQuestion, 'paper'),
+    )
 
 
 @api_view(['GET'])
@@ -24,17 +64,20 @@ def student_past_questions(request):
             programme=programme
         ).select_related('subject').values_list('subject_id', flat=True)
         
-        # Get all past papers for these subjects from 1990-2025
-        papers = PastQuestionPaper.objects.filter(
+        # Get all past papers for these subjects from 1990-2025, with their question counts
+        papers = with_question_counts(PastQuestionPaper.objects.filter(
             subject_id__in=programme_subjects,
             year__gte=1990,
             year__lte=2025,
             is_published=True
-        ).select_related('subject').order_by('-year', 'subject__name', 'paper_number')
+        )).select_related('subject').order_by('-year', 'subject__name', 'paper_number')
+        
+        total_papers = 0
         
         # Group papers by subject
         subjects_data = {}
         for paper in papers:
+            total_papers += 1
             subject_name = paper.subject.name
             if subject_name not in subjects_data:
                 subjects_data[subject_name] = {
@@ -53,7 +96,7 @@ def student_past_questions(request):
                 'title': paper.title,
                 'duration_minutes': paper.duration_minutes,
                 'total_marks': paper.total_marks,
-                'question_count': paper.mcq_questions.count() + paper.essay_questions.count()
+                'question_count': paper.mcq_count + paper.essay_count
             })
         
         # Get topics for these subjects
@@ -85,7 +128,7 @@ def student_past_questions(request):
                 'start': 1990,
                 'end': 2025
             },
-            'total_papers': papers.count()
+            'total_papers': total_papers
         })
         
     except Student.DoesNotExist:
@@ -94,10 +137,151 @@ def student_past_questions(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+class PaperCursorPagination(CursorPagination):
+    """Keyset pagination over papers, newest year first"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    ordering = ('-year', '-id')
+
+
+def _int_param(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+
+
+def _filter_papers(papers, filters, exclude=None):
+    """Apply the browse filters to a paper queryset, skipping the `exclude` facet"""
+    if filters['subject'] is not None:
+        papers = papers.filter(subject_id=filters['subject'])
+    if exclude != 'year':
+        if filters['year_from'] is not None:
+            papers = papers.filter(year__gte=filters['year_from'])
+        if filters['year_to'] is not None:
+            papers = papers.filter(year__lte=filters['year_to'])
+    if exclude != 'paper_type' and filters['paper_type']:
+        papers = papers.filter(paper_type=filters['paper_type'])
+    if exclude != 'topic' and filters['topic'] is not None:
+        papers = papers.filter(
+            Exists(MultipleChoiceQuestion.objects.filter(paper=OuterRef('pk'), topic_id=filters['topic']))
+            | Exists(EssayQuestion.objects.filter(paper=OuterRef('pk'), topic_id=filters['topic']))
+        )
+    return papers
+
+
+def _paper_facets(papers, filters):
+    """
+    Facet counts for the browse screen, one grouped query per facet
+
+    Each facet ignores its own filter, so the client can show how many
+    papers every alternative value would return.
+    """
+    years = _filter_papers(papers, filters, exclude='year').order_by('-year').values('year').annotate(
+        count=Count('id')
+    )
+    paper_types = _filter_papers(papers, filters, exclude='paper_type').order_by('paper_type').values(
+        'paper_type'
+    ).annotate(count=Count('id'))
+
+    # A paper counts once per topic, whether the topic is on its MCQs, essays or both:
+    # essays only count papers that have no MCQ on the same topic
+    topic_papers = _filter_papers(papers, filters, exclude='topic')
+    topic_counts = {}
+    mcq_topics = MultipleChoiceQuestion.objects.filter(paper__in=topic_papers, topic__isnull=False)
+    essay_topics = EssayQuestion.objects.filter(paper__in=topic_papers, topic__isnull=False).exclude(
+        Exists(MultipleChoiceQuestion.objects.filter(paper=OuterRef('paper'), topic=OuterRef('topic')))
+    )
+    for questions in (mcq_topics, essay_topics):
+        for topic_id, count in questions.order_by().values('topic').annotate(
+            count=Count('paper', distinct=True)
+        ).values_list('topic', 'count'):
+            topic_counts[topic_id] = topic_counts.get(topic_id, 0) + count
+    topics = QuestionTopic.objects.filter(id__in=topic_counts).order_by('subject__name', 'order', 'name')
+
+    return {
+        'years': list(years),
+        'paper_types': list(paper_types),
+        'topics': [
+            {'id': topic.id, 'name': topic.name, 'subject_id': topic.subject_id, 'count': topic_counts[topic.id]}
+            for topic in topics
+        ],
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def browse_past_papers(request):
+    """
+    Browse published past papers for the student's programme, one page at a time
+
+    Filters: subject, year_from, year_to, paper_type, topic.
+    Pagination: cursor (from next/previous) and page_size (max 50).
+    The first page also carries facet counts per year, paper type and topic.
+    """
+    try:
+        filters = {
+            'subject': _int_param(request, 'subject'),
+            'year_from': _int_param(request, 'year_from'),
+            'year_to': _int_param(request, 'year_to'),
+            'paper_type': request.query_params.get('paper_type') or None,
+            'topic': _int_param(request, 'topic'),
+        }
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        student = Student.objects.select_related('programme').get(user=request.user)
+    except Student.DoesNotExist:
+        return JsonResponse({'error': 'Student profile not found'}, status=404)
+
+    papers = PastQuestionPaper.objects.filter(
+        subject__programme_subjects__programme=student.programme,
+        is_published=True
+    )
+
+    paginator = PaperCursorPagination()
+    page = paginator.paginate_queryset(
+        with_question_counts(_filter_papers(papers, filters)).select_related('subject'),
+        request
+    )
+
+    results = [
+        {
+            'id': paper.id,
+            'subject': {
+                'id': paper.subject.id,
+                'name': paper.subject.name,
+                'code': paper.subject.code,
+            },
+            'year': paper.year,
+            'paper_number': paper.paper_number,
+            'paper_type': paper.paper_type,
+            'title': paper.title,
+            'duration_minutes': paper.duration_minutes,
+            'total_marks': paper.total_marks,
+            'question_count': paper.mcq_count + paper.essay_count
+        }
+        for paper in page
+    ]
+
+    response = paginator.get_paginated_response(results)
+    # Facets don't change between pages, so only the first page computes them
+    if not request.query_params.get(paginator.cursor_query_param):
+        response.data['facets'] = _paper_facets(papers, filters)
+    return response
+
+
 @csrf_exempt
 def populate_past_questions_api(request):
     """
     API endpoint to populate past questions - requires admin
+
+    Queues the command as a background job; poll status_url for the result.
     """
     if request.method != 'POST':
         return JsonResponse({'error': 'POST method required'}, status=405)
@@ -108,24 +292,8 @@ def populate_past_questions_api(request):
     if not request.user.is_staff:
         return JsonResponse({'error': 'Admin access required'}, status=403)
     
-    from django.core.management import call_command
-    from io import StringIO
-    
-    try:
-        out = StringIO()
-        call_command('populate_past_questions', stdout=out)
-        output = out.getvalue()
-        
-        return JsonResponse({
-            'success': True,
-            'message': 'Past questions populated successfully',
-            'output': output
-        })
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'error': str(e)
-        }, status=500)
+    data, status_code = enqueue_job_response(request, 'populate_past_questions')
+    return JsonResponse(data, status=status_code)
 
 
 @api_view(['GET'])
@@ -133,72 +301,501 @@ def populate_past_questions_api(request):
 def paper_detail(request, paper_id):
     """Get detailed information about a specific past paper"""
     try:
-        paper = PastQuestionPaper.objects.get(id=paper_id, is_published=True)
-        
-        # Get MCQ questions
-        mcq_questions = paper.mcq_questions.all().order_by('question_number')
-        mcq_data = []
-        for mcq in mcq_questions:
-            mcq_data.append({
-                'id': mcq.id,
-                'question_number': mcq.question_number,
-                'question_text': mcq.question_text,
-                'options': {
-                    'A': mcq.option_a,
-                    'B': mcq.option_b,
-                    'C': mcq.option_c,
-                    'D': mcq.option_d,
-                    'E': mcq.option_e if mcq.option_e else None
-                },
-                'marks': mcq.marks,
-                'difficulty': mcq.difficulty,
-                'topic': mcq.topic.name if mcq.topic else None
-            })
-        
-        # Get essay questions
-        essay_questions = paper.essay_questions.all().order_by('section', 'question_number')
-        essay_data = []
-        for essay in essay_questions:
-            sub_questions = []
-            if essay.has_sub_questions:
-                for sub in essay.sub_questions.all():
-                    sub_questions.append({
-                        'sub_number': sub.sub_number,
-                        'question_text': sub.question_text,
-                        'marks': sub.marks
-                    })
-            
-            essay_data.append({
-                'id': essay.id,
-                'question_number': essay.question_number,
-                'section': essay.section,
-                'question_text': essay.question_text,
-                'marks': essay.marks,
-                'suggested_time_minutes': essay.suggested_time_minutes,
-                'difficulty': essay.difficulty,
-                'topic': essay.topic.name if essay.topic else None,
-                'has_sub_questions': essay.has_sub_questions,
-                'sub_questions': sub_questions
-            })
+        content = get_paper_body(paper_id)
+        if content is None:
+            return JsonResponse({'error': 'Paper not found'}, status=404)
         
-        return JsonResponse({
-            'paper': {
-                'id': paper.id,
-                'subject': paper.subject.name,
-                'year': paper.year,
-                'paper_number': paper.paper_number,
-                'paper_type': paper.paper_type,
-                'title': paper.title,
-                'instructions': paper.instructions,
-                'duration_minutes': paper.duration_minutes,
-                'total_marks': paper.total_marks
-            },
-            'mcq_questions': mcq_data,
-            'essay_questions': essay_data,
-            'total_questions': len(mcq_data) + len(essay_data)
-        })
+        return HttpResponse(content, content_type='application/json')
         
-    except PastQuestionPaper.DoesNotExist:
-        return JsonResponse({'error': 'Paper not found'}, status=404)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def start_attempt(request, paper_id):
+    """Start an attempt at a published paper, or resume the one in progress"""
+    try:
+        paper = PastQuestionPaper.objects.get(id=paper_id, is_published=True)
+    except PastQuestionPaper.DoesNotExist:
+        return JsonResponse({'error': 'Paper not found'}, status=404)
+
+    attempt = StudentAttempt.objects.filter(
+        student=request.user, paper=paper, status='in_progress'
+    ).first()
+    created = attempt is None
+    if created:
+        attempt = StudentAttempt.objects.create(student=request.user, paper=paper)
+
+    return JsonResponse({
+        'attempt_id': attempt.id,
+        'paper_id': paper.id,
+        'status': attempt.status,
+        'started_at': attempt.started_at,
+        'duration_minutes': paper.duration_minutes,
+        'resumed': not created
+    }, status=201 if created else 200)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_attempt(request, attempt_id):
+    """
+    Submit and grade the MCQ answer sheet for an attempt
+
+    Body: {"answers": {"<question_id>": "A", ...}} or
+    {"answers": [{"question_id": 1, "selected_answer": "A"}, ...]},
+    with an optional time_spent_minutes. Autosaved answers are flushed
+    first and submitted answers take precedence over them; time tracked
+    by autosave takes precedence over the client's time_spent_minutes.
+    """
+    try:
+        attempt = StudentAttempt.objects.get(id=attempt_id, student=request.user)
+    except StudentAttempt.DoesNotExist:
+        return JsonResponse({'error': 'Attempt not found'}, status=404)
+
+    if attempt.status != 'in_progress':
+        return JsonResponse({'error': 'This attempt has already been submitted'}, status=409)
+
+    time_spent_minutes = request.data.get('time_spent_minutes')
+    try:
+        answers = normalize_answers(request.data.get('answers', {}))
+        if time_spent_minutes is not None:
+            time_spent_minutes = max(0, int(time_spent_minutes))
+    except (GradingError, TypeError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        # One transaction, so no autosave can land between the flush and the grade
+        with transaction.atomic():
+            tracked_minutes = flush_attempt(attempt)
+            if tracked_minutes is not None:
+                time_spent_minutes = tracked_minutes
+            return JsonResponse(grade_attempt(attempt, answers, time_spent_minutes=time_spent_minutes))
+    except GradingError as e:
+        return JsonResponse({'error': str(e)}, status=409)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def autosave_attempt(request, attempt_id):
+    """
+    Autosave changed answers for an in-progress attempt
+
+    Body: {"mcq": {"<question_id>": "A" or null}, "essay": {"<question_id>": "text"}}.
+    Send only what changed since the last autosave; an empty body is a
+    heartbeat that keeps server-side time tracking going.
+    """
+    try:
+        mcq_changes, essay_changes = parse_changes(request.data)
+    except AutosaveError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        result = autosave(attempt_id, request.user, mcq_changes, essay_changes)
+    except AutosaveError as e:
+        return JsonResponse({'error': str(e)}, status=409)
+
+    if result is None:
+        return JsonResponse({'error': 'Attempt not found'}, status=404)
+    return JsonResponse(result)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def paper_statistics(request, paper_id):
+    """
+    Per-question item statistics for a published paper, from the precomputed table
+
+    Option rates and discrimination point at the correct options, so only
+    staff get them.
+    """
+    if not PastQuestionPaper.objects.filter(id=paper_id, is_published=True).exists():
+        return JsonResponse({'error': 'Paper not found'}, status=404)
+
+    statistics = QuestionStatistics.objects.filter(question__paper_id=paper_id).select_related(
+        'question'
+    ).order_by('question__question_number')
+
+    questions = []
+    for stats in statistics:
+        data = {
+            'question_id': stats.question_id,
+            'question_number': stats.question.question_number,
+            'attempts_count': stats.attempts_count,
+            'p_value': stats.p_value,
+            'difficulty': stats.question.difficulty,
+            'measured_difficulty': suggested_difficulty(stats.p_value),
+            'omitted_rate': round(stats.omitted_count / stats.attempts_count, 4) if stats.attempts_count else None,
+            'updated_at': stats.updated_at,
+        }
+        if request.user.is_staff:
+            answered = stats.attempts_count - stats.omitted_count
+            data['discrimination'] = stats.discrimination
+            # Share of answering students choosing each option
+            data['option_rates'] = {
+                option: round(count / answered, 4)
+                for option, count in sorted(stats.option_counts.items())
+            } if answered else {}
+        questions.append(data)
+
+    return JsonResponse({'paper_id': paper_id, 'questions': questions})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def start_practice_session(request):
+    """
+    Start an adaptive practice session for one of the student's subjects
+
+    Body: {"subject_id": 1, "max_questions": 20}
+    """
+    try:
+        subject_id = int(request.data.get('subject_id'))
+        max_questions = int(request.data.get('max_questions', DEFAULT_MAX_QUESTIONS))
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'subject_id and max_questions must be integers'}, status=400)
+    if not 1 <= max_questions <= MAX_QUESTIONS_LIMIT:
+        return JsonResponse({'error': f'max_questions must be between 1 and {MAX_QUESTIONS_LIMIT}'}, status=400)
+
+    try:
+        student = Student.objects.get(user=request.user)
+    except Student.DoesNotExist:
+        return JsonResponse({'error': 'Student profile not found'}, status=404)
+    if not ProgrammeSubject.objects.filter(programme_id=student.programme_id, subject_id=subject_id).exists():
+        return JsonResponse({'error': 'Subject not found in your programme'}, status=404)
+
+    withheld = _withheld_question_ids(
+        request.user, MultipleChoiceQuestion.objects.filter(paper__subject_id=subject_id)
+    )
+    try:
+        session = start_session(request.user, subject_id, max_questions=max_questions, withheld=withheld)
+        return JsonResponse(serialize_session(session), status=201)
+    except PracticeError as e:
+        return JsonResponse({'error': str(e)}, status=404)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def practice_session_detail(request, session_id):
+    """Current state and question of a practice session"""
+    try:
+        session = PracticeSession.objects.get(id=session_id, student=request.user)
+    except PracticeSession.DoesNotExist:
+        return JsonResponse({'error': 'Practice session not found'}, status=404)
+    try:
+        return JsonResponse(serialize_session(session))
+    except PracticeError as e:
+        return JsonResponse({'error': str(e)}, status=404)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def answer_practice_question(request, session_id):
+    """
+    Answer the current question of a practice session
+
+    Body: {"question_id": 1, "selected_answer": "A"}. The response reveals
+    the correct answer and carries the next question, if any. Questions on
+    a paper the student is sitting or a mock they have open are never
+    chosen, and if one became live after it was chosen its answer is
+    withheld.
+    """
+    try:
+        session = PracticeSession.objects.get(id=session_id, student=request.user)
+    except PracticeSession.DoesNotExist:
+        return JsonResponse({'error': 'Practice session not found'}, status=404)
+
+    selected_answer = str(request.data.get('selected_answer', '')).strip().upper()
+    try:
+        question_id = int(request.data.get('question_id'))
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'question_id must be an integer'}, status=400)
+    if selected_answer not in VALID_OPTIONS:
+        return JsonResponse({'error': 'selected_answer must be one of A-E'}, status=400)
+
+    withheld = _withheld_question_ids(
+        request.user, MultipleChoiceQuestion.objects.filter(paper__subject_id=session.subject_id)
+    )
+    try:
+        question, is_correct = answer_question(session, question_id, selected_answer, withheld=withheld)
+        data = serialize_session(session)
+    except PracticeError as e:
+        return JsonResponse({'error': str(e)}, status=409)
+
+    data['result'] = {
+        'question_id': question.id,
+        'selected_answer': selected_answer,
+        'correct_answer': question.correct_answer,
+        'is_correct': is_correct,
+        'explanation': question.explanation,
+    }
+    if question.id in withheld:
+        data['result'].update(correct_answer=None, is_correct=None, explanation=None, withheld=True)
+    return JsonResponse(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def topic_quiz(request, topic_id):
+    """
+    Random practice quiz on a question topic
+
+    Query params: count (default 20, max 50), difficulty (comma-separated),
+    year_from, year_to, stratify ('difficulty' or 'year') and seed (to
+    draw the same quiz again).
+    """
+    try:
+        count = _int_param(request, 'count') or 20
+        year_from = _int_param(request, 'year_from')
+        year_to = _int_param(request, 'year_to')
+        seed = _int_param(request, 'seed')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if not 1 <= count <= MAX_QUIZ_QUESTIONS:
+        return JsonResponse({'error': f'count must be between 1 and {MAX_QUIZ_QUESTIONS}'}, status=400)
+    stratify = request.query_params.get('stratify') or None
+    if stratify is not None and stratify not in STRATIFY_FIELDS:
+        return JsonResponse({'error': f"stratify must be one of: {', '.join(STRATIFY_FIELDS)}"}, status=400)
+    difficulties = {d for d in request.query_params.get('difficulty', '').split(',') if d}
+
+    try:
+        student = Student.objects.get(user=request.user)
+    except Student.DoesNotExist:
+        return JsonResponse({'error': 'Student profile not found'}, status=404)
+    topic = QuestionTopic.objects.filter(
+        id=topic_id,
+        subject__programme_subjects__programme_id=student.programme_id
+    ).first()
+    if topic is None:
+        return JsonResponse({'error': 'Topic not found'}, status=404)
+
+    pool = get_topic_pool(topic.id)
+    question_ids = sample_questions(
+        pool, count, difficulties=difficulties, year_from=year_from, year_to=year_to, stratify=stratify,
+        rng=random.Random(seed) if seed is not None else random
+    )
+
+    questions = build_quiz(question_ids)
+    return JsonResponse({
+        'topic': {'id': topic.id, 'name': topic.name},
+        'available_count': len(pool),
+        'count': len(questions),
+        'quiz_token': issue_quiz(request.user.id, [question['id'] for question in questions]),
+        'questions': questions
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def check_quiz(request):
+    """
+    Mark a practice quiz drawn by topic_quiz
+
+    Body: {"quiz_token": "...", "answers": {"<question_id>": "A", ...}}.
+    Each quiz can be checked once, and only its own questions are marked.
+    Questions on a paper the student is sitting or a mock they have open
+    are withheld. Nothing is stored.
+    """
+    try:
+        answers = normalize_answers(request.data.get('answers', {}))
+    except GradingError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if len(answers) > MAX_QUIZ_QUESTIONS:
+        return JsonResponse({'error': f'At most {MAX_QUIZ_QUESTIONS} answers can be checked at once'}, status=400)
+
+    issued = take_issued_quiz(str(request.data.get('quiz_token', '')), request.user.id)
+    if issued is None:
+        return JsonResponse({'error': 'Quiz not found; it may have expired or already been checked'}, status=404)
+    answers = {question_id: option for question_id, option in answers.items() if question_id in issued}
+
+    withheld = _withheld_question_ids(request.user, MultipleChoiceQuestion.objects.filter(id__in=answers.keys()))
+    results = sorted(check_answers(answers, withheld=withheld), key=lambda result: result['question_id'])
+    return JsonResponse({
+        'correct_count': sum(1 for result in results if result['is_correct']),
+        'question_count': len(results),
+        'withheld_question_ids': sorted(withheld),
+        'results': results
+    })
+
+
+def _withheld_question_ids(user, questions):
+    """Ids of `questions` (an MCQ queryset) on a paper the user is sitting or in a mock they have open"""
+    questions = questions.order_by()
+    withheld = set(
+        questions.filter(
+            paper__attempts__student=user, paper__attempts__status='in_progress'
+        ).values_list('id', flat=True)
+    )
+    mock_ids = open_mock_ids(user.id)
+    if mock_ids:
+        withheld.update(questions.filter(mock_exams__id__in=mock_ids).values_list('id', flat=True))
+    return withheld
+
+
+def _student_subject_ids(user):
+    """Subject ids of the user's programme, or None if they have no student profile"""
+    programme_id = Student.objects.filter(user=user).values_list('programme_id', flat=True).first()
+    if programme_id is None:
+        return None
+    return set(ProgrammeSubject.objects.filter(programme_id=programme_id).values_list('subject_id', flat=True))
+
+
+def _visible_mocks(user):
+    """Shared mocks and the user's own private ones"""
+    return MockExam.objects.filter(Q(is_shared=True) | Q(created_by=user))
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def mock_exams(request):
+    """
+    GET: mock exams for the student's subjects (optionally ?subject=<id>)
+    POST: get or assemble the mock for a blueprint
+
+    POST body: {"subject_id": 1, "blueprint": {...}, "title": "...",
+    "duration_minutes": 90, "seed": 7}. See past_questions/mock_exams.py for
+    the blueprint format. The same blueprint and seed return the same mock.
+    Mocks assembled by staff are shared with every student of the subject;
+    a student's mocks are private to them and get a generated title.
+    """
+    subject_ids = _student_subject_ids(request.user)
+    if subject_ids is None:
+        return JsonResponse({'error': 'Student profile not found'}, status=404)
+
+    if request.method == 'GET':
+        try:
+            subject_id = _int_param(request, 'subject')
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        mocks = _visible_mocks(request.user).filter(subject_id__in=subject_ids).select_related('subject').annotate(
+            question_count=Count('mock_questions')
+        )
+        if subject_id is not None:
+            mocks = mocks.filter(subject_id=subject_id)
+        return JsonResponse({
+            'mock_exams': [
+                {
+                    'id': mock.id,
+                    'subject': {'id': mock.subject.id, 'name': mock.subject.name},
+                    'title': mock.title,
+                    'duration_minutes': mock.duration_minutes,
+                    'question_count': mock.question_count,
+                    'is_shared': mock.is_shared,
+                    'created_at': mock.created_at,
+                }
+                for mock in mocks[:100]
+            ]
+        })
+
+    try:
+        subject_id = int(request.data.get('subject_id'))
+        duration_minutes = int(request.data.get('duration_minutes', 90))
+        seed = request.data.get('seed')
+        seed = int(seed) if seed is not None else None
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'subject_id, duration_minutes and seed must be integers'}, status=400)
+    if subject_id not in subject_ids:
+        return JsonResponse({'error': 'Subject not found in your programme'}, status=404)
+
+    try:
+        mock, created = assemble_mock_exam(
+            subject_id,
+            request.data.get('blueprint'),
+            title=request.data.get('title') if request.user.is_staff else None,
+            duration_minutes=duration_minutes,
+            seed=seed,
+            created_by=request.user,
+            shared=request.user.is_staff
+        )
+    except BlueprintError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({'id': mock.id, 'title': mock.title, 'created': created}, status=201 if created else 200)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def mock_exam_detail(request, mock_id):
+    """Questions of a mock exam (without answers), shared and cached across students"""
+    subject_ids = _student_subject_ids(request.user)
+    if subject_ids is None:
+        return JsonResponse({'error': 'Student profile not found'}, status=404)
+    duration_minutes = _visible_mocks(request.user).filter(id=mock_id, subject_id__in=subject_ids).values_list(
+        'duration_minutes', flat=True
+    ).first()
+    if duration_minutes is None:
+        return JsonResponse({'error': 'Mock exam not found'}, status=404)
+
+    content = get_mock_exam_body(mock_id)
+    if content is None:
+        return JsonResponse({'error': 'Mock exam not found'}, status=404)
+    # Its questions can't be checked with check_quiz while the student sits it
+    mark_mock_open(request.user.id, mock_id, duration_minutes)
+    return HttpResponse(content, content_type='application/json')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def review_queue(request):
+    """Questions due for spaced-repetition review, most overdue first (?limit=, max 100)"""
+    try:
+        limit = _int_param(request, 'limit') or DEFAULT_DUE_LIMIT
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    limit = max(1, min(limit, MAX_DUE_LIMIT))
+
+    now = timezone.now()
+    items = due_items(request.user, now=now, limit=limit)
+    return JsonResponse({
+        'due_count': len(items) if len(items) < limit else due_count(request.user, now=now),
+        'items': [
+            {
+                'review_id': item.id,
+                'source': item.source,
+                'due_at': item.due_at,
+                'repetitions': item.repetitions,
+                'question': dict(
+                    serialize_mcq(item.question),
+                    paper={'id': item.question.paper_id, 'year': item.question.paper.year}
+                ),
+            }
+            for item in items
+        ]
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def review_answer(request, review_id):
+    """
+    Answer a review question and reschedule it
+
+    Body: {"selected_answer": "A", "rating": "hard" | "good" | "easy"}.
+    The rating (default "good") only matters when the answer is right.
+    """
+    selected_answer = str(request.data.get('selected_answer', '')).strip().upper()
+    rating = request.data.get('rating', 'good')
+    if selected_answer not in VALID_OPTIONS:
+        return JsonResponse({'error': 'selected_answer must be one of A-E'}, status=400)
+    if rating not in RATING_QUALITY:
+        return JsonResponse({'error': f"rating must be one of: {', '.join(RATING_QUALITY)}"}, status=400)
+
+    item = ReviewItem.objects.filter(id=review_id, student=request.user).select_related('question').first()
+    if item is None:
+        return JsonResponse({'error': 'Review item not found'}, status=404)
+
+    is_correct = selected_answer == item.question.correct_answer
+    schedule(item, is_correct, rating=rating)
+    item.save(update_fields=[
+        'due_at', 'interval_days', 'ease_factor', 'repetitions', 'lapses', 'last_reviewed_at'
+    ])
+
+    return JsonResponse({
+        'review_id': item.id,
+        'is_correct': is_correct,
+        'correct_answer': item.question.correct_answer,
+        'explanation': item.question.explanation,
+        'interval_days': item.interval_days,
+        'next_due_at': item.due_at,
+    })
@@ -0,0 +1,14 @@
+from django.contrib import admin
+from .models import SearchDocument
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ['title', 'kind', 'subject', 'updated_at']
+    list_filter = ['kind', 'subject']
+    search_fields = ['title']
+    readonly_fields = ['kind', 'object_id', 'subject', 'title', 'body', 'context', 'updated_at']
+
+    def has_add_permission(self, request):
+        # Documents are written by the indexer (signals and rebuild_search_index)
+        return False
@@ -0,0 +1,75 @@
+"""
+Full-text matching and ranking of SearchDocument rows, per database
+
+- PostgreSQL: `search_vector @@ to_tsquery(...)` on the generated tsvector
+  column (GIN indexed), ranked by ts_rank_cd with titles weighted above bodies.
+- SQLite: a MATCH on the FTS5 table, ranked by bm25 with the same weighting.
+- Anything else: every word must appear in the title or body (icontains),
+  unranked. Slow, but keeps search usable on other backends.
+
+Every word of the query is matched as a prefix, so results appear while a
+student is still typing the last word.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+TABLE = 'search_searchdocument'
+FTS_TABLE = 'search_searchdocument_fts'
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+MAX_QUERY_WORDS = 8
+
+
+def query_words(query):
+    """Words of a search query, lowercased; punctuation and operators are dropped"""
+    return [word.lower() for word in WORD_RE.findall(query or '')][:MAX_QUERY_WORDS]
+
+
+def _postgresql(queryset, words):
+    tsquery = ' & '.join(f'{word}:*' for word in words)
+    return queryset.filter(
+        id__in=RawSQL(
+            f"SELECT id FROM {TABLE} WHERE search_vector @@ to_tsquery('english', %s)", [tsquery]
+        )
+    ).annotate(rank=RawSQL(
+        f"ts_rank_cd({TABLE}.search_vector, to_tsquery('english', %s))", [tsquery], output_field=FloatField()
+    ))
+
+
+def _sqlite(queryset, words):
+    # Quoted words are taken literally by FTS5; the trailing * makes each a prefix
+    match = ' '.join(f'"{word}"*' for word in words)
+    return queryset.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+    ).annotate(rank=RawSQL(
+        # bm25() is lower for better matches, so negate it to sort like ts_rank_cd
+        f'SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = {TABLE}.id',
+        [match], output_field=FloatField()
+    ))
+
+
+def _fallback(queryset, words):
+    for word in words:
+        queryset = queryset.filter(Q(title__icontains=word) | Q(body__icontains=word))
+    return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+BACKENDS = {
+    'postgresql': _postgresql,
+    'sqlite': _sqlite,
+}
+
+
+def search_documents(queryset, query):
+    """
+    Filter SearchDocument rows to those matching `query`, annotated with `rank`
+
+    Higher ranks are better matches. A query without any words matches nothing.
+    """
+    words = query_words(query)
+    if not words:
+        return queryset.none()
+    return BACKENDS.get(connection.vendor, _fallback)(queryset, words)
@@ -0,0 +1,171 @@
+"""
+Turning lessons, topics and past questions into SearchDocument rows
+
+Signals (see search/signals.py) re-index a single object whenever it is
+saved or deleted. `python manage.py rebuild_search_index` rebuilds
+everything in bulk after imports that bypass signals. Either way, writing
+the SearchDocument row is enough: the database keeps its full-text index
+in step.
+"""
+from django.db import transaction
+from django.utils.html import strip_tags
+
+from courses.models import Lesson, Topic
+from past_questions.models import EssayQuestion, MultipleChoiceQuestion
+from .models import SearchDocument
+
+UPDATE_FIELDS = ['subject', 'title', 'body', 'context', 'updated_at']
+
+
+def _text(*parts):
+    return '\n'.join(strip_tags(part) for part in parts if part)
+
+
+def lesson_document(lesson):
+    return SearchDocument(
+        kind='lesson',
+        object_id=lesson.id,
+        subject_id=lesson.topic.subject_id,
+        title=lesson.title,
+        body=_text(lesson.content, lesson.notes),
+        context={'topic_id': lesson.topic_id, 'lesson_type': lesson.lesson_type},
+    )
+
+
+def topic_document(topic):
+    return SearchDocument(
+        kind='topic',
+        object_id=topic.id,
+        subject_id=topic.subject_id,
+        title=topic.title,
+        body=_text(topic.description),
+        context={},
+    )
+
+
+def _question_context(question):
+    return {'paper_id': question.paper_id, 'year': question.paper.year, 'question_number': question.question_number}
+
+
+def mcq_document(question):
+    """Only questions of published papers are searchable"""
+    if not question.paper.is_published:
+        return None
+    return SearchDocument(
+        kind='mcq',
+        object_id=question.id,
+        subject_id=question.paper.subject_id,
+        title=f'{question.paper.title} - Question {question.question_number}',
+        body=_text(
+            question.question_text, question.option_a, question.option_b, question.option_c,
+            question.option_d, question.option_e
+        ),
+        context=_question_context(question),
+    )
+
+
+def essay_document(question):
+    if not question.paper.is_published:
+        return None
+    return SearchDocument(
+        kind='essay',
+        object_id=question.id,
+        subject_id=question.paper.subject_id,
+        title=f'{question.paper.title} - Question {question.question_number}',
+        body=_text(question.question_text, *(sub.question_text for sub in question.sub_questions.all())),
+        context=_question_context(question),
+    )
+
+
+# kind -> (model, document builder, queryset that builds documents without per-row queries)
+INDEXED_MODELS = {
+    'lesson': (Lesson, lesson_document, lambda: Lesson.objects.select_related('topic')),
+    'topic': (Topic, topic_document, lambda: Topic.objects.all()),
+    'mcq': (
+        MultipleChoiceQuestion, mcq_document,
+        lambda: MultipleChoiceQuestion.objects.select_related('paper').filter(paper__is_published=True)
+    ),
+    'essay': (
+        EssayQuestion, essay_document,
+        lambda: EssayQuestion.objects.select_related('paper').prefetch_related('sub_questions').filter(
+            paper__is_published=True
+        )
+    ),
+}
+KIND_BY_MODEL = {model: kind for kind, (model, _, _) in INDEXED_MODELS.items()}
+
+
+def save_documents(documents):
+    """Insert or update documents in one statement per batch"""
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=UPDATE_FIELDS,
+        batch_size=500
+    )
+
+
+def index_object(instance):
+    """Index one lesson, topic or question, or drop it if it is no longer searchable"""
+    kind = KIND_BY_MODEL[type(instance)]
+    document = INDEXED_MODELS[kind][1](instance)
+    if document is None:
+        unindex_object(kind, instance.id)
+    else:
+        save_documents([document])
+
+
+def unindex_object(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def index_objects(kind, ids, batch_size=1000):
+    """Re-index many objects of one kind, e.g. after bulk writes that sent no signals"""
+    _, build, queryset = INDEXED_MODELS[kind]
+    ids = list(ids)
+    for start in range(0, len(ids), batch_size):
+        save_documents([build(instance) for instance in queryset().filter(id__in=ids[start:start + batch_size])])
+
+
+def index_paper(paper):
+    """Re-index every question of a paper, e.g. after it is published or unpublished"""
+    with transaction.atomic():
+        for kind in ('mcq', 'essay'):
+            model, build, _ = INDEXED_MODELS[kind]
+            SearchDocument.objects.filter(
+                kind=kind,
+                object_id__in=model.objects.filter(paper=paper).values('id')
+            ).delete()
+        if paper.is_published:
+            documents = [mcq_document(q) for q in MultipleChoiceQuestion.objects.filter(paper=paper).select_related('paper')]
+            documents += [
+                essay_document(q)
+                for q in EssayQuestion.objects.filter(paper=paper).select_related('paper').prefetch_related('sub_questions')
+            ]
+            save_documents(documents)
+
+
+def rebuild_index(kinds=None, batch_size=1000):
+    """
+    Replace the documents of the given kinds (default: all) from their source tables
+
+    Returns:
+        Dict mapping each kind to the number of documents written
+    """
+    counts = {}
+    for kind in kinds or INDEXED_MODELS:
+        _, build, queryset = INDEXED_MODELS[kind]
+        with transaction.atomic():
+            SearchDocument.objects.filter(kind=kind).delete()
+            batch = []
+            counts[kind] = 0
+            for instance in queryset().order_by('pk').iterator(chunk_size=batch_size):
+                batch.append(build(instance))
+                if len(batch) >= batch_size:
+                    save_documents(batch)
+                    counts[kind] += len(batch)
+                    batch = []
+            save_documents(batch)
+            counts[kind] += len(batch)
+    return counts
@@ -0,0 +1,38 @@
+"""
+Django management command to rebuild the search index
+Usage: python manage.py rebuild_search_index [--type lesson --type mcq] [--batch-size 1000]
+
+Signals keep the index current for edits made through the ORM. Run this
+after imports that bypass them (bulk_create, update(), raw SQL), or once
+after deploying search to index existing content.
+"""
+from django.core.management.base import BaseCommand
+
+from search.indexing import INDEXED_MODELS, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search documents for lessons, topics and past questions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type',
+            action='append',
+            choices=list(INDEXED_MODELS),
+            dest='kinds',
+            help='Only rebuild this type of document (repeatable; default: all)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Documents written per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding search index...')
+        counts = rebuild_index(options['kinds'], batch_size=max(1, options['batch_size']))
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Indexed {sum(counts.values())} documents"))
+        for kind, count in counts.items():
+            self.stdout.write(f"  • {kind}: {count}")
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('courses', '0007_subjectprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('lesson', 'Lesson'), ('topic', 'Topic'), ('mcq', 'Multiple choice question'), ('essay', 'Essay question')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=300)),
+                ('body', models.TextField(blank=True)),
+                ('context', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.subject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['subject', 'kind'], name='search_doc_subject_kind_idx')],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
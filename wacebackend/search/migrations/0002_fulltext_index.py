@@ -0,0 +1,87 @@
+"""
+Database full-text index over SearchDocument.title and body
+
+PostgreSQL gets a generated tsvector column with a GIN index. SQLite gets an
+external-content FTS5 table kept in step by triggers. Other databases get
+nothing, and search/backends.py falls back to icontains there.
+
+SQLite rebuilds a table (dropping its triggers) when some later migrations
+alter it. A migration that alters SearchDocument must re-run
+create_fulltext_index afterwards.
+"""
+from django.db import migrations
+
+POSTGRESQL_FORWARDS = [
+    """
+    ALTER TABLE search_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX search_doc_vector_idx ON search_searchdocument USING GIN (search_vector)',
+]
+POSTGRESQL_BACKWARDS = [
+    'DROP INDEX IF EXISTS search_doc_vector_idx',
+    'ALTER TABLE search_searchdocument DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_searchdocument_fts USING fts5(
+        title, body, content='search_searchdocument', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchdocument_fts_insert AFTER INSERT ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchdocument_fts_delete AFTER DELETE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts (search_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchdocument_fts_update AFTER UPDATE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts (search_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_searchdocument_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    # Index any rows that already exist
+    "INSERT INTO search_searchdocument_fts (search_searchdocument_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    'DROP TRIGGER IF EXISTS search_searchdocument_fts_insert',
+    'DROP TRIGGER IF EXISTS search_searchdocument_fts_delete',
+    'DROP TRIGGER IF EXISTS search_searchdocument_fts_update',
+    'DROP TABLE IF EXISTS search_searchdocument_fts',
+]
+
+STATEMENTS = {
+    'postgresql': (POSTGRESQL_FORWARDS, POSTGRESQL_BACKWARDS),
+    'sqlite': (SQLITE_FORWARDS, SQLITE_BACKWARDS),
+}
+
+
+def create_fulltext_index(apps, schema_editor):
+    for statement in STATEMENTS.get(schema_editor.connection.vendor, ([], []))[0]:
+        schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    for statement in STATEMENTS.get(schema_editor.connection.vendor, ([], []))[1]:
+        schema_editor.execute(statement)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,36 @@
+from django.db import models
+from courses.models import Subject
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of one lesson, topic or past question
+
+    The full-text index itself lives in the database: a generated tsvector
+    column with a GIN index on PostgreSQL, or an FTS5 table kept in step by
+    triggers on SQLite (see migrations/0002_fulltext_index.py).
+    """
+    KINDS = [
+        ('lesson', 'Lesson'),
+        ('topic', 'Topic'),
+        ('mcq', 'Multiple choice question'),
+        ('essay', 'Essay question'),
+    ]
+    
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.PositiveIntegerField()
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='+')
+    title = models.CharField(max_length=300)
+    body = models.TextField(blank=True)
+    # Ids a client needs to open the result, e.g. topic_id or paper_id
+    context = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['kind', 'object_id']
+        indexes = [
+            models.Index(fields=['subject', 'kind'], name='search_doc_subject_kind_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
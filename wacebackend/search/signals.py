@@ -0,0 +1,40 @@
+"""
+Signal handlers keeping search documents in step with the content they index
+"""
+from django.db.models.signals import post_delete, post_save
+
+from courses.models import Lesson, Topic
+from past_questions.models import EssayQuestion, EssaySubQuestion, MultipleChoiceQuestion, PastQuestionPaper
+from .indexing import KIND_BY_MODEL, index_object, index_paper, unindex_object
+
+
+def reindex_object(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_object(instance)
+
+
+def unindex_deleted_object(sender, instance, **kwargs):
+    unindex_object(KIND_BY_MODEL[sender], instance.id)
+
+
+def reindex_sub_question_essay(sender, instance, raw=False, **kwargs):
+    """Sub-questions are part of their essay question's document"""
+    if raw:
+        return
+    essay = EssayQuestion.objects.filter(pk=instance.essay_question_id).select_related('paper').first()
+    if essay is not None:  # Gone already when the essay itself is being deleted
+        index_object(essay)
+
+
+def reindex_paper(sender, instance, raw=False, **kwargs):
+    """Publishing or unpublishing a paper adds or removes all of its questions"""
+    if not raw:
+        index_paper(instance)
+
+
+for model in (Lesson, Topic, MultipleChoiceQuestion, EssayQuestion):
+    post_save.connect(reindex_object, sender=model, dispatch_uid=f'search_index_save_{model.__name__}')
+    post_delete.connect(unindex_deleted_object, sender=model, dispatch_uid=f'search_index_delete_{model.__name__}')
+post_save.connect(reindex_sub_question_essay, sender=EssaySubQuestion, dispatch_uid='search_index_save_EssaySubQuestion')
+post_delete.connect(reindex_sub_question_essay, sender=EssaySubQuestion, dispatch_uid='search_index_delete_EssaySubQuestion')
+post_save.connect(reindex_paper, sender=PastQuestionPaper, dispatch_uid='search_index_save_PastQuestionPaper')
@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from courses.models import Lesson, ProgrammeSubject, Subject, Topic
+from past_questions.models import EssayQuestion, EssaySubQuestion, MultipleChoiceQuestion, PastQuestionPaper
+from students.models import Programme, Student
+from .backends import search_documents
+from .models import SearchDocument
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('esi', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        programme = Programme.objects.create(name='general_science', description='', price=100)
+        Student.objects.create(
+            user=self.user, phone_number='0240000002', date_of_birth='2007-01-01', programme=programme,
+            previous_school='Achimota', wassce_year=2025, index_number='0010003'
+        )
+        self.subject = Subject.objects.create(name='Biology', code='BIO', description='')
+        ProgrammeSubject.objects.create(programme=programme, subject=self.subject)
+        self.topic = Topic.objects.create(subject=self.subject, title='Cell Biology', description='Cells and organelles')
+        self.lesson = Lesson.objects.create(
+            topic=self.topic, title='Photosynthesis', lesson_type='reading',
+            content='<p>Plants make glucose in the chloroplast.</p>'
+        )
+        Lesson.objects.create(
+            topic=self.topic, title='Respiration', lesson_type='reading', order=1,
+            content='<p>Mitochondria release energy. Photosynthesis is its reverse.</p>'
+        )
+        self.paper = PastQuestionPaper.objects.create(
+            subject=self.subject, year=2022, paper_type='objective', title='Biology 2022', is_published=True
+        )
+        self.mcq = MultipleChoiceQuestion.objects.create(
+            paper=self.paper, question_number=1, question_text='Which organelle carries out photosynthesis?',
+            option_a='Chloroplast', option_b='Nucleus', option_c='Ribosome', option_d='Vacuole', correct_answer='A'
+        )
+        # Another programme's subject never shows up
+        other = Subject.objects.create(name='Literature', code='LIT', description='')
+        Topic.objects.create(subject=other, title='Photosynthesis in poetry')
+
+    def search(self, **params):
+        return self.client.get(reverse('search'), params)
+
+    def test_results_are_ranked_and_scoped_to_programme(self):
+        response = self.search(q='photosynthesis')
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual(response.data['count'], 3)
+        # A title match outranks a passing mention in a body
+        self.assertEqual((results[0]['type'], results[0]['id']), ('lesson', self.lesson.id))
+        self.assertEqual(results[0]['topic_id'], self.topic.id)
+        respiration = next(r for r in results if r['title'] == 'Respiration')
+        self.assertTrue(respiration['snippet'].startswith('Mitochondria release energy. Photosynthesis'))
+
+    def test_prefix_and_filters(self):
+        results = self.search(q='chloro', type='mcq').data['results']
+        self.assertEqual([r['id'] for r in results], [self.mcq.id])
+        self.assertEqual(results[0]['paper_id'], self.paper.id)
+        self.assertEqual(self.search(q='chloro', subject=self.subject.id + 1).data['count'], 0)
+        self.assertEqual(self.search(q='x').status_code, 400)
+        self.assertEqual(self.search(q='cell', type='video').status_code, 400)
+
+    def test_index_follows_edits_and_publication(self):
+        self.mcq.question_text = 'Which organelle stores genetic material?'
+        self.mcq.save()
+        self.assertEqual(self.search(q='genetic').data['count'], 1)
+
+        essay = EssayQuestion.objects.create(paper=self.paper, question_number=2, question_text='Describe osmosis.')
+        EssaySubQuestion.objects.create(essay_question=essay, sub_number='a', question_text='Define turgor pressure.')
+        self.assertEqual(self.search(q='turgor').data['results'][0]['id'], essay.id)
+
+        self.paper.is_published = False
+        self.paper.save()
+        self.assertEqual(self.search(q='osmosis').data['count'], 0)
+        self.assertEqual(self.search(q='genetic').data['count'], 0)
+
+        self.lesson.delete()
+        self.assertEqual(self.search(q='glucose').data['count'], 0)
+
+    def test_rebuild_restores_documents_written_without_signals(self):
+        SearchDocument.objects.all().delete()
+        Lesson.objects.filter(pk=self.lesson.pk).update(title='Light reactions')
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(SearchDocument.objects.count(), 5)
+        self.assertTrue(search_documents(SearchDocument.objects.all(), 'light react').exists())
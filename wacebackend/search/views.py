@@ -0,0 +1,87 @@
+from django.http import JsonResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated
+
+from courses.models import ProgrammeSubject
+from students.models import Student
+from .backends import query_words, search_documents
+from .models import SearchDocument
+
+MIN_QUERY_LENGTH = 2
+SNIPPET_LENGTH = 160
+
+
+class SearchPagination(PageNumberPagination):
+    """Ranked results, best first; nobody reads past the first few pages"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+
+def snippet(body, words, length=SNIPPET_LENGTH):
+    """About `length` characters of `body` around the first query word it contains"""
+    lowered = body.lower()
+    positions = [position for position in (lowered.find(word) for word in words) if position >= 0]
+    start = max(0, min(positions) - length // 4) if positions else 0
+    text = ' '.join(body[start:start + length].split())
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if start + length < len(body) else ''
+    return f'{prefix}{text}{suffix}'
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search(request):
+    """
+    Search lessons, topics and past questions of the student's programme subjects
+
+    Query params: q (required), type (lesson, topic, mcq or essay), subject (id),
+    page and page_size (max 50). Results are ordered by relevance.
+    """
+    query = request.query_params.get('q', '').strip()
+    if len(query) < MIN_QUERY_LENGTH or not query_words(query):
+        return JsonResponse({'error': f'q must have at least {MIN_QUERY_LENGTH} characters'}, status=400)
+
+    kind = request.query_params.get('type')
+    if kind and kind not in dict(SearchDocument.KINDS):
+        return JsonResponse(
+            {'error': f"type must be one of: {', '.join(dict(SearchDocument.KINDS))}"}, status=400
+        )
+    subject = request.query_params.get('subject')
+    if subject:
+        try:
+            subject = int(subject)
+        except ValueError:
+            return JsonResponse({'error': 'subject must be an integer'}, status=400)
+
+    programme_id = Student.objects.filter(user=request.user).values_list('programme_id', flat=True).first()
+    if programme_id is None:
+        return JsonResponse({'error': 'Student profile not found'}, status=404)
+
+    documents = SearchDocument.objects.filter(
+        subject__in=ProgrammeSubject.objects.filter(programme_id=programme_id).values('subject_id')
+    )
+    if kind:
+        documents = documents.filter(kind=kind)
+    if subject:
+        documents = documents.filter(subject_id=subject)
+    documents = search_documents(documents, query).select_related('subject').order_by('-rank', 'kind', 'id')
+
+    paginator = SearchPagination()
+    page = paginator.paginate_queryset(documents, request)
+    words = query_words(query)
+    results = [
+        {
+            'type': document.kind,
+            'id': document.object_id,
+            'title': document.title,
+            'snippet': snippet(document.body, words),
+            'subject': {'id': document.subject_id, 'name': document.subject.name},
+            **document.context,
+        }
+        for document in page
+    ]
+    response = paginator.get_paginated_response(results)
+    response.data['query'] = query
+    return response
@@ -1,14 +1,18 @@
 """
 Django management command to populate lessons for topics
-Usage: python manage.py populate_lessons
+Usage: python manage.py populate_lessons [--dry-run]
 """
 from django.core.management.base import BaseCommand
+from courses.bulk import BulkWriter, add_bulk_arguments
 from courses.models import Topic, Lesson
 
 
 class Command(BaseCommand):
     help = 'Populate lessons for all topics'
 
+    def add_arguments(self, parser):
+        add_bulk_arguments(parser)
+
     def handle(self, *args, **options):
         self.stdout.write("=" * 70)
         self.stdout.write("POPULATING LESSONS FOR ALL TOPICS")
@@ -21,45 +25,34 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("No topics found. Please run populate_topics first."))
             return
         
-        total_created = 0
-        total_existing = 0
-        
+        rows = []
         for topic in topics:
-            self.stdout.write(f"\n📚 Processing: {topic.title}")
-            
             # Create 5-8 lessons per topic
             lessons_data = self.get_lessons_for_topic(topic)
             
             for order, lesson_data in enumerate(lessons_data, start=1):
-                try:
-                    lesson, created = Lesson.objects.get_or_create(
-                        topic=topic,
-                        order=order,
-                        defaults={
-                            'title': lesson_data['title'],
-                            'lesson_type': lesson_data['type'],
-                            'content': lesson_data['content'],
-                            'video_url': lesson_data.get('video_url', ''),
-                            'video_duration_minutes': lesson_data.get('duration', 15),
-                            'is_free': lesson_data.get('is_free', False)
-                        }
-                    )
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f"  ❌ Error creating lesson: {str(e)}"))
-                    continue
-                
-                if created:
-                    self.stdout.write(self.style.SUCCESS(f"  ✅ Created: {lesson.title}"))
-                    total_created += 1
-                else:
-                    self.stdout.write(f"  ⏭️  Exists: {lesson.title}")
-                    total_existing += 1
+                rows.append({
+                    'topic_id': topic.id,
+                    'order': order,
+                    'title': lesson_data['title'],
+                    'lesson_type': lesson_data['type'],
+                    'content': lesson_data['content'],
+                    'video_url': lesson_data.get('video_url', ''),
+                    'video_duration_minutes': lesson_data.get('duration', 15),
+                    'is_free': lesson_data.get('is_free', False),
+                })
+        
+        with BulkWriter(self.stdout, dry_run=options['dry_run']) as writer:
+            result = writer.upsert(Lesson, rows, key_fields=['topic_id', 'order'])
+        
+        total_created = len(result.created)
+        total_existing = len(result.objects) - total_created
         
         self.stdout.write("\n" + "=" * 70)
         self.stdout.write(self.style.SUCCESS("✅ DONE! Lesson population complete"))
         self.stdout.write("=" * 70)
         self.stdout.write(f"\n📊 Summary:")
-        self.stdout.write(f"   Lessons Created: {total_created}")
+        self.stdout.write(f"   Lessons {'To Create' if options['dry_run'] else 'Created'}: {total_created}")
         self.stdout.write(f"   Lessons Already Existed: {total_existing}")
         self.stdout.write(f"   Total Lessons: {total_created + total_existing}")
     
@@ -1,31 +1,39 @@
 """
 Django management command to populate subjects
-Usage: python manage.py populate_subjects
+Usage: python manage.py populate_subjects [--dry-run]
 """
 from django.core.management.base import BaseCommand
 from students.models import Programme
+from courses.bulk import BulkWriter, add_bulk_arguments
 from courses.models import Subject, ProgrammeSubject
 
 
 class Command(BaseCommand):
     help = 'Populate subjects for all programmes'
 
+    def add_arguments(self, parser):
+        add_bulk_arguments(parser)
+
     def handle(self, *args, **options):
         self.stdout.write("=" * 70)
         self.stdout.write("POPULATING SUBJECTS FOR ALL PROGRAMMES")
         self.stdout.write("=" * 70)
         
-        # Create core subjects
-        self.stdout.write("\n📚 Step 1: Creating Core Subjects...")
-        core_subjects = self.create_core_subjects()
-        
-        # Create elective subjects
-        self.stdout.write("\n📖 Step 2: Creating Elective Subjects...")
-        elective_subjects = self.create_elective_subjects()
-        
-        # Assign subjects to programmes
-        self.stdout.write("\n🔗 Step 3: Assigning subjects to programmes...")
-        self.assign_subjects_to_programmes()
+        with BulkWriter(self.stdout, dry_run=options['dry_run']) as writer:
+            # Create core subjects
+            self.stdout.write("\n📚 Step 1: Creating Core Subjects...")
+            self.create_core_subjects(writer)
+            
+            # Create elective subjects
+            self.stdout.write("\n📖 Step 2: Creating Elective Subjects...")
+            self.create_elective_subjects(writer)
+            
+            # Assign subjects to programmes
+            self.stdout.write("\n🔗 Step 3: Assigning subjects to programmes...")
+            self.assign_subjects_to_programmes(writer)
+        
+        if options['dry_run']:
+            return
         
         # Show summary
         self.stdout.write("\n" + "=" * 70)
@@ -45,7 +53,7 @@ class Command(BaseCommand):
             elective_count = programme.programme_subjects.filter(subject__subject_type='elective').count()
             self.stdout.write(f"   {programme.get_name_display()}: {core_count} core + {elective_count} electives = {core_count + elective_count} total")
 
-    def create_core_subjects(self):
+    def create_core_subjects(self, writer):
         """Create core subjects that ALL SHS students must take"""
         core_subjects_data = [
             {
@@ -80,21 +88,11 @@ class Command(BaseCommand):
             },
         ]
         
-        created_subjects = []
-        for subj_data in core_subjects_data:
-            subject, created = Subject.objects.get_or_create(
-                code=subj_data['code'],
-                defaults=subj_data
-            )
-            if created:
-                self.stdout.write(self.style.SUCCESS(f"✅ Created core subject: {subject.name}"))
-            else:
-                self.stdout.write(f"⏭️  Core subject exists: {subject.name}")
-            created_subjects.append(subject)
-        
-        return created_subjects
+        result = writer.upsert(Subject, core_subjects_data, key_fields=['code'], label='Core subjects')
+        for code in sorted(result.created_keys):
+            self.stdout.write(self.style.SUCCESS(f"✅ Created core subject: {result.objects[code].name}"))
 
-    def create_elective_subjects(self):
+    def create_elective_subjects(self, writer):
         """Create elective subjects for each programme"""
         
         electives_by_programme = {
@@ -148,48 +146,31 @@ class Command(BaseCommand):
             ],
         }
         
-        created_subjects = {}
-        for programme_name, electives in electives_by_programme.items():
-            created_subjects[programme_name] = []
-            for elec_data in electives:
-                subject, created = Subject.objects.get_or_create(
-                    code=elec_data['code'],
-                    defaults={
-                        'name': elec_data['name'],
-                        'description': elec_data['description'],
-                        'subject_type': 'elective',
-                    }
-                )
-                if created:
-                    self.stdout.write(self.style.SUCCESS(f"✅ Created elective: {subject.name}"))
-                else:
-                    self.stdout.write(f"⏭️  Elective exists: {subject.name}")
-                created_subjects[programme_name].append(subject)
-        
-        return created_subjects
+        # Electives shared by several programmes are created once, from their first listing
+        rows = [
+            dict(elec_data, subject_type='elective')
+            for electives in electives_by_programme.values()
+            for elec_data in electives
+        ]
+        result = writer.upsert(Subject, rows, key_fields=['code'], label='Elective subjects')
+        for code in sorted(result.created_keys):
+            self.stdout.write(self.style.SUCCESS(f"✅ Created elective: {result.objects[code].name}"))
 
-    def assign_subjects_to_programmes(self):
+    def assign_subjects_to_programmes(self, writer):
         """Assign core subjects to ALL programmes and electives to specific programmes"""
         
         # Get all core subjects
-        core_subjects = Subject.objects.filter(subject_type='core')
+        core_subjects = list(Subject.objects.filter(subject_type='core'))
         
         # Get all programmes
-        programmes = Programme.objects.all()
+        programmes = list(Programme.objects.all())
         
         self.stdout.write("\n📚 Assigning core subjects to ALL programmes...")
-        for programme in programmes:
-            for order, subject in enumerate(core_subjects, start=1):
-                prog_subject, created = ProgrammeSubject.objects.get_or_create(
-                    programme=programme,
-                    subject=subject,
-                    defaults={
-                        'is_required': True,
-                        'order': order
-                    }
-                )
-                if created:
-                    self.stdout.write(self.style.SUCCESS(f"✅ Assigned {subject.name} to {programme.get_name_display()}"))
+        rows = [
+            {'programme_id': programme.id, 'subject_id': subject.id, 'is_required': True, 'order': order}
+            for programme in programmes
+            for order, subject in enumerate(core_subjects, start=1)
+        ]
         
         # Assign elective subjects to specific programmes
         self.stdout.write("\n📖 Assigning elective subjects to programmes...")
@@ -203,19 +184,29 @@ class Command(BaseCommand):
             'agricultural_science': ['GEN_AGR', 'ANIM_HUS', 'CROP_SCI', 'AGR_ECON', 'MATH_ELEC', 'CHEM'],
         }
         
+        electives_by_code = {
+            subject.code: subject
+            for subject in Subject.objects.filter(subject_type='elective')
+        }
         for programme in programmes:
             if programme.name in electives_mapping:
                 elective_codes = electives_mapping[programme.name]
-                elective_subjects = Subject.objects.filter(code__in=elective_codes, subject_type='elective')
+                elective_subjects = sorted(
+                    (electives_by_code[code] for code in elective_codes if code in electives_by_code),
+                    key=lambda subject: subject.name  # Subject.Meta.ordering within the electives
+                )
                 
                 for order, subject in enumerate(elective_subjects, start=len(core_subjects) + 1):
-                    prog_subject, created = ProgrammeSubject.objects.get_or_create(
-                        programme=programme,
-                        subject=subject,
-                        defaults={
-                            'is_required': True,
-                            'order': order
-                        }
-                    )
-                    if created:
-                        self.stdout.write(self.style.SUCCESS(f"✅ Assigned {subject.name} to {programme.get_name_display()}"))
+                    rows.append({
+                        'programme_id': programme.id, 'subject_id': subject.id, 'is_required': True, 'order': order
+                    })
+        
+        result = writer.upsert(
+            ProgrammeSubject, rows, key_fields=['programme_id', 'subject_id'], label='Programme-subject links'
+        )
+        programme_names = {programme.id: programme.get_name_display() for programme in programmes}
+        subject_names = {subject.id: subject.name for subject in core_subjects + list(electives_by_code.values())}
+        for programme_id, subject_id in sorted(result.created_keys):
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Assigned {subject_names[subject_id]} to {programme_names[programme_id]}"
+            ))
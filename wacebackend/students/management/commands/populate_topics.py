@@ -1,14 +1,18 @@
 """
 Django management command to populate topics for subjects
-Usage: python manage.py populate_topics
+Usage: python manage.py populate_topics [--dry-run]
 """
 from django.core.management.base import BaseCommand
+from courses.bulk import BulkWriter, add_bulk_arguments
 from courses.models import Subject, Topic
 
 
 class Command(BaseCommand):
     help = 'Populate topics for all subjects'
 
+    def add_arguments(self, parser):
+        add_bulk_arguments(parser)
+
     def handle(self, *args, **options):
         self.stdout.write("=" * 70)
         self.stdout.write("POPULATING TOPICS FOR ALL SUBJECTS")
@@ -138,43 +142,43 @@ class Command(BaseCommand):
             ],
         }
         
-        total_created = 0
-        total_existing = 0
+        subjects = {}
+        for subject in Subject.objects.filter(name__in=topics_data.keys()):
+            subjects.setdefault(subject.name, subject)
         
+        rows = []
         for subject_name, topics in topics_data.items():
-            try:
-                subject = Subject.objects.filter(name=subject_name).first()
-                self.stdout.write(f"\n📚 Processing {subject.name}...")
-                
-                for order, topic_data in enumerate(topics, start=1):
-                    topic, created = Topic.objects.get_or_create(
-                        subject=subject,
-                        title=topic_data['title'],
-                        defaults={
-                            'description': topic_data['description'],
-                            'order': order,
-                            'estimated_duration_hours': topic_data['duration'],
-                            'is_published': True
-                        }
-                    )
-                    
-                    if created:
-                        self.stdout.write(self.style.SUCCESS(f"  ✅ Created: {topic.title}"))
-                        total_created += 1
-                    else:
-                        self.stdout.write(f"  ⏭️  Exists: {topic.title}")
-                        total_existing += 1
-                
-                if not subject:
-                    self.stdout.write(self.style.WARNING(f"  ⚠️  Subject not found: {subject_name}"))
-                        
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"  ❌ Error processing {subject_name}: {str(e)}"))
+            subject = subjects.get(subject_name)
+            if not subject:
+                self.stdout.write(self.style.WARNING(f"  ⚠️  Subject not found: {subject_name}"))
+                continue
+            for order, topic_data in enumerate(topics, start=1):
+                rows.append({
+                    'subject_id': subject.id,
+                    'title': topic_data['title'],
+                    'description': topic_data['description'],
+                    'order': order,
+                    'estimated_duration_hours': topic_data['duration'],
+                    'is_published': True,
+                })
+        
+        with BulkWriter(self.stdout, dry_run=options['dry_run']) as writer:
+            result = writer.upsert(
+                Topic, rows, key_fields=['subject_id', 'title'], conflict_fields=[('subject_id', 'order')]
+            )
+        
+        subject_names = {subject.id: subject.name for subject in subjects.values()}
+        for subject_id, title in result.conflicts:
+            self.stdout.write(self.style.ERROR(
+                f"  ❌ {subject_names[subject_id]}: another topic already has the position of '{title}'"
+            ))
+        total_created = len(result.created)
+        total_existing = len(result.objects) - total_created
         
         self.stdout.write("\n" + "=" * 70)
         self.stdout.write(self.style.SUCCESS("✅ DONE! Topic population complete"))
         self.stdout.write("=" * 70)
         self.stdout.write(f"\n📊 Summary:")
-        self.stdout.write(f"   Topics Created: {total_created}")
+        self.stdout.write(f"   Topics {'To Create' if options['dry_run'] else 'Created'}: {total_created}")
         self.stdout.write(f"   Topics Already Existed: {total_existing}")
         self.stdout.write(f"   Total Topics: {total_created + total_existing}")
@@ -1,9 +1,31 @@
 """
 Django management command to update ALL video lessons with video URLs
-Usage: python manage.py update_all_video_urls
+Usage: python manage.py update_all_video_urls [--mapping FILE] [--overwrite] [--dry-run]
+
+Without --mapping, every subject's video lessons get SUBJECT_VIDEO_URLS or
+DEFAULT_VIDEO_URL. A mapping file assigns URLs per subject (name or code)
+or per topic, and topic rows win over subject rows:
+
+    CSV:  subject,topic,video_url   (leave topic empty for the whole subject)
+    JSON: [{"subject": "ENG", "topic": "Essay Writing", "video_url": "https://..."}, ...]
+          or {"English Language": "https://...", ...} for subjects only
+
+Lessons that already have a URL are kept unless --overwrite is given.
+Lessons are updated with one UPDATE per subject and URL, and the report
+counts the rows each UPDATE changed.
 """
-from django.core.management.base import BaseCommand
-from courses.models import Subject, Lesson
+import csv
+import json
+import os
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from courses.catalog import bump_catalog_version
+from courses.models import Subject, Topic, Lesson
 
 # Sample video URL - you can use different videos for different subjects
 DEFAULT_VIDEO_URL = "https://tailsandtrailsmedia.sfo3.cdn.digitaloceanspaces.com/videos/Confusing%20English%20Grammar_%20%E2%80%9CIS%E2%80%9D%20or%20%E2%80%9CARE%E2%80%9D_%20(1080p).mp4"
@@ -25,56 +47,168 @@ SUBJECT_VIDEO_URLS = {
 }
 
 
+def read_mapping(path):
+    """Rows of {'subject', 'topic', 'video_url'} from a CSV or JSON mapping file"""
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            if os.path.splitext(path)[1].lower() == '.json':
+                rows = json.load(f)
+                if isinstance(rows, dict):
+                    rows = [{'subject': subject, 'video_url': url} for subject, url in rows.items()]
+            else:
+                rows = list(csv.DictReader(f))
+    except (OSError, ValueError) as e:
+        raise CommandError(f"Can't read mapping file {path}: {e}")
+    if not isinstance(rows, list):
+        raise CommandError("A JSON mapping must be a list of rows or an object of subject: URL")
+
+    mapping = []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            raise CommandError(f"Mapping row {number} must be an object")
+        values = {field: row.get(field) or '' for field in ('subject', 'topic', 'video_url')}
+        if not all(isinstance(value, str) for value in values.values()):
+            raise CommandError(f"Mapping row {number}: subject, topic and video_url must be strings")
+        values = {field: value.strip() for field, value in values.items()}
+        if not values['subject'] or not values['video_url']:
+            raise CommandError(f"Mapping row {number} needs a subject and a video_url")
+        mapping.append(values)
+    return mapping
+
+
 class Command(BaseCommand):
     help = 'Update ALL video lessons with video URLs across all subjects'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mapping',
+            help='CSV or JSON file mapping subjects or topics to video URLs',
+        )
+        parser.add_argument(
+            '--overwrite',
+            action='store_true',
+            help='Also replace URLs that lessons already have',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many lessons would change without updating them',
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("=" * 70)
         self.stdout.write("UPDATING VIDEO URLs FOR ALL LESSONS")
         self.stdout.write("=" * 70)
-        
-        total_updated = 0
-        total_skipped = 0
-        
-        # Get all subjects
-        subjects = Subject.objects.all()
-        
+
+        subjects = list(Subject.objects.all())
+        subject_rules, topic_rules = self.resolve_rules(subjects, options['mapping'])
+        dry_run = options['dry_run']
+
+        video_lessons = Lesson.objects.filter(lesson_type='video')
+        targets = video_lessons if options['overwrite'] else video_lessons.filter(video_url='')
+
+        # One statement per subject and URL: topic rules first, then the rest of each mapped subject
+        by_topic_url = defaultdict(set)
+        for topic_id, (subject_id, url) in topic_rules.items():
+            by_topic_url[(subject_id, url)].add(topic_id)
+        # (subject_id, url, topic ids or None for the rest of the subject)
+        updates = [(subject_id, url, topic_ids) for (subject_id, url), topic_ids in by_topic_url.items()]
+        updates += [(subject_id, url, None) for subject_id, url in subject_rules.items()]
+
+        def in_scope(subject_id, topic_id):
+            return topic_id in topic_rules or (subject_id in subject_rules and topic_id not in topic_rules)
+
+        # Video lessons per topic, and how many of them are targets, in one query
+        mapped_subjects = set(subject_rules) | {subject_id for subject_id, _ in topic_rules.values()}
+        videos_in_scope = defaultdict(int)
+        touched_topics = set()
+        per_topic = video_lessons.filter(topic__subject_id__in=mapped_subjects).order_by().values_list(
+            'topic__subject_id', 'topic_id'
+        ).annotate(
+            count=Count('id'),
+            targets=Count('id', filter=Q(video_url='')) if not options['overwrite'] else Count('id'),
+        )
+        for subject_id, topic_id, count, target_count in per_topic:
+            if in_scope(subject_id, topic_id):
+                videos_in_scope[subject_id] += count
+                if target_count:
+                    touched_topics.add(topic_id)
+
+        affected = defaultdict(int)
+        with transaction.atomic():
+            for subject_id, url, topic_ids in updates:
+                lessons = targets.filter(topic__subject_id=subject_id)
+                if topic_ids is None:
+                    lessons = lessons.exclude(topic_id__in=topic_rules)
+                else:
+                    lessons = lessons.filter(topic_id__in=topic_ids)
+                affected[subject_id] += lessons.count() if dry_run else lessons.update(video_url=url)
+            if not dry_run and any(affected.values()):
+                # Topic.updated_at drives Last-Modified on topic pages (see courses/signals.py)
+                Topic.objects.filter(id__in=touched_topics).update(updated_at=timezone.now())
+                transaction.on_commit(bump_catalog_version)
+
+        verb = 'Would update' if dry_run else 'Updated'
         for subject in subjects:
-            self.stdout.write(f"\n📚 Processing: {subject.name}")
-            
-            # Get video URL for this subject
-            video_url = SUBJECT_VIDEO_URLS.get(subject.name, DEFAULT_VIDEO_URL)
-            
-            # Get all video lessons for this subject
-            video_lessons = Lesson.objects.filter(
-                topic__subject=subject,
-                lesson_type='video'
-            )
-            
-            if not video_lessons.exists():
-                self.stdout.write(f"  ⚠️  No video lessons found")
+            if subject.id not in mapped_subjects:
                 continue
-            
-            updated_count = 0
-            for lesson in video_lessons:
-                if not lesson.video_url:  # Only update if empty
-                    lesson.video_url = video_url
-                    lesson.save()
-                    updated_count += 1
-                    total_updated += 1
-                else:
-                    total_skipped += 1
-            
-            if updated_count > 0:
-                self.stdout.write(f"  ✅ Updated {updated_count} video lessons")
+            self.stdout.write(f"\n📚 {subject.name}")
+            if not videos_in_scope[subject.id]:
+                self.stdout.write(f"  ⚠️  No video lessons found")
+            elif affected[subject.id]:
+                self.stdout.write(f"  ✅ {verb} {affected[subject.id]} video lessons")
             else:
                 self.stdout.write(f"  ℹ️  All video lessons already have URLs")
-        
+
+        total_updated = sum(affected.values())
         self.stdout.write("\n" + "=" * 70)
-        self.stdout.write("✅ VIDEO URL UPDATE COMPLETE")
+        self.stdout.write("✅ DRY RUN COMPLETE (nothing changed)" if dry_run else "✅ VIDEO URL UPDATE COMPLETE")
         self.stdout.write("=" * 70)
         self.stdout.write(f"\n📊 Summary:")
-        self.stdout.write(f"  • Lessons updated: {total_updated}")
-        self.stdout.write(f"  • Lessons skipped (already have URLs): {total_skipped}")
-        self.stdout.write(f"  • Total subjects processed: {subjects.count()}")
+        self.stdout.write(f"  • Lessons {'to update' if dry_run else 'updated'}: {total_updated}")
+        self.stdout.write(f"  • Lessons skipped (already have URLs): {sum(videos_in_scope.values()) - total_updated}")
+        self.stdout.write(f"  • Total subjects processed: {len(mapped_subjects)}")
+        self.stdout.write(f"  • UPDATE statements: {0 if dry_run else len(updates)}")
         self.stdout.write("")
+
+    def resolve_rules(self, subjects, mapping_path):
+        """
+        Returns:
+            Tuple of ({subject_id: url}, {topic_id: (subject_id, url)})
+        """
+        if not mapping_path:
+            return {
+                subject.id: SUBJECT_VIDEO_URLS.get(subject.name, DEFAULT_VIDEO_URL) for subject in subjects
+            }, {}
+
+        by_key = {}
+        for subject in subjects:
+            by_key.setdefault(subject.code.lower(), subject)
+            by_key.setdefault(subject.name.lower(), subject)
+
+        mapping = read_mapping(mapping_path)
+        missing = sorted({row['subject'] for row in mapping if row['subject'].lower() not in by_key})
+        if missing:
+            raise CommandError(f"Subjects not found: {', '.join(missing)}")
+
+        subject_rules, wanted_topics = {}, {}
+        for row in mapping:
+            subject = by_key[row['subject'].lower()]
+            if row['topic']:
+                wanted_topics[(subject.id, row['topic'].lower())] = row['video_url']
+            else:
+                subject_rules[subject.id] = row['video_url']
+
+        topic_rules = {}
+        if wanted_topics:
+            topics = Topic.objects.filter(subject_id__in={subject_id for subject_id, _ in wanted_topics})
+            for topic in topics.values('id', 'subject_id', 'title'):
+                url = wanted_topics.pop((topic['subject_id'], topic['title'].lower()), None)
+                if url is not None:
+                    topic_rules[topic['id']] = (topic['subject_id'], url)
+            if wanted_topics:
+                names = {subject.id: subject.name for subject in subjects}
+                raise CommandError('Topics not found: ' + ', '.join(
+                    f"{names[subject_id]} / {title}" for subject_id, title in sorted(wanted_topics)
+                ))
+        return subject_rules, topic_rules
@@ -0,0 +1,159 @@
+"""
+Typeahead over GHANA_HIGH_SCHOOLS
+
+The signup form asks for a student's previous school. Rather than shipping
+the whole list and filtering it on the client, `?q=` asks the server for
+the best few matches from an index built once per process:
+
+- a prefix trie over every word of every school name (plus the acronym in
+  brackets, e.g. PRESEC, and "senior high school" for SHS), where each node
+  holds the schools reachable below it, so a word prefix is one walk down
+  the trie;
+- a trigram index for typos and spellings the trie misses ("Presbyterin",
+  "Mfantsipem"), ranked by trigram similarity.
+
+Each query word must prefix a word of the school name. Prefix matches come
+first and fuzzy matches fill the rest of the list.
+"""
+import re
+from functools import lru_cache
+
+from .models import GHANA_HIGH_SCHOOLS
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+MIN_SIMILARITY = 0.5
+WORD_RE = re.compile(r"[a-z0-9]+")
+ACRONYM_RE = re.compile(r"\(([^)]+)\)")
+# Words students type for the abbreviations used in the list
+ALIASES = {
+    'shs': ('senior', 'high', 'school'),
+    'shts': ('senior', 'high', 'technical', 'school'),
+}
+
+
+def normalize(text):
+    """Lowercase words of `text`, ignoring punctuation ("Girls'" -> "girls", "T.I." -> "t", "i")"""
+    return WORD_RE.findall(text.lower().replace("'", ''))
+
+
+def trigrams(text):
+    """Character trigrams of each normalized word, padded so that word starts carry extra weight"""
+    grams = set()
+    for word in normalize(text):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrieNode:
+    __slots__ = ('children', 'schools')
+
+    def __init__(self):
+        self.children = {}
+        self.schools = set()
+
+
+class SchoolIndex:
+    """Prefix trie and trigram index over a list of school names"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.normalized = [' '.join(normalize(name)) for name in self.names]
+        self.root = TrieNode()
+        self.postings = {}
+
+        for school_id, name in enumerate(self.names):
+            words = set(normalize(name))
+            for acronym in ACRONYM_RE.findall(name):
+                words.update(normalize(acronym))
+            for word in list(words):
+                words.update(ALIASES.get(word, ()))
+            for word in words:
+                self._insert(word, school_id)
+
+            for gram in trigrams(name):
+                self.postings.setdefault(gram, []).append(school_id)
+
+        # Freeze node sets so lookups can intersect them without copying
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            node.schools = frozenset(node.schools)
+            stack.extend(node.children.values())
+
+    def _insert(self, word, school_id):
+        node = self.root
+        for char in word:
+            node = node.children.setdefault(char, TrieNode())
+            node.schools.add(school_id)
+
+    def _prefixed(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return frozenset()
+        return node.schools
+
+    def prefix_matches(self, words):
+        """Ids of schools with a word starting with each of `words`"""
+        matches = None
+        for word in sorted(words, key=len, reverse=True):  # Longest (rarest) prefix first
+            schools = self._prefixed(word)
+            matches = schools if matches is None else matches & schools
+            if not matches:
+                break
+        return matches or frozenset()
+
+    def fuzzy_matches(self, query, exclude=()):
+        """(similarity, id) of schools sharing enough trigrams with the query, best first"""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        shared = {}
+        for gram in grams:
+            for school_id in self.postings.get(gram, ()):
+                shared[school_id] = shared.get(school_id, 0) + 1
+
+        scored = []
+        for school_id, count in shared.items():
+            if school_id in exclude:
+                continue
+            # Share of the query's trigrams found in the name, so long names aren't penalised
+            similarity = count / len(grams)
+            if similarity >= MIN_SIMILARITY:
+                scored.append((similarity, school_id))
+        scored.sort(key=lambda item: (-item[0], self.names[item[1]]))
+        return scored
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Up to `limit` school names matching `query`, best first"""
+        words = normalize(query)
+        if not words:
+            return []
+
+        phrase = ' '.join(words)
+        prefixed = sorted(
+            self.prefix_matches(words),
+            key=lambda school_id: (
+                not self.normalized[school_id].startswith(phrase),  # Whole-name prefix first
+                len(self.names[school_id]),
+                self.names[school_id],
+            )
+        )
+        results = prefixed[:limit]
+        if len(results) < limit:
+            results += [
+                school_id for _, school_id in self.fuzzy_matches(query, exclude=set(results))
+            ][:limit - len(results)]
+        return [self.names[school_id] for school_id in results]
+
+
+@lru_cache(maxsize=1)
+def get_school_index():
+    return SchoolIndex(GHANA_HIGH_SCHOOLS)
+
+
+def search_schools(query, limit=DEFAULT_LIMIT):
+    return get_school_index().search(query, limit=limit)
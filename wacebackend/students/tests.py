@@ -1,3 +1,112 @@
-from django.test import TestCase
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from courses.catalog import bump_catalog_version
+from courses.models import Lesson, ProgrammeSubject, Subject, SubjectProgress, Topic
+from .models import Programme, Student, StudentProgress
+from .school_search import SchoolIndex
+from .views import CatalogPagination
+
+
+class HighSchoolTypeaheadTests(TestCase):
+    def setUp(self):
+        self.index = SchoolIndex([
+            "Presbyterian Boys' SHS (PRESEC)", "Bechem Presbyterian SHS", "Prempeh College",
+            "Mfantsipim School", "Tema SHS", "Accra Academy",
+        ])
+
+    def test_prefixes_acronyms_and_aliases(self):
+        self.assertEqual(self.index.search('PRESEC', limit=1), ["Presbyterian Boys' SHS (PRESEC)"])
+        self.assertEqual(self.index.search('presbyterian boys')[0], "Presbyterian Boys' SHS (PRESEC)")
+        self.assertEqual(self.index.search('pre')[:2], ['Prempeh College', "Presbyterian Boys' SHS (PRESEC)"])
+        self.assertEqual(self.index.search('tema senior high'), ['Tema SHS'])
+        self.assertEqual(self.index.search('!!'), [])
+
+    def test_fuzzy_matches_fill_in_for_typos(self):
+        self.assertEqual(self.index.search('mfantsipem'), ['Mfantsipim School'])
+        self.assertEqual(self.index.search('prempe colege'), ['Prempeh College'])
+        self.assertEqual(self.index.search('zzzz'), [])
+
+    def test_endpoint_modes(self):
+        client = APIClient()
+        url = reverse('high-schools')
+        full = client.get(url)
+        self.assertEqual(full.data['total_count'], len(full.data['schools']))
+
+        typeahead = client.get(url, {'q': 'achimota', 'limit': 3})
+        self.assertEqual(typeahead.data['schools'][0], 'Achimota School')
+        self.assertLessEqual(typeahead.data['count'], 3)
+        self.assertNotEqual(typeahead['ETag'], full['ETag'])
+        self.assertEqual(client.get(url, {'q': 'a', 'limit': 'x'}).status_code, 400)
+
+
+class ProgrammeListSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        snapshot_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_dir.cleanup)
+        self.snapshot_dir = snapshot_dir.name
+        for name, _ in Programme.PROGRAMME_CHOICES:
+            Programme.objects.create(name=name, description=name, price=100)
+
+    @mock.patch.object(CatalogPagination, 'page_size', 4)
+    def test_query_strings_share_a_snapshot_and_old_versions_are_pruned(self):
+        url = reverse('programme-list')
+        with override_settings(CATALOG_SNAPSHOT_DIR=self.snapshot_dir):
+            first = self.client.get(url, {'x': 1}).json()
+            with self.assertNumQueries(0):
+                self.client.get(url, {'x': 2})
+                self.client.get(url, {'page': '01', 'utm_source': 'ad'})
+            self.assertEqual(first['next'], 'http://testserver/api/students/programmes/?page=2')
+            self.assertEqual(len(self.client.get(url, {'page': 2, 'x': 1}).json()['results']), 2)
+            self.assertEqual(self.client.get(url, {'page': 'nope'}).status_code, 404)
+            self.assertEqual(len(os.listdir(self.snapshot_dir)), 2)
+
+            bump_catalog_version()
+            self.assertEqual(os.listdir(self.snapshot_dir), [])
+
+
+class StudentDashboardTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('kofi', password='secret', first_name='Kofi')
+        programme = Programme.objects.create(name='general_science', description='', price=100)
+        self.student = Student.objects.create(
+            user=self.user, phone_number='0240000000', date_of_birth='2005-01-01', programme=programme,
+            previous_school='Tema SHS', wassce_year=2024, index_number='0010101001'
+        )
+        for i, (code, subject_type) in enumerate([('MATH', 'core'), ('ENG', 'core'), ('PHY', 'elective')]):
+            subject = Subject.objects.create(name=code, code=code, description='', subject_type=subject_type)
+            ProgrammeSubject.objects.create(programme=programme, subject=subject, order=i)
+            for order in range(2):
+                topic = Topic.objects.create(subject=subject, title=f'Topic {order}', order=order)
+                for lesson_order in range(2):
+                    Lesson.objects.create(topic=topic, title=f'Lesson {lesson_order}', lesson_type='reading', order=lesson_order)
+            StudentProgress.objects.create(student=self.student, subject=code, current_grade='C4', target_grade='A1')
+        SubjectProgress.objects.create(student=self.user, subject=Subject.objects.get(code='MATH'), lessons_completed=2)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_query_count_does_not_grow_with_subjects(self):
+        # Student, subjects with counts, grades and completed lesson counts
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('student-dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+        core = response.data['subjects']['core']
+        self.assertEqual([subject['code'] for subject in core], ['MATH', 'ENG'])
+        self.assertEqual(core[0]['topics_count'], 2)
+        self.assertEqual(core[0]['progress'], {
+            'current_grade': 'C4',
+            'target_grade': 'A1',
+            'progress_percentage': 50,
+            'lessons_completed': 2,
+            'total_lessons': 4,
+        })
+        self.assertEqual(response.data['subjects']['elective'][0]['progress']['lessons_completed'], 0)
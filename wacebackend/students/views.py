@@ -1,26 +1,101 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from django.contrib.auth import authenticate, login
+from django.db.models import Count
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+from courses.catalog import get_snapshot
+from courses.utils import make_etag
+from jobs.views import enqueue_job_response
 from .models import Student, Programme, StudentProgress, GHANA_HIGH_SCHOOLS
+from .school_search import DEFAULT_LIMIT, MAX_LIMIT, search_schools
 from .serializers import (
     StudentSerializer, ProgrammeSerializer, 
     StudentProgressSerializer, StudentRegistrationSerializer
 )
 
+class CatalogPagination(PageNumberPagination):
+    """Page links built from the path and ?page= alone, so every request for a page can share one snapshot"""
+
+    def get_next_link(self):
+        if not self.page.has_next():
+            return None
+        url = self.request.build_absolute_uri(self.request.path)
+        return replace_query_param(url, self.page_query_param, self.page.next_page_number())
+
+    def get_previous_link(self):
+        if not self.page.has_previous():
+            return None
+        url = self.request.build_absolute_uri(self.request.path)
+        page_number = self.page.previous_page_number()
+        if page_number == 1:
+            return url
+        return replace_query_param(url, self.page_query_param, page_number)
+
+
 class ProgrammeListView(generics.ListAPIView):
-    queryset = Programme.objects.all()
+    queryset = Programme.objects.order_by('id')  # Stable pages, since each is snapshotted
     serializer_class = ProgrammeSerializer
     permission_classes = [AllowAny]
+    pagination_class = CatalogPagination
+
+    def list(self, request, *args, **kwargs):
+        # Served from the versioned catalog snapshot. Only ?page= changes the
+        # payload (links are absolute, so the host is part of the key too);
+        # other query parameters share the snapshot of their page
+        def build():
+            response = super(ProgrammeListView, self).list(request, *args, **kwargs)
+            return JSONRenderer().render(response.data)
+
+        page = request.query_params.get(self.paginator.page_query_param) or '1'
+        if page.isdigit():
+            page = str(int(page))
+        elif page not in self.paginator.last_page_strings:
+            # Not a page the paginator accepts: build() raises NotFound and nothing is stored
+            build()
+        content, _ = get_snapshot(f'students:programmes:{request.scheme}://{request.get_host()}:{page}', build)
+        return HttpResponse(content, content_type='application/json')
+
 
+# The school list is static, so its ETag is computed once per process
+HIGH_SCHOOLS_ETAG = make_etag('high-schools', GHANA_HIGH_SCHOOLS)
 
+
+def _high_schools_etag(request):
+    # Typeahead responses depend only on the list and the query string
+    if 'q' in request.GET:
+        return make_etag(HIGH_SCHOOLS_ETAG, request.GET.get('q'), request.GET.get('limit'))
+    return HIGH_SCHOOLS_ETAG
+
+
+@condition(etag_func=_high_schools_etag)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_high_schools(request):
     """
     Get list of Ghana high schools for signup form
+
+    Without parameters, returns the full list. With ?q=, returns the best
+    matches for a typeahead (?limit=, default 10, max 25).
     """
+    if 'q' in request.query_params:
+        try:
+            limit = int(request.query_params.get('limit') or DEFAULT_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        query = request.query_params['q']
+        schools = search_schools(query, limit=max(1, min(limit, MAX_LIMIT)))
+        return Response({
+            'query': query,
+            'schools': schools,
+            'count': len(schools)
+        })
+
     return Response({
         'schools': GHANA_HIGH_SCHOOLS,
         'total_count': len(GHANA_HIGH_SCHOOLS)
@@ -68,15 +143,27 @@ def student_dashboard(request):
     Get student dashboard with their programme's core and elective subjects
     """
     try:
-        from courses.models import ProgrammeSubject
+        from courses.models import ProgrammeSubject, SubjectProgress
         
-        student = Student.objects.get(user=request.user)
+        student = Student.objects.select_related('user', 'programme').get(user=request.user)
         programme = student.programme
         
-        # Get all subjects for this programme
+        # Get all subjects for this programme with topic and lesson counts
         programme_subjects = ProgrammeSubject.objects.filter(
             programme=programme
-        ).select_related('subject').prefetch_related('subject__topics').order_by('subject__subject_type', 'order')
+        ).select_related('subject').annotate(
+            topics_count=Count('subject__topics', distinct=True),
+            lessons_count=Count('subject__topics__lessons', distinct=True),
+        ).order_by('subject__subject_type', 'order')
+        
+        # All of the student's progress rows and completed lesson counts, in one indexed lookup each
+        progress_by_subject = {
+            progress.subject: progress
+            for progress in StudentProgress.objects.filter(student=student)
+        }
+        completed_by_subject = dict(
+            SubjectProgress.objects.filter(student=request.user).values_list('subject_id', 'lessons_completed')
+        )
         
         # Separate core and elective subjects
         core_subjects = []
@@ -85,31 +172,24 @@ def student_dashboard(request):
         for prog_subject in programme_subjects:
             subject = prog_subject.subject
             
-            # Get student progress for this subject if exists
-            try:
-                progress = StudentProgress.objects.get(student=student, subject=subject.name)
-                progress_data = {
-                    'current_grade': progress.current_grade,
-                    'target_grade': progress.target_grade,
-                    'progress_percentage': progress.progress_percentage,
-                    'lessons_completed': progress.lessons_completed,
-                    'total_lessons': progress.total_lessons,
-                }
-            except StudentProgress.DoesNotExist:
-                progress_data = {
-                    'current_grade': '',
-                    'target_grade': '',
-                    'progress_percentage': 0,
-                    'lessons_completed': 0,
-                    'total_lessons': subject.topics.count(),
-                }
+            # Lesson counts are live; grades come from the student's progress row if it exists
+            progress = progress_by_subject.get(subject.name)
+            total_lessons = prog_subject.lessons_count
+            lessons_completed = completed_by_subject.get(subject.id, 0)
+            progress_data = {
+                'current_grade': progress.current_grade if progress else '',
+                'target_grade': progress.target_grade if progress else '',
+                'progress_percentage': round(lessons_completed / total_lessons * 100) if total_lessons else 0,
+                'lessons_completed': lessons_completed,
+                'total_lessons': total_lessons,
+            }
             
             subject_data = {
                 'id': subject.id,
                 'name': subject.name,
                 'code': subject.code,
                 'description': subject.description,
-                'topics_count': subject.topics.count(),
+                'topics_count': prog_subject.topics_count,
                 'is_required': prog_subject.is_required,
                 'progress': progress_data
             }
@@ -158,33 +238,11 @@ def student_dashboard(request):
 def populate_subjects_api(request):
     """
     API endpoint to populate subjects - only accessible by admin users
+
+    Queues the command as a background job; poll status_url for the result.
     """
-    from courses.models import Subject, ProgrammeSubject
-    from django.core.management import call_command
-    from io import StringIO
-    
-    try:
-        # Capture the output
-        out = StringIO()
-        call_command('populate_subjects', stdout=out)
-        output = out.getvalue()
-        
-        return Response({
-            'success': True,
-            'message': 'Subjects populated successfully',
-            'output': output,
-            'summary': {
-                'total_subjects': Subject.objects.count(),
-                'core_subjects': Subject.objects.filter(subject_type='core').count(),
-                'elective_subjects': Subject.objects.filter(subject_type='elective').count(),
-                'programme_subject_links': ProgrammeSubject.objects.count(),
-            }
-        })
-    except Exception as e:
-        return Response({
-            'success': False,
-            'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    data, status_code = enqueue_job_response(request, 'populate_subjects')
+    return Response(data, status=status_code)
 
 
 @api_view(['POST'])
@@ -192,30 +250,11 @@ def populate_subjects_api(request):
 def populate_topics_api(request):
     """
     API endpoint to populate topics - only accessible by admin users
+
+    Queues the command as a background job; poll status_url for the result.
     """
-    from courses.models import Topic
-    from django.core.management import call_command
-    from io import StringIO
-    
-    try:
-        # Capture the output
-        out = StringIO()
-        call_command('populate_topics', stdout=out)
-        output = out.getvalue()
-        
-        return Response({
-            'success': True,
-            'message': 'Topics populated successfully',
-            'output': output,
-            'summary': {
-                'total_topics': Topic.objects.count(),
-            }
-        })
-    except Exception as e:
-        return Response({
-            'success': False,
-            'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    data, status_code = enqueue_job_response(request, 'populate_topics')
+    return Response(data, status=status_code)
 
 
 @api_view(['POST'])
@@ -223,30 +262,11 @@ def populate_topics_api(request):
 def populate_lessons_api(request):
     """
     API endpoint to populate lessons - only accessible by admin users
+
+    Queues the command as a background job; poll status_url for the result.
     """
-    from courses.models import Lesson
-    from django.core.management import call_command
-    from io import StringIO
-    
-    try:
-        # Capture the output
-        out = StringIO()
-        call_command('populate_lessons', stdout=out)
-        output = out.getvalue()
-        
-        return Response({
-            'success': True,
-            'message': 'Lessons populated successfully',
-            'output': output,
-            'summary': {
-                'total_lessons': Lesson.objects.count(),
-            }
-        })
-    except Exception as e:
-        return Response({
-            'success': False,
-            'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    data, status_code = enqueue_job_response(request, 'populate_lessons')
+    return Response(data, status=status_code)
 
 
 @api_view(['POST'])
@@ -254,26 +274,11 @@ def populate_lessons_api(request):
 def update_english_videos_api(request):
     """
     API endpoint to update English videos - only accessible by admin users
+
+    Queues the command as a background job; poll status_url for the result.
     """
-    from django.core.management import call_command
-    from io import StringIO
-    
-    try:
-        # Capture the output
-        out = StringIO()
-        call_command('update_english_videos', stdout=out)
-        output = out.getvalue()
-        
-        return Response({
-            'success': True,
-            'message': 'English videos updated successfully',
-            'output': output,
-        })
-    except Exception as e:
-        return Response({
-            'success': False,
-            'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    data, status_code = enqueue_job_response(request, 'update_english_videos')
+    return Response(data, status=status_code)
 
 
 @api_view(['POST'])
@@ -281,23 +286,8 @@ def update_english_videos_api(request):
 def update_all_video_urls_api(request):
     """
     API endpoint to update ALL video URLs - only accessible by admin users
+
+    Queues the command as a background job; poll status_url for the result.
     """
-    from django.core.management import call_command
-    from io import StringIO
-    
-    try:
-        # Capture the output
-        out = StringIO()
-        call_command('update_all_video_urls', stdout=out)
-        output = out.getvalue()
-        
-        return Response({
-            'success': True,
-            'message': 'All video URLs updated successfully',
-            'output': output,
-        })
-    except Exception as e:
-        return Response({
-            'success': False,
-            'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    data, status_code = enqueue_job_response(request, 'update_all_video_urls')
+    return Response(data, status=status_code)
@@ -51,6 +51,8 @@ INSTALLED_APPS = [
     'students',
     'payments',
     'past_questions',
+    'search',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -237,6 +239,16 @@ REST_FRAMEWORK = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache (per-process in development; production shares one across workers)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Optional directory for on-disk copies of the public catalog snapshots
+CATALOG_SNAPSHOT_DIR = os.getenv('CATALOG_SNAPSHOT_DIR') or None
+
 
 # Jazzmin Settings
 JAZZMIN_SETTINGS = {
@@ -118,6 +118,28 @@ CSRF_COOKIE_SAMESITE = 'None'
 CSRF_COOKIE_SECURE = True
 CSRF_COOKIE_HTTPONLY = False  # Must be False for JavaScript access
 
+# Cache in the Postgres database, so every gunicorn worker, web instance and
+# the run_jobs worker share it, and cache.add() is an atomic insert. Create
+# the table with `python manage.py createcachetable` (start.sh does).
+#
+# Keys stored without a timeout must survive for correctness:
+#   courses:catalog:version              catalog snapshots and paper bodies
+#   past_questions:question_bank:version quiz pools
+# Losing one only forces a rebuild, but every ETag changes with it. Keys
+# with a timeout (snapshots, paper bodies, quiz pools and tokens, open mock
+# markers) are removed when they expire, before anything else is culled.
+# MAX_ENTRIES is sized so culling live keys does not happen in practice.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'wace_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=100000, cast=int),
+            'CULL_FREQUENCY': 4,
+        },
+    }
+}
+
 # Static files with WhiteNoise
 if 'whitenoise.middleware.WhiteNoiseMiddleware' not in MIDDLEWARE:
     MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
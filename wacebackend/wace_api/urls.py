@@ -31,6 +31,8 @@ urlpatterns = [
     path('api/payments/', include('payments.urls')),
     path('api/auth/', include('authentication.urls')),
     path('api/past-questions/', include('past_questions.urls')),
+    path('api/search/', include('search.urls')),
+    path('api/jobs/', include('jobs.urls')),
 ]
 
 # Serve media files during development